@@ -0,0 +1,270 @@
+"""
+Read-through cache for stored assessment documents.
+
+A stored assessment only changes when it is resubmitted or deleted, so the
+results, scenario estimate and sweep endpoints read it through this cache
+instead of hitting MongoDB on every call. The cache is a bounded, TTL'd LRU
+in each process (L1), optionally backed by a shared backend (L2) so several
+workers can reuse each other's loads. Writers invalidate entries explicitly.
+
+An invalidation only reaches the writer's own L1 and the shared L2; other
+processes' L1 entries live until they expire. With several workers, give L1 a
+local_ttl of a few seconds: that bounds how long another worker can serve a
+document that was resubmitted or deleted elsewhere, while L2 keeps the full ttl.
+Bulk rewrites by another process (a re-score) are announced through MongoDB
+instead, and discard_local() drops the affected entries.
+
+L2 documents are stored under versioned keys: each id has a generation in L2
+that invalidate() replaces with a fresh random one, and a load stores its
+document under the generation it read before loading. A worker whose load
+was in flight during an invalidation elsewhere therefore writes to a key
+nobody reads any more, instead of putting the old document back for ttl.
+
+Cached documents are shared between callers and must be treated as read-only.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SharedCacheBackend(ABC):
+    """Interface of a cache shared between worker processes"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """The value stored for key, or None if it is missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float):
+        """Store value for key for ttl seconds"""
+
+    async def close(self):
+        pass
+
+
+class MemorySharedBackend(SharedCacheBackend):
+    """In-process stand-in for a shared backend (tests, single-worker setups)"""
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+
+
+class RedisSharedBackend(SharedCacheBackend):
+    """Shared backend on Redis (requires the optional `redis` package)"""
+
+    def __init__(self, url: str, prefix: str = "flightdeck:assessment:"):
+        if aioredis is None:
+            raise ValueError("A redis:// assessment cache URL requires the redis package")
+        self._redis = aioredis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._redis.get(self._prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: float):
+        await self._redis.set(self._prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def close(self):
+        await self._redis.close()
+
+
+def create_shared_backend(url: Optional[str]) -> Optional[SharedCacheBackend]:
+    """Shared backend for a URL: memory:// for the stand-in, redis:// for Redis"""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemorySharedBackend()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisSharedBackend(url)
+    raise ValueError(f"Unsupported assessment cache URL: {url}")
+
+
+class AssessmentCache:
+    """Bounded, TTL'd read-through cache of assessment documents keyed by id"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, shared: Optional[SharedCacheBackend] = None, local_ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Lifetime of this process's entries (L1); defaults to ttl
+        self.local_ttl = ttl if local_ttl is None else min(local_ttl, ttl)
+        self.shared = shared
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        # In-flight loads; an invalidation drops the token so a stale load isn't stored
+        self._loading: Dict[str, object] = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.shared_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    @staticmethod
+    def _generation_key(key: str) -> str:
+        return f"{key}:generation"
+
+    @staticmethod
+    def _document_key(key: str, generation: str) -> str:
+        return f"{key}:{generation}"
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, doc = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return doc
+
+    def _set_local(self, key: str, doc: Dict[str, Any]):
+        if self.local_ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.local_ttl, doc)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Return the cached document for key, loading (and caching) it on a miss"""
+        if not self.enabled:
+            return await loader()
+
+        doc = self._get_local(key)
+        if doc is not None:
+            self.hits += 1
+            return doc
+
+        token = object()
+        self._loading[key] = token
+
+        try:
+            # L2 generation read before loading; the document is stored under it
+            generation = None
+            if self.shared is not None:
+                raw = None
+                try:
+                    generation = await self.shared.get(self._generation_key(key)) or ""
+                    raw = await self.shared.get(self._document_key(key, generation))
+                except Exception as e:
+                    self.shared_errors += 1
+                    logger.warning(f"Shared assessment cache read failed: {str(e)}")
+                if raw is not None:
+                    doc = json.loads(raw)
+                    self.shared_hits += 1
+                    if self._loading.get(key) is token:
+                        self._set_local(key, doc)
+                    return doc
+
+            self.misses += 1
+            doc = await loader()
+            if doc is not None and self._loading.get(key) is token:
+                self._set_local(key, doc)
+                if generation is not None:
+                    try:
+                        await self.shared.set(
+                            self._document_key(key, generation), json.dumps(doc, default=_json_default), self.ttl
+                        )
+                    except Exception as e:
+                        self.shared_errors += 1
+                        logger.warning(f"Shared assessment cache write failed: {str(e)}")
+            return doc
+        finally:
+            if self._loading.get(key) is token:
+                del self._loading[key]
+
+    async def invalidate(self, *keys: str):
+        """Drop keys locally and orphan their shared copies (after a write or delete)"""
+        for key in keys:
+            self._loading.pop(key, None)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+        if self.shared is not None and keys:
+            try:
+                # A new generation orphans the cached document and any load in flight elsewhere.
+                # It must outlive documents stored under the previous one, or those would be read again
+                await asyncio.gather(*(
+                    self.shared.set(self._generation_key(key), uuid.uuid4().hex, 2 * self.ttl) for key in keys
+                ))
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared assessment cache invalidation failed: {str(e)}")
+
+    def discard_local(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """
+        Drop this process's entries whose document matches predicate, e.g. ones
+        another process may have rewritten; returns how many were dropped
+        """
+        keys = [key for key, (_, doc) in self._entries.items() if predicate(doc)]
+        for key in keys:
+            del self._entries[key]
+        self.invalidations += len(keys)
+        # A load in flight may have read the old version
+        self._loading.clear()
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._loading.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "shared_errors": self.shared_errors,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "local_ttl": self.local_ttl,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None
+        }
+
+    async def close(self):
+        if self.shared is not None:
+            await self.shared.close()
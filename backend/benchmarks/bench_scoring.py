@@ -0,0 +1,183 @@
+"""
+Micro-benchmarks for the scoring functions, scalar and batched.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_scoring            # compare against the baseline
+    python -m benchmarks.bench_scoring --save     # record a new baseline
+
+Inputs cover a realistic submission, the whole tech catalog (all 30 tools),
+empty responses and tool lists, and responses full of unknown question ids.
+"""
+import os
+import random
+
+# The scoring code lives in server.py, whose import needs these set
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmarks")
+
+import numpy as np  # noqa: E402
+
+import server  # noqa: E402
+from benchmarks.harness import Benchmark, run  # noqa: E402
+from question_bank import QuestionBank  # noqa: E402
+from scenarios import SCENARIO_LEVERS, evaluate_scenarios, expand_axis, sample_scenarios, simulate_scenarios, solve_scenarios, solver_axis  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline_scoring.json")
+
+BATCH_SIZE = 1000
+SIMULATION_SAMPLES = 20000
+BANK_TOPICS = 50
+BANK_QUESTIONS_PER_TOPIC = 100
+
+QUESTION_IDS = [q["id"] for q in server.ASSESSMENT_QUESTIONS]
+ALL_TOOLS = [tool["id"] for category in server.TECH_CATEGORIES for tool in category["tools"]]
+
+
+def realistic_submission(rng: random.Random):
+    responses = {q_id: rng.choice([0, 25, 50, 75, 100]) for q_id in QUESTION_IDS}
+    tech_tools = rng.sample(ALL_TOOLS, rng.randint(3, 8))
+    return responses, tech_tools
+
+
+def build_inputs():
+    rng = random.Random(42)
+    realistic_responses, realistic_tools = realistic_submission(rng)
+    unknown_responses = {f"unknown_{i}": rng.choice([0, 25, 50, 75, 100]) for i in range(50)}
+    batch = [realistic_submission(rng) for _ in range(BATCH_SIZE)]
+    return {
+        "realistic": (realistic_responses, realistic_tools),
+        "all_tools": (realistic_responses, list(ALL_TOOLS)),
+        "empty": ({}, []),
+        "unknown_ids": (unknown_responses, realistic_tools),
+        "batch": batch
+    }
+
+
+def scalar_benchmarks(inputs):
+    benchmarks = []
+    for case in ("realistic", "all_tools", "empty", "unknown_ids"):
+        responses, tools = inputs[case]
+        reao = server.calculate_reao_scores(responses, tools)
+        assessment_score = server.calculate_assessment_score(responses)
+        tech_score = server.calculate_tech_score(tools)
+
+        # Uncached tech score: straight through the compiled catalog index
+        def tech_score_uncached(tools=tools):
+            index = server.current_model().tech_scorer.index
+            key = index.canonical(tools)
+            return index.score(key) if key else 0.0
+
+        benchmarks += [
+            Benchmark(f"scalar.calculate_reao_scores[{case}]", lambda r=responses, t=tools: server.calculate_reao_scores(r, t)),
+            Benchmark(f"scalar.calculate_assessment_score[{case}]", lambda r=responses: server.calculate_assessment_score(r)),
+            Benchmark(f"scalar.calculate_tech_score[{case}]", lambda t=tools: server.calculate_tech_score(t)),
+            Benchmark(f"scalar.tech_score_uncached[{case}]", tech_score_uncached),
+            Benchmark(f"scalar.get_plane_level[{case}]", lambda a=assessment_score, s=tech_score: server.get_plane_level(a, s)),
+            Benchmark(f"scalar.generate_insights[{case}]", lambda r=responses, t=tools, o=reao: server.generate_insights(r, t, o)),
+            Benchmark(f"scalar.generate_recommendations[{case}]", lambda r=responses, t=tools: server.generate_recommendations(r, t)),
+        ]
+    return benchmarks
+
+
+def batch_benchmarks(inputs):
+    batch = inputs["batch"]
+    responses_list = [responses for responses, _ in batch]
+    tools_list = [tools for _, tools in batch]
+    submissions = [
+        server.AssessmentSubmission(responses=responses, tech_tools=tools, assessment_id=f"bench-{i}")
+        for i, (responses, tools) in enumerate(batch)
+    ]
+
+    def scalar_loop():
+        for responses, tools in batch:
+            assessment_score = server.calculate_assessment_score(responses)
+            tech_score = server.calculate_tech_score(tools)
+            server.calculate_reao_scores(responses, tools)
+            server.get_plane_level(assessment_score, tech_score)
+
+    base_reao = server.calculate_reao_scores(*inputs["realistic"])
+    tech_score = server.calculate_tech_score(inputs["realistic"][1])
+    grid = []
+    for position, lever in enumerate(SCENARIO_LEVERS):
+        shape = [1] * len(SCENARIO_LEVERS)
+        shape[position] = -1
+        grid.append(expand_axis(lever, steps=11).reshape(shape))
+    grid_points = int(np.prod([axis.size for axis in grid]))
+    uncertain_plan = {
+        "budget_pct": {"distribution": "range", "low": 0, "high": 30},
+        "headcount": {"distribution": "normal", "mean": 2, "std": 2},
+        "tech_utilization_pct": {"distribution": "triangular", "low": 0, "mode": 10, "high": 30},
+        "process_maturity_pct": {"distribution": "fixed", "value": 10}
+    }
+
+    def monte_carlo():
+        samples = sample_scenarios(uncertain_plan, SIMULATION_SAMPLES, seed=1)
+        return simulate_scenarios(base_reao, tech_score, server.current_model().plane_thresholds, samples)
+
+    solver_axes = {lever: solver_axis(lever) for lever in SCENARIO_LEVERS}
+    solver_points = int(np.prod([axis.size for axis in solver_axes.values()]))
+    solver_costs = {lever: 1.0 for lever in SCENARIO_LEVERS}
+    solver_target = float(evaluate_scenarios(base_reao, tech_score, (), 0, 0, 0, 0)["combined_score"]) + 0.3
+
+    return [
+        Benchmark("batch.scalar_loop_scores", scalar_loop, items=BATCH_SIZE),
+        Benchmark("batch.engine_scores", lambda: server.current_model().batch_engine.score(responses_list, tools_list), items=BATCH_SIZE),
+        Benchmark("batch.score_submissions", lambda: server.score_submissions(submissions), items=BATCH_SIZE),
+        Benchmark(
+            "batch.scenario_sweep_11x11x11x11",
+            lambda: evaluate_scenarios(base_reao, tech_score, server.current_model().plane_thresholds, *grid),
+            items=grid_points
+        ),
+        Benchmark(f"batch.scenario_simulate_{SIMULATION_SAMPLES}", monte_carlo, items=SIMULATION_SAMPLES),
+        Benchmark(
+            "batch.tool_impacts",
+            lambda: server.current_model().batch_engine.tool_impacts(*inputs["realistic"]),
+            items=len(ALL_TOOLS)
+        ),
+        Benchmark(
+            "batch.scenario_solve_default_grid",
+            lambda: solve_scenarios(
+                base_reao, tech_score, server.current_model().plane_thresholds, solver_axes, solver_costs,
+                target_combined_score=solver_target
+            ),
+            items=solver_points
+        ),
+    ]
+
+
+def bank_benchmarks():
+    """Sparse deep-dive scoring on a synthetic 5000-question bank: cost follows answers, not bank size"""
+    rng = random.Random(11)
+    dimensions = ["readiness", "efficiency", "alignment", "opportunity"]
+    bank = QuestionBank({
+        "version": "bench",
+        "topics": [
+            {
+                "id": f"topic_{t}",
+                "dimensions": {dimension: 1 for dimension in rng.sample(dimensions, 2)},
+                "questions": [{"id": f"topic_{t}_q{q}"} for q in range(BANK_QUESTIONS_PER_TOPIC)]
+            }
+            for t in range(BANK_TOPICS)
+        ]
+    })
+    partial = [{q_id: rng.choice([0, 25, 50, 75, 100]) for q_id in rng.sample(bank.question_ids, 10)}]
+    full = [{q_id: rng.choice([0, 25, 50, 75, 100]) for q_id in bank.question_ids}]
+    partial_batch = [
+        {q_id: rng.choice([0, 25, 50, 75, 100]) for q_id in rng.sample(bank.question_ids, 10)}
+        for _ in range(BATCH_SIZE)
+    ]
+    return [
+        Benchmark(f"bank.score_partial[10 of {len(bank)}]", lambda: bank.score(partial)),
+        Benchmark(f"bank.score_full[{len(bank)}]", lambda: bank.score(full), items=len(bank)),
+        Benchmark("bank.score_partial_batch", lambda: bank.score(partial_batch), items=BATCH_SIZE),
+    ]
+
+
+def benchmarks():
+    inputs = build_inputs()
+    return scalar_benchmarks(inputs) + batch_benchmarks(inputs) + bank_benchmarks()
+
+
+if __name__ == "__main__":
+    run(benchmarks(), BASELINE)
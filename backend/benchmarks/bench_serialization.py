@@ -0,0 +1,173 @@
+"""
+Benchmarks for the response serialization path: legacy vs fast.
+
+"legacy" replays what the endpoints used to do: build and validate an
+AssessmentResult, model_dump() it for MongoDB, then let FastAPI run the model
+(or a raw Mongo dict) through jsonable_encoder and json.dumps. "fast" builds
+the plain result document once and encodes it with serialization.dumps.
+Scoring itself is precomputed so only serialization is measured.
+
+Run from the backend directory (add --memory for peak allocation per call):
+
+    python -m benchmarks.bench_serialization --memory
+    python -m benchmarks.bench_serialization --save
+"""
+import json
+import os
+import random
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmarks")
+
+import numpy as np  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import server  # noqa: E402
+from benchmarks.bench_scoring import realistic_submission  # noqa: E402
+from benchmarks.harness import Benchmark, run  # noqa: E402
+from scenarios import SCENARIO_LEVERS, evaluate_scenarios, expand_axis  # noqa: E402
+from serialization import dumps  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline_serialization.json")
+
+HISTORY_PAGE = 50
+
+
+def starlette_json(content) -> bytes:
+    """What fastapi.responses.JSONResponse.render does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def scored_submission(rng: random.Random):
+    responses, tech_tools = realistic_submission(rng)
+    submission = server.AssessmentSubmission(responses=responses, tech_tools=tech_tools)
+    model = server.current_model()
+    assessment_score = model.assessment_score(responses)
+    tech_score = model.tech_score(tech_tools)
+    reao_scores = model.reao_scores(responses, tech_tools)
+    return submission, {
+        "assessment_score": assessment_score,
+        "tech_score": tech_score,
+        "combined_score": model.combined_score(assessment_score, tech_score),
+        "plane_level": model.plane_level(assessment_score, tech_score),
+        "reao_scores": reao_scores,
+        "insights": model.insights(reao_scores),
+        "recommendations": model.recommendations(responses)
+    }
+
+
+def submit_benchmarks(rng: random.Random):
+    model = server.current_model()
+    submission, scores = scored_submission(rng)
+
+    def legacy():
+        result = server.AssessmentResult(
+            id="bench",
+            responses=submission.responses,
+            tech_tools=submission.tech_tools,
+            model_version=model.version,
+            **scores
+        )
+        result.model_dump()  # document for MongoDB
+        return starlette_json(jsonable_encoder(result))  # FastAPI's response serialization
+
+    def fast():
+        document = server.result_document(
+            model,
+            submission,
+            scores["assessment_score"],
+            scores["tech_score"],
+            scores["combined_score"],
+            scores["plane_level"],
+            scores["reao_scores"],
+            scores["insights"],
+            scores["recommendations"]
+        )
+        return dumps(document)
+
+    return [
+        Benchmark("submit.legacy", legacy),
+        Benchmark("submit.fast", fast)
+    ]
+
+
+def read_benchmarks(rng: random.Random):
+    # Stored documents as they come back from MongoDB (datetime created_at)
+    model = server.current_model()
+    documents = []
+    for _ in range(HISTORY_PAGE):
+        submission, scores = scored_submission(rng)
+        documents.append(server.result_document(
+            model, submission,
+            scores["assessment_score"], scores["tech_score"], scores["combined_score"],
+            scores["plane_level"], scores["reao_scores"], scores["insights"], scores["recommendations"]
+        ))
+    page = {"assessments": documents, "next_cursor": "cursor", "has_more": True}
+
+    return [
+        Benchmark("read.result.legacy", lambda: starlette_json(jsonable_encoder(documents[0]))),
+        Benchmark("read.result.fast", lambda: dumps(documents[0])),
+        Benchmark("read.history.legacy", lambda: starlette_json(jsonable_encoder(page)), items=HISTORY_PAGE),
+        Benchmark("read.history.fast", lambda: dumps(page), items=HISTORY_PAGE)
+    ]
+
+
+def sweep_benchmarks(rng: random.Random):
+    submission, scores = scored_submission(rng)
+    axes = {lever: expand_axis(lever, steps=11) for lever in SCENARIO_LEVERS}
+    grid = []
+    for position, lever in enumerate(SCENARIO_LEVERS):
+        shape = [1] * len(SCENARIO_LEVERS)
+        shape[position] = -1
+        grid.append(axes[lever].reshape(shape))
+    surface = evaluate_scenarios(scores["reao_scores"], scores["tech_score"], server.current_model().plane_thresholds, *grid)
+    points = int(np.prod([axis.size for axis in axes.values()]))
+
+    def legacy():
+        return starlette_json(jsonable_encoder({
+            "axes": {lever: axis.tolist() for lever, axis in axes.items()},
+            "surface": {
+                **{dimension: values.ravel().tolist() for dimension, values in surface["adjusted"].items()},
+                "combined_score": surface["combined_score"].ravel().tolist(),
+                "plane_index": surface["plane_index"].ravel().tolist()
+            }
+        }))
+
+    def fast():
+        return dumps({
+            "axes": axes,
+            "surface": {
+                **{dimension: values.ravel() for dimension, values in surface["adjusted"].items()},
+                "combined_score": surface["combined_score"].ravel(),
+                "plane_index": surface["plane_index"].ravel()
+            }
+        })
+
+    return [
+        Benchmark("sweep.11x11x11x11.legacy", legacy, items=points),
+        Benchmark("sweep.11x11x11x11.fast", fast, items=points)
+    ]
+
+
+def benchmarks():
+    rng = random.Random(7)
+    return submit_benchmarks(rng) + read_benchmarks(rng) + sweep_benchmarks(rng)
+
+
+def savings(results):
+    """Print fast vs legacy for each pair that ran"""
+    print("\nfast vs legacy:")
+    for name, legacy in results.items():
+        if not name.endswith(".legacy"):
+            continue
+        fast = results.get(name[:-len(".legacy")] + ".fast")
+        if fast is None:
+            continue
+        line = f"  {name[:-len('.legacy')]:<30} {legacy['median_ns'] / fast['median_ns']:>6.1f}x faster"
+        if "peak_alloc_bytes" in legacy and fast["peak_alloc_bytes"]:
+            line += f", {legacy['peak_alloc_bytes'] / fast['peak_alloc_bytes']:>6.1f}x less peak memory"
+        print(line)
+
+
+if __name__ == "__main__":
+    run(benchmarks(), BASELINE, summary=savings)
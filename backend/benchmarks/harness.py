@@ -0,0 +1,185 @@
+"""
+Minimal micro-benchmark harness with baseline regression gates.
+
+Each benchmark is calibrated to run for roughly `target_seconds` per repeat,
+repeated several times, and reported as nanoseconds per call (median and
+min across repeats). Results can be saved as a JSON baseline and later runs
+compared against it: the run fails when a benchmark's best repeat is slower
+than its baseline by more than the threshold.
+
+Baselines are machine-specific; re-record them (--save) on the machine that
+runs the gate.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[[], Any]
+    # Calls represented by one func() invocation, e.g. the size of a batch
+    items: int = 1
+
+
+def measure(benchmark: Benchmark, repeats: int = 5, target_seconds: float = 0.2) -> Dict[str, Any]:
+    """Time a benchmark, returning per-call (and per-item) nanoseconds"""
+    func = benchmark.func
+    func()  # warm up caches, lazy imports, etc.
+
+    # Calibrate the loop count so one repeat takes about target_seconds
+    loops = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter_ns() - started
+        if elapsed >= target_seconds * 1e9 / 5 or loops >= 1 << 20:
+            break
+        loops *= 4
+    loops = max(1, int(loops * target_seconds * 1e9 / max(elapsed, 1)))
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter_ns() - started) / loops)
+
+    median = statistics.median(timings)
+    return {
+        "median_ns": median,
+        "min_ns": min(timings),
+        "per_item_ns": median / benchmark.items,
+        "items": benchmark.items,
+        "loops": loops,
+        "repeats": repeats
+    }
+
+
+def measure_allocations(benchmark: Benchmark, calls: int = 20) -> Dict[str, Any]:
+    """Peak memory allocated during one call (median over calls), via tracemalloc"""
+    func = benchmark.func
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return {"peak_alloc_bytes": statistics.median(peaks)}
+
+
+def environment() -> Dict[str, Any]:
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "recorded_at": datetime.now(timezone.utc).isoformat()
+    }
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """
+    Benchmarks (with details) slower than baseline * (1 + threshold).
+    Compares the best repeat, which is far less sensitive to scheduler noise
+    than the median.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        ratio = result["min_ns"] / reference["min_ns"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {result['min_ns']:.0f} ns vs baseline {reference['min_ns']:.0f} ns "
+                f"({(ratio - 1) * 100:+.1f}%)"
+            )
+    return regressions
+
+
+def main(
+    benchmarks: List[Benchmark],
+    default_baseline: str,
+    argv: Optional[List[str]] = None,
+    summary: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None
+) -> int:
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks and gate on regressions")
+    parser.add_argument("--baseline", default=default_baseline, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Record this run as the new baseline")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("BENCH_THRESHOLD", "0.25")),
+                        help="Allowed slowdown vs baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--target-seconds", type=float, default=0.2)
+    parser.add_argument("--memory", action="store_true", help="Also record peak allocation per call (tracemalloc)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for benchmark in benchmarks:
+        if args.filter not in benchmark.name:
+            continue
+        result = measure(benchmark, args.repeats, args.target_seconds)
+        if args.memory:
+            result.update(measure_allocations(benchmark))
+        results[benchmark.name] = result
+        per_item = f"  ({result['per_item_ns']:>10.0f} ns/item)" if benchmark.items > 1 else ""
+        memory = f"  {result['peak_alloc_bytes'] / 1024:>10.1f} KiB peak" if args.memory else ""
+        print(f"{benchmark.name:<48} {result['median_ns']:>14.0f} ns/call{per_item}{memory}")
+    if summary is not None:
+        summary(results)
+
+    report = {"environment": environment(), "threshold": args.threshold, "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+def run(benchmarks: List[Benchmark], default_baseline: str, summary=None):
+    sys.exit(main(benchmarks, default_baseline, summary=summary))
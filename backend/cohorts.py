@@ -0,0 +1,263 @@
+"""
+Incrementally maintained cohort benchmarks.
+
+Instead of scanning the assessments collection to answer "how do I compare",
+a single rollup document keeps fixed-width histograms of every REAO dimension
+and score, plane-level counts and per-tool adoption counts. Submits and
+deletes add their delta to an in-memory accumulator (off the request path),
+and flush() writes everything accumulated with one atomic $inc, so several
+workers can share the rollup; each worker keeps an in-memory copy, refreshed
+every few seconds, from which percentiles are read in constant time.
+
+Concurrent batch resubmits of the same assessments can make the rollup drift
+slightly; rebuild() recomputes it from the collection.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+ROLLUP_ID = "assessments"
+
+# Histogrammed metrics and their value ranges (out-of-range values land in the edge bins)
+COHORT_METRICS = {
+    "readiness": (0, 100),
+    "efficiency": (0, 100),
+    "alignment": (0, 100),
+    "opportunity": (0, 100),
+    "assessment_score": (0, 100),
+    "tech_score": (0, 10),
+    "combined_score": (0, 10)
+}
+
+REAO_METRICS = ["readiness", "efficiency", "alignment", "opportunity"]
+
+COHORT_QUANTILES = [10, 25, 50, 75, 90]
+
+# Fields a rollup contribution is computed from
+ROLLUP_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "reao_scores": 1,
+    "assessment_score": 1,
+    "tech_score": 1,
+    "combined_score": 1,
+    "plane_level": 1,
+    "tech_tools": 1
+}
+
+
+def metric_values(doc: Dict[str, Any]) -> Dict[str, float]:
+    reao = doc.get("reao_scores") or {}
+    values = {metric: reao.get(metric, 0) for metric in REAO_METRICS}
+    for metric in ("assessment_score", "tech_score", "combined_score"):
+        values[metric] = doc.get(metric, 0)
+    return values
+
+
+class CohortRollup:
+    """Histograms, plane-level counts and tool adoption counts for all assessments"""
+
+    def __init__(self, plane_names: List[str], tool_ids: Iterable[str], bins: int = 1000):
+        self.plane_names = list(plane_names)
+        self.tool_ids = set(tool_ids)
+        self.bins = bins
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.histograms = {metric: np.zeros(self.bins, dtype=np.int64) for metric in COHORT_METRICS}
+        self.plane_levels = {name: 0 for name in self.plane_names}
+        self.tools: Dict[str, int] = {}
+
+    def bin_index(self, metric: str, value: float) -> int:
+        low, high = COHORT_METRICS[metric]
+        index = int((value - low) / (high - low) * self.bins)
+        return min(self.bins - 1, max(0, index))
+
+    def _contribution(self, doc: Dict[str, Any]) -> Dict[str, int]:
+        """Flat {field path: count} contribution of one document to the rollup"""
+        fields = {"count": 1}
+        for metric, value in metric_values(doc).items():
+            fields[f"histograms.{metric}.{self.bin_index(metric, value)}"] = 1
+        plane = (doc.get("plane_level") or {}).get("name")
+        if plane in self.plane_names:
+            fields[f"plane_levels.{plane}"] = 1
+        for tool_id in set(doc.get("tech_tools") or []):
+            # Only catalog tools: arbitrary ids could contain '.' or '$'
+            if tool_id in self.tool_ids:
+                fields[f"tools.{tool_id}"] = 1
+        return fields
+
+    def delta(self, added: Iterable[Dict[str, Any]] = (), removed: Iterable[Dict[str, Any]] = ()) -> Dict[str, int]:
+        """Net $inc document for adding and removing assessments"""
+        increments: Dict[str, int] = {}
+        for docs, sign in ((added, 1), (removed, -1)):
+            for doc in docs:
+                for path, amount in self._contribution(doc).items():
+                    increments[path] = increments.get(path, 0) + sign * amount
+        return {path: amount for path, amount in increments.items() if amount}
+
+    def apply(self, increments: Dict[str, int]):
+        """Apply a $inc document to the in-memory copy"""
+        for path, amount in increments.items():
+            parts = path.split(".", 2)
+            if parts[0] == "count":
+                self.count += amount
+            elif parts[0] == "histograms":
+                self.histograms[parts[1]][int(parts[2])] += amount
+            elif parts[0] == "plane_levels":
+                self.plane_levels[parts[1]] = self.plane_levels.get(parts[1], 0) + amount
+            elif parts[0] == "tools":
+                tool_id = path.split(".", 1)[1]
+                self.tools[tool_id] = self.tools.get(tool_id, 0) + amount
+
+    def load(self, doc: Optional[Dict[str, Any]]):
+        self.reset()
+        if not doc:
+            return
+        self.count = doc.get("count", 0)
+        for metric, counts in (doc.get("histograms") or {}).items():
+            if metric in self.histograms:
+                for index, amount in counts.items():
+                    self.histograms[metric][int(index)] = amount
+        for name, amount in (doc.get("plane_levels") or {}).items():
+            self.plane_levels[name] = amount
+        self.tools = dict(doc.get("tools") or {})
+
+    def to_doc(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "histograms": {
+                metric: {str(index): int(counts[index]) for index in np.flatnonzero(counts)}
+                for metric, counts in self.histograms.items()
+            },
+            "plane_levels": dict(self.plane_levels),
+            "tools": dict(self.tools),
+            "bins": self.bins
+        }
+
+    # ------------------------------------------------------------------
+    # Queries (cost depends on the bin count, not the number of assessments)
+    # ------------------------------------------------------------------
+
+    def percentile(self, metric: str, value: float) -> Optional[float]:
+        """Percentile rank of value: share of assessments below it (half of its own bin)"""
+        counts = self.histograms[metric]
+        total = counts.sum()
+        if total <= 0:
+            return None
+        index = self.bin_index(metric, value)
+        below = counts[:index].sum()
+        return float((below + 0.5 * counts[index]) / total * 100)
+
+    def quantiles(self, metric: str, quantiles: List[int] = COHORT_QUANTILES) -> Dict[str, Optional[float]]:
+        """Approximate quantiles (bin midpoints) of a metric across the cohort"""
+        counts = self.histograms[metric]
+        total = counts.sum()
+        if total <= 0:
+            return {f"p{q}": None for q in quantiles}
+        low, high = COHORT_METRICS[metric]
+        width = (high - low) / self.bins
+        cumulative = np.cumsum(counts)
+        result = {}
+        for q in quantiles:
+            index = int(np.searchsorted(cumulative, q / 100 * total, side="left"))
+            result[f"p{q}"] = low + (min(index, self.bins - 1) + 0.5) * width
+        return result
+
+    def adoption(self, tool_id: str) -> float:
+        return self.tools.get(tool_id, 0) / self.count if self.count > 0 else 0.0
+
+
+class CohortBenchmarks:
+    """
+    Keeps the rollup document in MongoDB and a periodically refreshed local copy.
+    plane_names is called whenever a delta is computed, so a reloaded scoring
+    model's plane levels are counted from then on.
+    """
+
+    def __init__(self, plane_names: Callable[[], Iterable[str]], tool_ids: Iterable[str], refresh_seconds: float = 5.0, bins: int = 1000):
+        self.plane_names = plane_names
+        self.rollup = CohortRollup(plane_names(), tool_ids, bins)
+        self.refresh_seconds = refresh_seconds
+        self._loaded_at: Optional[float] = None
+        # Applied to the local copy, not yet written to the stored rollup
+        self._unflushed: Dict[str, int] = {}
+        # Held while the stored rollup is written or read back, so a reload never
+        # runs between a flush's $inc and the removal of what it wrote from _unflushed
+        self._lock = asyncio.Lock()
+
+    def _accumulate(self, increments: Dict[str, int]):
+        for path, amount in increments.items():
+            self._unflushed[path] = self._unflushed.get(path, 0) + amount
+
+    def add(self, added: Iterable[Dict[str, Any]] = (), removed: Iterable[Dict[str, Any]] = ()):
+        """Apply the delta of added/removed assessments locally; flush() stores it"""
+        self.rollup.plane_names = list(self.plane_names())
+        increments = self.rollup.delta(added, removed)
+        self._accumulate(increments)
+        self.rollup.apply(increments)
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    async def flush(self, db):
+        """
+        Write the accumulated delta to the stored rollup with one $inc. It
+        leaves _unflushed only once written; a failed write is kept for the
+        next flush.
+        """
+        async with self._lock:
+            increments = {path: amount for path, amount in self._unflushed.items() if amount}
+            if not increments:
+                return
+            await db.cohort_stats.update_one(
+                {"_id": ROLLUP_ID},
+                {"$inc": increments, "$set": {"updated_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+            # add() may have accumulated more while the write was in flight
+            self._accumulate({path: -amount for path, amount in increments.items()})
+            self._unflushed = {path: amount for path, amount in self._unflushed.items() if amount}
+
+    async def current(self, db) -> CohortRollup:
+        """The local rollup, reloaded from MongoDB when older than refresh_seconds"""
+        if self._stale():
+            async with self._lock:
+                if self._stale():
+                    self.rollup.plane_names = list(self.plane_names())
+                    self.rollup.load(await db.cohort_stats.find_one({"_id": ROLLUP_ID}))
+                    self.rollup.apply(self._unflushed)
+                    self._loaded_at = time.monotonic()
+        return self.rollup
+
+    async def rebuild(self, db, batch_size: int = 1000) -> Dict[str, Any]:
+        """Recompute the rollup from every stored assessment and replace it"""
+        async with self._lock:
+            return await self._rebuild(db, batch_size)
+
+    async def _rebuild(self, db, batch_size: int) -> Dict[str, Any]:
+        # Deltas accumulated so far are for documents the scan reads anyway
+        self._unflushed = {}
+        rebuilt = CohortRollup(self.plane_names(), self.rollup.tool_ids, self.rollup.bins)
+        cursor = db.assessments.find({}, ROLLUP_PROJECTION).batch_size(batch_size)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                rebuilt.apply(rebuilt.delta(added=batch))
+                batch = []
+        if batch:
+            rebuilt.apply(rebuilt.delta(added=batch))
+
+        doc = rebuilt.to_doc()
+        doc["updated_at"] = datetime.now(timezone.utc)
+        doc["rebuilt_at"] = doc["updated_at"]
+        await db.cohort_stats.replace_one({"_id": ROLLUP_ID}, doc, upsert=True)
+
+        self.rollup = rebuilt
+        self._loaded_at = time.monotonic()
+        return {"count": rebuilt.count, "rebuilt_at": doc["rebuilt_at"]}
@@ -0,0 +1,208 @@
+"""
+MongoDB client lifecycle: configuration, connection-pool warm-up and probes.
+
+The client is created in the app's lifespan instead of at import, with pool
+size, timeouts and wire compression taken from the environment. Before the
+app takes traffic, warm_up() runs server selection and opens minPoolSize
+connections, so the first requests after a deploy don't pay for
+connection setup. PoolMonitor follows pool events to report utilization
+for the /healthz and /readyz probes.
+
+Settings (environment):
+    MONGO_URL, DB_NAME                  required
+    MONGO_MAX_POOL_SIZE                 default 100
+    MONGO_MIN_POOL_SIZE                 default 10 (connections opened at startup)
+    MONGO_MAX_IDLE_TIME_MS              default 300000
+    MONGO_CONNECT_TIMEOUT_MS            default 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS   default 5000
+    MONGO_SOCKET_TIMEOUT_MS             default 30000 (0 = none)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS         default 5000 (0 = none)
+    MONGO_COMPRESSORS                   e.g. "zstd,snappy,zlib" (default none)
+
+zstd needs the `zstandard` package and snappy `python-snappy`; neither is a
+requirement. Compressors whose package is missing are dropped with a warning
+(pymongo would ignore them silently), and zlib, from the standard library,
+is used when none of the requested ones is available.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Wire compressors: (module pymongo imports, package providing it); zlib is built in
+COMPRESSORS = {
+    "zstd": ("zstandard", "zstandard"),
+    "snappy": ("snappy", "python-snappy"),
+    "zlib": (None, None)
+}
+
+
+def available_compressors(requested: str) -> List[str]:
+    """The requested compressors usable here, in order of preference"""
+    names = [name.strip().lower() for name in requested.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COMPRESSORS]
+    if unknown:
+        raise ValueError(f"Unknown MongoDB compressors: {', '.join(unknown)} (expected {', '.join(COMPRESSORS)})")
+
+    available = []
+    for name in names:
+        module, package = COMPRESSORS[name]
+        if module is None or importlib.util.find_spec(module) is not None:
+            available.append(name)
+        else:
+            logger.warning(f"MongoDB compressor {name} needs the {package} package; not using it")
+    if names and not available:
+        logger.warning("None of the requested MongoDB compressors is available; falling back to zlib")
+        available.append("zlib")
+    return available
+
+
+@dataclass(frozen=True)
+class MongoSettings:
+    url: str
+    db_name: str
+    max_pool_size: int = 100
+    min_pool_size: int = 10
+    max_idle_time_ms: int = 300000
+    connect_timeout_ms: int = 5000
+    server_selection_timeout_ms: int = 5000
+    socket_timeout_ms: int = 30000
+    wait_queue_timeout_ms: int = 5000
+    compressors: str = ""
+
+    @classmethod
+    def from_env(cls) -> "MongoSettings":
+        url = os.environ.get('MONGO_URL')
+        db_name = os.environ.get('DB_NAME')
+        if not url or not db_name:
+            raise ValueError("MONGO_URL and DB_NAME must be set in environment variables (Replit Secrets)")
+        return cls(
+            url=url,
+            db_name=db_name,
+            max_pool_size=int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+            min_pool_size=int(os.environ.get('MONGO_MIN_POOL_SIZE', '10')),
+            max_idle_time_ms=int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000')),
+            connect_timeout_ms=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+            server_selection_timeout_ms=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+            socket_timeout_ms=int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '30000')),
+            wait_queue_timeout_ms=int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+            compressors=os.environ.get('MONGO_COMPRESSORS', '')
+        )
+
+    def client_options(self) -> Dict[str, Any]:
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": min(self.min_pool_size, self.max_pool_size),
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            # 0 means "no timeout" in the environment; pymongo wants None for that
+            "socketTimeoutMS": self.socket_timeout_ms or None,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms or None
+        }
+        compressors = available_compressors(self.compressors)
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        return options
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections across every pool of the client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.created = 0
+        self.checkout_failures = 0
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+            self.created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    # Remaining events aren't needed for the counts
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def stats(self, max_pool_size: int) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "max_pool_size": max_pool_size,
+                "utilization": self.checked_out / max_pool_size if max_pool_size else 0.0,
+                "created": self.created,
+                "checkout_failures": self.checkout_failures
+            }
+
+
+def create_client(settings: MongoSettings, event_listeners: Optional[List[Any]] = None):
+    return AsyncIOMotorClient(
+        settings.url,
+        # BSON dates come back as UTC-aware datetimes (serialized with +00:00)
+        tz_aware=True,
+        event_listeners=event_listeners or [],
+        **settings.client_options()
+    )
+
+
+async def ping(client) -> float:
+    """Round-trip a ping command; returns the latency in seconds"""
+    started = time.perf_counter()
+    await client.admin.command("ping")
+    return time.perf_counter() - started
+
+
+async def warm_up(client, connections: int) -> Dict[str, Any]:
+    """
+    Select a server, then open `connections` pooled connections by running
+    that many pings concurrently (each concurrent checkout needs its own)
+    """
+    started = time.perf_counter()
+    await ping(client)
+    if connections > 1:
+        await asyncio.gather(*(ping(client) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    logger.info(f"MongoDB pool warmed with {connections} connections in {elapsed * 1000:.0f} ms")
+    return {"connections": connections, "seconds": elapsed}
@@ -0,0 +1,149 @@
+"""
+Index bootstrapping and data migrations for the assessments collection.
+
+ensure_indexes() runs at startup and creates the indexes the API relies on:
+a unique index on `id` (results, delete, scenario lookups) and a descending
+(created_at, id) index backing the history sort and keyset pagination. When a
+retention period is configured it also maintains a TTL index on created_at.
+
+migrate_created_at() converts legacy ISO-string timestamps to BSON dates in
+batches. Progress is checkpointed in the `migrations` collection, so an
+interrupted run resumes where it stopped; it only selects documents whose
+created_at is still a string, so re-running it is always safe. Values that
+can't be parsed are left as they are and flagged (created_at_unparseable), so
+they don't make every startup scan the collection again.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+ASSESSMENT_INDEXES = [
+    IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id_desc"),
+    # Finds results scored with an older scoring model
+    IndexModel([("model_version", ASCENDING)], name="model_version")
+]
+
+RETENTION_INDEX_NAME = "created_at_ttl"
+
+CREATED_AT_MIGRATION = "created_at_to_date"
+
+# Documents the created_at migration still has to convert
+UNMIGRATED_CREATED_AT = {"created_at": {"$type": "string"}, "created_at_unparseable": {"$ne": True}}
+
+
+async def ensure_indexes(db, retention_seconds: Optional[int] = None):
+    """Create the assessment indexes and apply (or remove) the retention TTL"""
+    await db.assessments.create_indexes(ASSESSMENT_INDEXES)
+
+    existing = await db.assessments.index_information()
+    ttl_index = existing.get(RETENTION_INDEX_NAME)
+
+    if retention_seconds:
+        if ttl_index is None:
+            await db.assessments.create_index(
+                [("created_at", ASCENDING)],
+                name=RETENTION_INDEX_NAME,
+                expireAfterSeconds=retention_seconds
+            )
+        elif ttl_index.get("expireAfterSeconds") != retention_seconds:
+            await db.command(
+                "collMod", "assessments",
+                index={"name": RETENTION_INDEX_NAME, "expireAfterSeconds": retention_seconds}
+            )
+    elif ttl_index is not None:
+        await db.assessments.drop_index(RETENTION_INDEX_NAME)
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse a stored ISO timestamp; naive values are taken as UTC"""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+async def migrate_created_at(db, batch_size: int = 500, pause: float = 0.0) -> Dict[str, Any]:
+    """Convert string created_at values to BSON dates, resuming from the last checkpoint"""
+    state = await db.migrations.find_one({"_id": CREATED_AT_MIGRATION}) or {}
+    if state.get("status") == "complete":
+        # Documents written by an older server version may have appeared since
+        if not await db.assessments.find_one(UNMIGRATED_CREATED_AT, {"_id": 1}):
+            return state
+        state = {}
+
+    last_id = state.get("last_id")
+    converted = state.get("converted", 0)
+    skipped = state.get("skipped", 0)
+
+    while True:
+        query: Dict[str, Any] = dict(UNMIGRATED_CREATED_AT)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = await db.assessments.find(
+            query,
+            {"_id": 1, "created_at": 1}
+        ).sort("_id", ASCENDING).limit(batch_size).to_list(batch_size)
+
+        if not batch:
+            break
+
+        operations = []
+        unparseable = []
+        for doc in batch:
+            parsed = parse_timestamp(doc["created_at"])
+            if parsed is None:
+                unparseable.append(doc["_id"])
+                continue
+            # Guard on the old value so a concurrent rewrite of the document wins
+            operations.append(UpdateOne(
+                {"_id": doc["_id"], "created_at": doc["created_at"]},
+                {"$set": {"created_at": parsed}}
+            ))
+
+        if operations:
+            result = await db.assessments.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+        if unparseable:
+            # Flagged so neither this loop nor the startup check selects them again
+            await db.assessments.update_many(
+                {"_id": {"$in": unparseable}, "created_at": {"$type": "string"}},
+                {"$set": {"created_at_unparseable": True}}
+            )
+            skipped += len(unparseable)
+
+        last_id = batch[-1]["_id"]
+        await db.migrations.update_one(
+            {"_id": CREATED_AT_MIGRATION},
+            {"$set": {
+                "status": "running",
+                "last_id": last_id,
+                "converted": converted,
+                "skipped": skipped,
+                "updated_at": datetime.now(timezone.utc)
+            }},
+            upsert=True
+        )
+
+        if pause:
+            await asyncio.sleep(pause)
+
+    state = {
+        "status": "complete",
+        "last_id": last_id,
+        "converted": converted,
+        "skipped": skipped,
+        "updated_at": datetime.now(timezone.utc)
+    }
+    await db.migrations.update_one({"_id": CREATED_AT_MIGRATION}, {"$set": state}, upsert=True)
+    logger.info(f"created_at migration complete: {converted} converted, {skipped} unparseable")
+    return state
@@ -0,0 +1,185 @@
+"""
+Constant-memory streaming export of stored assessments.
+
+The collection is read through a Motor cursor in batches and each batch is
+encoded and handed to the StreamingResponse before the next one is fetched,
+so memory stays flat regardless of how many assessments exist. Rows are
+flattened: one column per score, REAO dimension and assessment question
+response. Deep-dive answers (question bank ids, thousands of possible
+columns) go into one `other_responses` column as a JSON object, next to the
+`question_bank_version` they were scored with.
+
+Formats: ndjson (full documents, encoded like API responses), csv, and the
+columnar parquet / arrow (IPC stream) formats. These use pyarrow directly
+rather than pandas: DataFrame.to_parquet writes a whole file at once, while
+pyarrow's ParquetWriter appends one row group per batch. pyarrow stays
+optional here; without it the columnar formats are unavailable.
+"""
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from db_maintenance import parse_timestamp
+from serialization import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows")
+}
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+REAO_COLUMNS = ["readiness", "efficiency", "alignment", "opportunity"]
+SCORE_COLUMNS = ["assessment_score", "tech_score", "combined_score"]
+
+
+def export_columns(question_ids: List[str]) -> List[str]:
+    return (
+        ["id", "created_at"]
+        + SCORE_COLUMNS
+        + ["plane_level"]
+        + REAO_COLUMNS
+        + ["tech_tool_count", "tech_tools"]
+        + [f"response_{q_id}" for q_id in question_ids]
+        + ["question_bank_version", "other_responses"]
+    )
+
+
+def flatten_assessment(doc: Dict[str, Any], question_ids: List[str]) -> Dict[str, Any]:
+    """One flat row per assessment; missing values become None"""
+    created_at = doc.get("created_at")
+    if isinstance(created_at, str):
+        created_at = parse_timestamp(created_at)
+
+    reao = doc.get("reao_scores") or {}
+    responses = doc.get("responses") or {}
+    tech_tools = doc.get("tech_tools") or []
+    plane_level = doc.get("plane_level") or {}
+
+    row = {"id": doc.get("id"), "created_at": created_at}
+    for column in SCORE_COLUMNS:
+        row[column] = doc.get(column)
+    row["plane_level"] = plane_level.get("name")
+    for column in REAO_COLUMNS:
+        row[column] = reao.get(column)
+    row["tech_tool_count"] = len(tech_tools)
+    row["tech_tools"] = ";".join(tech_tools)
+    for q_id in question_ids:
+        row[f"response_{q_id}"] = responses.get(q_id)
+    row["question_bank_version"] = doc.get("question_bank_version")
+    columns = set(question_ids)
+    other = {q_id: value for q_id, value in responses.items() if q_id not in columns}
+    row["other_responses"] = dumps(other).decode("utf-8") if other else None
+    return row
+
+
+async def iter_batches(collection, batch_size: int, query: Optional[Dict[str, Any]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield the matching documents in lists of at most batch_size, in _id order"""
+    cursor = collection.find(query or {}).sort("_id", 1).batch_size(batch_size)
+    batch = []
+    async for doc in cursor:
+        doc.pop("_id", None)
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def ndjson_stream(collection, batch_size: int, query=None) -> AsyncIterator[bytes]:
+    async for batch in iter_batches(collection, batch_size, query):
+        yield b"".join(dumps(doc) + b"\n" for doc in batch)
+
+
+async def csv_stream(collection, batch_size: int, question_ids: List[str], query=None) -> AsyncIterator[bytes]:
+    columns = export_columns(question_ids)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+
+    async for batch in iter_batches(collection, batch_size, query):
+        buffer.seek(0)
+        buffer.truncate()
+        for doc in batch:
+            row = flatten_assessment(doc, question_ids)
+            if row["created_at"] is not None:
+                row["created_at"] = row["created_at"].isoformat()
+            writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def arrow_schema(question_ids: List[str]):
+    fields = [
+        pa.field("id", pa.string()),
+        pa.field("created_at", pa.timestamp("us", tz="UTC"))
+    ]
+    fields += [pa.field(column, pa.float64()) for column in SCORE_COLUMNS]
+    fields.append(pa.field("plane_level", pa.string()))
+    fields += [pa.field(column, pa.float64()) for column in REAO_COLUMNS]
+    fields.append(pa.field("tech_tool_count", pa.int64()))
+    fields.append(pa.field("tech_tools", pa.string()))
+    fields += [pa.field(f"response_{q_id}", pa.int64()) for q_id in question_ids]
+    fields.append(pa.field("question_bank_version", pa.string()))
+    fields.append(pa.field("other_responses", pa.string()))
+    return pa.schema(fields)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def columnar_stream(collection, batch_size: int, question_ids: List[str], fmt: str, query=None) -> AsyncIterator[bytes]:
+    """Parquet (one row group per batch) or Arrow IPC stream (one record batch per batch)"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for parquet/arrow exports")
+
+    schema = arrow_schema(question_ids)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        async for batch in iter_batches(collection, batch_size, query):
+            rows = [flatten_assessment(doc, question_ids) for doc in batch]
+            table = pa.Table.from_pylist(rows, schema=schema)
+            writer.write_table(table)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,372 @@
+"""
+Chunked background ingestion of bulk assessment uploads.
+
+An upload (CSV or NDJSON) is spooled to a temporary file as it arrives, then a
+background task reads it back in chunks of rows: each chunk is parsed and
+validated off the event loop, its valid rows are scored in one vectorized pass
+and bulk-upserted, and the job's progress is reported before the next chunk is
+read. At most one chunk of rows is held in memory, so memory stays flat
+regardless of the file size.
+
+Formats:
+
+- csv: the columns of the CSV export (export.py). `id` (optional) is the
+  assessment id, `created_at` (optional, ISO 8601) is kept, `response_<q_id>`
+  columns hold the responses and `tech_tools` the tool ids separated by ";".
+  Score columns are ignored and recomputed, so an export can be re-imported.
+- ndjson: one object per line with `responses`, `tech_tools` and optionally
+  `id` (or `assessment_id`) and `created_at`, like the NDJSON export.
+
+Rows are validated against the assessment questions (known question ids and
+one of each question's option values) and the tech catalog (known tool ids).
+Invalid rows are skipped and reported with their row number; the job keeps
+at most `max_errors` of them.
+
+A row without an id gets one derived from the job's upload key (by default
+the SHA-256 of the file) and its row number, so uploading the same file again
+updates its assessments instead of adding copies.
+"""
+import asyncio
+import csv
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from db_maintenance import parse_timestamp
+
+INGEST_FORMATS = ("csv", "ndjson")
+
+RESPONSE_PREFIX = "response_"
+
+# Namespace of the uuid5 ids given to upload rows without an id
+UPLOAD_ID_NAMESPACE = uuid.UUID("6f1c2f0e-3b9a-5d4e-9a57-0c1e8b7d2a41")
+
+
+class IngestError(ValueError):
+    """The upload as a whole can't be ingested (unknown format, unreadable file)"""
+
+
+class RowError(ValueError):
+    """One row is invalid; it is skipped and reported"""
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """Upload format from an explicit choice, the file extension or the content type"""
+    if requested:
+        if requested not in INGEST_FORMATS:
+            raise IngestError(f"Unsupported format '{requested}' (expected one of {', '.join(INGEST_FORMATS)})")
+        return requested
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension in ("csv", "ndjson"):
+        return extension
+    if extension == "jsonl":
+        return "ndjson"
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type == "text/csv":
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    raise IngestError("Can't tell the upload format from the filename or Content-Type; pass format=csv or format=ndjson")
+
+
+class RowValidator:
+    """Checks rows against the assessment questions and the tech catalog"""
+
+    def __init__(self, questions: List[Dict[str, Any]], tech_categories: List[Dict[str, Any]]):
+        self.options = {question["id"]: {option["value"] for option in question["options"]} for question in questions}
+        self.tool_ids = {tool["id"] for category in tech_categories for tool in category["tools"]}
+
+    def validate(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalized record (assessment_id, responses, tech_tools, created_at); raises RowError"""
+        errors = []
+
+        assessment_id = record.get("id", record.get("assessment_id"))
+        if assessment_id in ("", None):
+            assessment_id = None
+        elif not isinstance(assessment_id, str):
+            errors.append("id must be a string")
+
+        responses = record.get("responses")
+        if not isinstance(responses, dict) or not responses:
+            errors.append("No responses")
+            responses = {}
+        for q_id, value in responses.items():
+            options = self.options.get(q_id)
+            if options is None:
+                errors.append(f"Unknown question '{q_id}'")
+            elif isinstance(value, bool) or not isinstance(value, int) or value not in options:
+                errors.append(f"Invalid response to '{q_id}': {value!r} (expected one of {sorted(options)})")
+
+        tech_tools = record.get("tech_tools") or []
+        if not isinstance(tech_tools, list):
+            errors.append("tech_tools must be a list")
+            tech_tools = []
+        for tool_id in tech_tools:
+            if tool_id not in self.tool_ids:
+                errors.append(f"Unknown tool '{tool_id}'")
+
+        raw_created_at = record.get("created_at")
+        created_at = None
+        if raw_created_at not in ("", None):
+            created_at = parse_timestamp(raw_created_at) if isinstance(raw_created_at, str) else None
+            if created_at is None:
+                errors.append(f"Invalid created_at: {raw_created_at!r}")
+
+        if errors:
+            raise RowError("; ".join(errors))
+        return {
+            "assessment_id": assessment_id,
+            "responses": responses,
+            "tech_tools": tech_tools,
+            "created_at": created_at
+        }
+
+
+def _csv_value(column: str, value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            number = float(value)
+        except ValueError:
+            raise RowError(f"{column} is not a number: {value!r}") from None
+        if not number.is_integer():
+            raise RowError(f"{column} is not an integer: {value!r}")
+        return int(number)
+
+
+def csv_record(row: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """An export-style CSV row as an upload record"""
+    if None in row:
+        raise RowError("More values than columns")
+    responses = {}
+    for column, value in row.items():
+        if column.startswith(RESPONSE_PREFIX) and value not in ("", None):
+            responses[column[len(RESPONSE_PREFIX):]] = _csv_value(column, value.strip())
+    tools = row.get("tech_tools") or ""
+    return {
+        "id": (row.get("id") or "").strip(),
+        "created_at": (row.get("created_at") or "").strip(),
+        "responses": responses,
+        "tech_tools": [tool_id.strip() for tool_id in tools.split(";") if tool_id.strip()]
+    }
+
+
+def ndjson_record(line: str) -> Dict[str, Any]:
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise RowError(f"Invalid JSON: {str(e)}") from None
+    if not isinstance(record, dict):
+        raise RowError("Each line must be a JSON object")
+    return record
+
+
+class UploadReader:
+    """
+    Rows of a spooled upload file, read incrementally. Lines longer than
+    max_row_bytes fail the job rather than being read into memory whole.
+    """
+
+    def __init__(self, path: str, fmt: str, max_row_bytes: int):
+        if fmt not in INGEST_FORMATS:
+            raise IngestError(f"Unsupported format '{fmt}'")
+        self.format = fmt
+        self.max_row_bytes = max_row_bytes
+        self.size = os.path.getsize(path)
+        self.bytes_read = 0
+        self._file = open(path, "rb")
+        self._rows = self._csv_rows() if fmt == "csv" else self._ndjson_rows()
+
+    def _lines(self) -> Iterator[str]:
+        first = True
+        while True:
+            raw = self._file.readline(self.max_row_bytes + 1)
+            if not raw:
+                return
+            if len(raw) > self.max_row_bytes:
+                raise IngestError(f"A line exceeds the {self.max_row_bytes} byte row limit")
+            self.bytes_read += len(raw)
+            try:
+                line = raw.decode("utf-8-sig" if first else "utf-8")
+            except UnicodeDecodeError:
+                raise IngestError("The upload is not UTF-8 text") from None
+            first = False
+            yield line
+
+    def _csv_rows(self) -> Iterator[Tuple[int, Any]]:
+        reader = csv.DictReader(self._lines())
+        if reader.fieldnames is None:
+            return
+        if not any(column.startswith(RESPONSE_PREFIX) for column in reader.fieldnames):
+            raise IngestError(f"The CSV header has no {RESPONSE_PREFIX}<question_id> columns")
+        for number, row in enumerate(reader, start=1):
+            try:
+                yield number, csv_record(row)
+            except RowError as e:
+                yield number, e
+
+    def _ndjson_rows(self) -> Iterator[Tuple[int, Any]]:
+        number = 0
+        for line in self._lines():
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, ndjson_record(line)
+            except RowError as e:
+                yield number, e
+
+    def read_chunk(self, validator: RowValidator, size: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, str]], int]:
+        """Up to `size` rows: (valid (row, record) pairs, (row, error) pairs, rows read)"""
+        valid = []
+        errors = []
+        count = 0
+        for number, record in islice(self._rows, size):
+            count += 1
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                valid.append((number, validator.validate(record)))
+            except RowError as e:
+                errors.append((number, str(e)))
+        return valid, errors, count
+
+    def close(self):
+        self._file.close()
+
+
+def row_assessment_id(upload_key: str, row: int) -> str:
+    """Assessment id of an id-less upload row: the same for every upload with this key"""
+    return str(uuid.uuid5(UPLOAD_ID_NAMESPACE, f"{upload_key}:{row}"))
+
+
+class IngestJob:
+    """Progress of one upload; to_document() is what the status endpoint returns"""
+
+    def __init__(self, filename: Optional[str], fmt: str, size_bytes: int, upload_key: str, max_errors: int = 1000):
+        self.id = str(uuid.uuid4())
+        self.filename = filename
+        self.format = fmt
+        self.upload_key = upload_key
+        self.size_bytes = size_bytes
+        self.max_errors = max_errors
+        self.status = "queued"
+        self.bytes_read = 0
+        self.rows_read = 0
+        self.rows_ingested = 0
+        self.rows_failed = 0
+        self.chunks = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.message: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def start(self):
+        self.status = "running"
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+
+    def record_chunk(self, rows_read: int, ingested: int, errors: List[Tuple[int, str]], bytes_read: int):
+        self.chunks += 1
+        self.rows_read += rows_read
+        self.rows_ingested += ingested
+        self.rows_failed += len(errors)
+        self.bytes_read = bytes_read
+        for row, error in errors[:max(self.max_errors - len(self.errors), 0)]:
+            self.errors.append({"row": row, "error": error})
+        self._elapsed = time.perf_counter() - self._started
+
+    def finish(self, status: str, message: Optional[str] = None):
+        self.status = status
+        self.message = message
+        self.finished_at = datetime.now(timezone.utc)
+        if self._started:
+            self._elapsed = time.perf_counter() - self._started
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_document(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "format": self.format,
+            "upload_key": self.upload_key,
+            "status": self.status,
+            "message": self.message,
+            "size_bytes": self.size_bytes,
+            "bytes_read": self.bytes_read,
+            "progress": self.bytes_read / self.size_bytes if self.size_bytes else float(self.done),
+            "rows_read": self.rows_read,
+            "rows_ingested": self.rows_ingested,
+            "rows_failed": self.rows_failed,
+            "chunks": self.chunks,
+            "elapsed_seconds": self._elapsed,
+            "rows_per_second": self.rows_read / self._elapsed if self._elapsed > 0 else 0.0,
+            "errors": self.errors,
+            "errors_truncated": self.rows_failed > len(self.errors),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+async def run_ingest_job(
+    job: IngestJob,
+    path: str,
+    validator: RowValidator,
+    ingest_chunk: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+    report: Callable[[IngestJob], Awaitable[None]],
+    chunk_size: int = 1000,
+    max_row_bytes: int = 1 << 20,
+    slots: Optional[asyncio.Semaphore] = None
+):
+    """
+    Ingest a spooled upload chunk by chunk, then delete it. `ingest_chunk`
+    scores and stores one chunk of validated records; `report` is awaited
+    with the job after every chunk and when it ends. With `slots`, the job
+    stays queued until it can acquire one.
+    """
+    reader = None
+    try:
+        async with slots or asyncio.Semaphore():
+            job.start()
+            await report(job)
+            reader = UploadReader(path, job.format, max_row_bytes)
+            while True:
+                # Parsing and validation run in a thread so the event loop keeps serving requests
+                valid, errors, count = await asyncio.to_thread(reader.read_chunk, validator, chunk_size)
+                if not count:
+                    break
+                for number, record in valid:
+                    if record["assessment_id"] is None:
+                        record["assessment_id"] = row_assessment_id(job.upload_key, number)
+                if valid:
+                    await ingest_chunk([record for _, record in valid])
+                job.record_chunk(count, len(valid), errors, reader.bytes_read)
+                await report(job)
+            job.finish("completed")
+    except asyncio.CancelledError:
+        job.finish("cancelled", "Server shut down before the upload was ingested")
+        raise
+    except IngestError as e:
+        job.finish("failed", str(e))
+    except Exception as e:
+        job.finish("failed", f"Error ingesting upload: {str(e)}")
+    finally:
+        if reader is not None:
+            reader.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        await report(job)
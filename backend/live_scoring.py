@@ -0,0 +1,149 @@
+"""
+Incremental scoring state for the live-scoring WebSocket.
+
+A LiveScoringSession holds one in-progress assessment: its responses, its
+selected tools and the running sums behind its scores. An answer updates the
+response total and count and the weighted REAO sums of the few dimensions the
+question feeds, so it costs O(1) instead of re-running reao_scores over every
+response. A tool toggle re-reads the tech score from the model's memoized
+TechScorer. Snapshots match what /assessment/submit would compute for the
+same responses and tools. Nothing is persisted until the client submits.
+
+Messages (JSON objects; an optional "seq" is echoed back in the reply):
+
+    {"type": "answer", "question_id": "strategy", "value": 75}     value null clears it
+    {"type": "tool", "tool_id": "hubspot", "selected": true}       omit selected to toggle
+    {"type": "reset", "responses": {...}, "tech_tools": [...]}     e.g. resuming a draft
+    {"type": "submit", "assessment_id": "..."}                     score and store (server.py)
+"""
+from typing import Any, Dict, List, Optional
+
+from scoring_engine import REAO_DIMENSIONS
+from scoring_model import ScoringModel
+
+LIVE_MESSAGE_TYPES = ("answer", "tool", "reset", "submit")
+
+
+class LiveScoringError(ValueError):
+    """A malformed live-scoring message; reported to the client, the session stays open"""
+
+
+def _response_value(question_id: Any, value: Any) -> int:
+    # Same values AssessmentSubmission accepts (Dict[str, int])
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise LiveScoringError(f"Response to '{question_id}' must be an integer")
+
+
+class LiveScoringSession:
+    """Running scores of one assessment being filled in"""
+
+    def __init__(self, model: ScoringModel, responses: Optional[Dict[str, int]] = None, tech_tools: Optional[List[str]] = None):
+        self.model = model
+        self.reset(responses or {}, tech_tools or [])
+
+    def reset(self, responses: Dict[str, int], tech_tools: List[str]):
+        """Rebuild the running sums from scratch (O(responses))"""
+        # Validate first so a bad reset leaves the session unchanged
+        responses = {question_id: _response_value(question_id, value) for question_id, value in responses.items()}
+        self.responses: Dict[str, int] = {}
+        # Insertion-ordered set of selected tools
+        self.tools: Dict[str, None] = {}
+        self._total = 0
+        self._sums = {dimension: 0 for dimension in REAO_DIMENSIONS}
+        self._weights = {dimension: 0 for dimension in REAO_DIMENSIONS}
+        self._tech_score: Optional[float] = None
+        for question_id, value in responses.items():
+            self.answer(question_id, value)
+        for tool_id in tech_tools:
+            self.tools[tool_id] = None
+
+    def rebase(self, model: ScoringModel):
+        """Switch to another scoring model (after a hot reload) and rebuild the sums"""
+        self.model = model
+        self.reset(dict(self.responses), list(self.tools))
+
+    def answer(self, question_id: str, value: Optional[Any]):
+        """Set, change or (value None) clear one response in O(1)"""
+        if not isinstance(question_id, str):
+            raise LiveScoringError("question_id must be a string")
+        new = None if value is None else _response_value(question_id, value)
+        old = self.responses.pop(question_id, None)
+        weights = self.model.question_weights(question_id)
+        if old is not None:
+            self._total -= old
+            for dimension, weight in weights:
+                self._sums[dimension] -= old * weight
+                self._weights[dimension] -= weight
+        if new is not None:
+            self.responses[question_id] = new
+            self._total += new
+            for dimension, weight in weights:
+                self._sums[dimension] += new * weight
+                self._weights[dimension] += weight
+
+    def set_tool(self, tool_id: str, selected: Optional[bool] = None):
+        """Select, deselect or (selected None) toggle one tool"""
+        if not isinstance(tool_id, str):
+            raise LiveScoringError("tool_id must be a string")
+        if selected is None:
+            selected = tool_id not in self.tools
+        if selected and tool_id not in self.tools:
+            self.tools[tool_id] = None
+            self._tech_score = None
+        elif not selected and tool_id in self.tools:
+            del self.tools[tool_id]
+            self._tech_score = None
+
+    def apply(self, message: Dict[str, Any]):
+        """Apply an answer, tool or reset message"""
+        kind = message.get("type")
+        if kind == "answer":
+            self.answer(message.get("question_id"), message.get("value"))
+        elif kind == "tool":
+            selected = message.get("selected")
+            if selected is not None and not isinstance(selected, bool):
+                raise LiveScoringError("selected must be true, false or omitted")
+            self.set_tool(message.get("tool_id"), selected)
+        elif kind == "reset":
+            responses = message.get("responses") or {}
+            tech_tools = message.get("tech_tools") or []
+            if not isinstance(responses, dict) or not isinstance(tech_tools, list):
+                raise LiveScoringError("reset needs a responses object and a tech_tools list")
+            if not all(isinstance(tool_id, str) for tool_id in tech_tools):
+                raise LiveScoringError("tech_tools must be strings")
+            self.reset(responses, tech_tools)
+        else:
+            raise LiveScoringError(f"Unknown message type '{kind}' (expected one of {', '.join(LIVE_MESSAGE_TYPES)})")
+
+    @property
+    def tech_tools(self) -> List[str]:
+        return list(self.tools)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current scores, as /assessment/submit would compute them"""
+        model = self.model
+        if self._tech_score is None:
+            self._tech_score = model.tech_score(self.tech_tools)
+        tech_score = self._tech_score
+
+        count = len(self.responses)
+        assessment_score = self._total / count if count else 0.0
+        if count:
+            reao_scores = model.reao_from_sums(self._sums, self._weights, len(self.tools))
+        else:
+            reao_scores = {dimension: 0 for dimension in REAO_DIMENSIONS}
+        combined_score = model.combined_score(assessment_score, tech_score)
+
+        return {
+            "assessment_score": float(assessment_score),
+            "tech_score": float(tech_score),
+            "combined_score": float(combined_score),
+            "plane_level": dict(model.plane_levels[model.plane_index(combined_score)]),
+            "reao_scores": {dimension: float(value) for dimension, value in reao_scores.items()},
+            "answered": count,
+            "tech_tools": self.tech_tools,
+            "model_version": model.version
+        }
@@ -0,0 +1,17 @@
+"""
+The API on an in-process mongomock database.
+
+server.py only knows real MongoDB URLs; importing this module swaps its
+client factory for mongomock-motor, so load tests and local runs need no
+database server while the server and database modules stay free of
+load-test code:
+
+    MONGO_URL=mongomock:// DB_NAME=loadtest uvicorn loadtest.mock_app:app
+
+loadtest.run serves this app whenever --mongo-url is a mongomock:// URL.
+"""
+import server
+from loadtest.mock_mongo import create_mock_client
+
+server.create_client = create_mock_client
+app = server.app
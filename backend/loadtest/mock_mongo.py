@@ -0,0 +1,29 @@
+"""
+mongomock-motor as the app's MongoDB client, for load tests and the test suite.
+
+mongomock-motor (a dev dependency) runs the Motor API against an in-process
+mongomock database, so nothing but the app process is needed. Its data lives
+in that process: with several uvicorn workers use a real MongoDB.
+"""
+from mongomock.collection import BulkOperationBuilder
+from mongomock_motor import AsyncMongoMockClient
+
+
+def _accept_sort(add):
+    # pymongo >= 4.11 passes sort= to bulk builders; mongomock's predate it
+    def wrapper(self, *args, sort=None, **kwargs):
+        return add(self, *args, **kwargs)
+    return wrapper
+
+
+def patch_mongomock_bulk():
+    if not getattr(BulkOperationBuilder, "_accepts_sort", False):
+        BulkOperationBuilder.add_update = _accept_sort(BulkOperationBuilder.add_update)
+        BulkOperationBuilder.add_replace = _accept_sort(BulkOperationBuilder.add_replace)
+        BulkOperationBuilder._accepts_sort = True
+
+
+def create_mock_client(settings=None, event_listeners=None) -> AsyncMongoMockClient:
+    """Drop-in for database.create_client; BSON dates come back UTC-aware like the real client's"""
+    patch_mongomock_bulk()
+    return AsyncMongoMockClient(tz_aware=True)
@@ -0,0 +1,375 @@
+"""
+End-to-end load test for the API.
+
+Drives the app over HTTP with a weighted mix of realistic traffic (questions
+and categories GETs, submits, result reads, history pages and scenario
+estimates) and reports throughput and p50/p95/p99 latency per route for each
+stage of a concurrency schedule, so the saturation point of a deployment can
+be found and compared between changes.
+
+By default it starts the server itself on an in-process mongomock database
+(`uvicorn loadtest.mock_app:app` with MONGO_URL=mongomock://), so no
+database is needed; --mongo-url or LOADTEST_MONGO_URL points it at a real
+mongod instead. Run from the backend directory:
+
+    python -m loadtest.run                                  # 50 users for 30s
+    python -m loadtest.run --stages 10:20,50:20,100:20,200:20
+    python -m loadtest.run --mongo-url mongodb://localhost:27017 --workers 4
+    LOADTEST_MONGO_URL=mongodb://localhost:27017 python -m loadtest.run
+    python -m loadtest.run --url http://localhost:8000      # an already running server
+
+mongomock has no network round trips and lives inside each server process:
+its numbers show the app's own cost, and with --workers > 1 a real mongod is
+required. The load generator is a single asyncio
+process; at very high rates check its own CPU usage before blaming the server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+DEFAULT_MIX = {
+    "questions": 15,
+    "categories": 15,
+    "submit": 15,
+    "result": 25,
+    "history": 10,
+    "estimate": 20
+}
+
+# Route templates the operations are reported under (matches /metrics labels)
+ROUTES = {
+    "questions": "GET /api/assessment/questions",
+    "categories": "GET /api/tech/categories",
+    "submit": "POST /api/assessment/submit",
+    "result": "GET /api/assessment/results/{assessment_id}",
+    "history": "GET /api/assessment/history",
+    "estimate": "POST /api/scenarios/estimate"
+}
+
+RESPONSE_VALUES = [0, 25, 50, 75, 100]
+
+
+@dataclass
+class Stage:
+    concurrency: int
+    seconds: float
+
+
+@dataclass
+class LoadState:
+    question_ids: List[str]
+    tool_ids: List[str]
+    assessment_ids: List[str] = field(default_factory=list)
+    concurrency: int = 0
+    stage: Optional[int] = None
+    # (stage, operation) -> latencies in seconds / error count
+    latencies: Dict[Tuple[int, str], List[float]] = field(default_factory=dict)
+    errors: Dict[Tuple[int, str], int] = field(default_factory=dict)
+
+
+def parse_stages(text: str) -> List[Stage]:
+    """"10:30,50:30" -> 10 users for 30s, then 50 users for 30s"""
+    stages = []
+    for part in text.split(","):
+        concurrency, seconds = part.split(":")
+        stages.append(Stage(int(concurrency), float(seconds)))
+    return stages
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, weight = part.split("=")
+        if name not in ROUTES:
+            raise ValueError(f"Unknown operation '{name}', expected one of: {', '.join(ROUTES)}")
+        mix[name] = float(weight)
+    return mix
+
+
+# ----------------------------------------------------------------------
+# Operations
+# ----------------------------------------------------------------------
+
+def random_submission(state: LoadState, rng: random.Random) -> Dict[str, Any]:
+    answered = rng.randint(len(state.question_ids) // 2, len(state.question_ids))
+    return {
+        "responses": {q_id: rng.choice(RESPONSE_VALUES) for q_id in rng.sample(state.question_ids, answered)},
+        "tech_tools": rng.sample(state.tool_ids, rng.randint(0, min(10, len(state.tool_ids))))
+    }
+
+
+async def submit(client: httpx.AsyncClient, state: LoadState, rng: random.Random) -> httpx.Response:
+    response = await client.post("/api/assessment/submit", json=random_submission(state, rng))
+    if response.status_code == 200:
+        state.assessment_ids.append(response.json()["id"])
+    return response
+
+
+async def run_operation(name: str, client: httpx.AsyncClient, state: LoadState, rng: random.Random) -> httpx.Response:
+    if name == "questions":
+        return await client.get("/api/assessment/questions")
+    if name == "categories":
+        return await client.get("/api/tech/categories")
+    if name == "submit":
+        return await submit(client, state, rng)
+    if name == "result":
+        return await client.get(f"/api/assessment/results/{rng.choice(state.assessment_ids)}")
+    if name == "history":
+        return await client.get("/api/assessment/history", params={"limit": 20, "fields": "summary"})
+    if name == "estimate":
+        return await client.post(
+            "/api/scenarios/estimate",
+            params={"assessment_id": rng.choice(state.assessment_ids)},
+            json={
+                "budget_pct": rng.uniform(-50, 50),
+                "headcount": rng.randint(-10, 10),
+                "tech_utilization_pct": rng.uniform(-30, 30),
+                "process_maturity_pct": rng.uniform(-20, 20)
+            }
+        )
+    raise ValueError(f"Unknown operation '{name}'")
+
+
+async def user(index: int, client: httpx.AsyncClient, state: LoadState, mix: Dict[str, float], seed: int):
+    """One simulated user: issues requests back to back while its slot is active"""
+    rng = random.Random(seed + index)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while True:
+        if state.stage is None or index >= state.concurrency:
+            await asyncio.sleep(0.05)
+            continue
+        stage = state.stage
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await run_operation(name, client, state, rng)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        elapsed = time.perf_counter() - started
+        # Requests that straddle a stage boundary are attributed to the stage they started in
+        key = (stage, name)
+        state.latencies.setdefault(key, []).append(elapsed)
+        if failed:
+            state.errors[key] = state.errors.get(key, 0) + 1
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+async def prepare(client: httpx.AsyncClient, seed_assessments: int, rng: random.Random) -> LoadState:
+    """Fetch the catalogs and store some assessments for reads and estimates"""
+    questions = (await client.get("/api/assessment/questions")).json()["questions"]
+    categories = (await client.get("/api/tech/categories")).json()["categories"]
+    state = LoadState(
+        question_ids=[q["id"] for q in questions],
+        tool_ids=[tool["id"] for category in categories for tool in category["tools"]]
+    )
+    for _ in range(max(1, seed_assessments)):
+        response = await submit(client, state, rng)
+        response.raise_for_status()
+    return state
+
+
+async def drive(base_url: str, stages: List[Stage], mix: Dict[str, float], seed: int, seed_assessments: int, timeout: float) -> Tuple[LoadState, List[float]]:
+    max_users = max(stage.concurrency for stage in stages)
+    limits = httpx.Limits(max_connections=max_users, max_keepalive_connections=max_users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        state = await prepare(client, seed_assessments, random.Random(seed))
+        users = [asyncio.create_task(user(i, client, state, mix, seed)) for i in range(max_users)]
+        durations = []
+        try:
+            for index, stage in enumerate(stages):
+                state.concurrency = stage.concurrency
+                state.stage = index
+                started = time.perf_counter()
+                await asyncio.sleep(stage.seconds)
+                durations.append(time.perf_counter() - started)
+            state.stage = None
+        finally:
+            for task in users:
+                task.cancel()
+            await asyncio.gather(*users, return_exceptions=True)
+    return state, durations
+
+
+def summarize(state: LoadState, stages: List[Stage], durations: List[float]) -> List[Dict[str, Any]]:
+    report = []
+    for index, (stage, duration) in enumerate(zip(stages, durations)):
+        routes = {}
+        all_latencies = []
+        total_errors = 0
+        for name in ROUTES:
+            latencies = state.latencies.get((index, name))
+            if not latencies:
+                continue
+            errors = state.errors.get((index, name), 0)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            routes[ROUTES[name]] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "rps": len(latencies) / duration,
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": max(latencies) * 1000
+            }
+            all_latencies.extend(latencies)
+            total_errors += errors
+        total = {"requests": len(all_latencies), "errors": total_errors, "rps": len(all_latencies) / duration}
+        if all_latencies:
+            p50, p95, p99 = np.percentile(all_latencies, [50, 95, 99]) * 1000
+            total.update({"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": max(all_latencies) * 1000})
+        report.append({"concurrency": stage.concurrency, "seconds": duration, "routes": routes, "total": total})
+    return report
+
+
+def saturation_stage(report: List[Dict[str, Any]], min_gain: float = 0.1) -> Optional[int]:
+    """First stage where more concurrency stopped buying at least min_gain more throughput"""
+    for previous, current in zip(report, report[1:]):
+        if current["concurrency"] > previous["concurrency"] and previous["total"]["rps"] > 0:
+            if current["total"]["rps"] < previous["total"]["rps"] * (1 + min_gain):
+                return report.index(current)
+    return None
+
+
+def print_report(report: List[Dict[str, Any]]):
+    header = f"{'route':<48} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    for stage in report:
+        print(f"\n== {stage['concurrency']} concurrent users, {stage['seconds']:.1f}s ==")
+        print(header)
+        rows = list(stage["routes"].items()) + [("TOTAL", stage["total"])]
+        for route, row in rows:
+            if not row.get("requests"):
+                continue
+            print(
+                f"{route:<48} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+                f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}"
+            )
+
+    if len(report) > 1:
+        print("\nconcurrency -> throughput / p99")
+        for stage in report:
+            print(f"  {stage['concurrency']:>6} -> {stage['total']['rps']:>8.1f} rps / {stage['total'].get('p99_ms', 0):>8.2f} ms")
+        saturated = saturation_stage(report)
+        if saturated is not None:
+            print(f"Throughput saturates at about {report[saturated - 1]['concurrency']} concurrent users")
+        else:
+            print("No saturation within the schedule; extend it with more users")
+
+
+# ----------------------------------------------------------------------
+# Local server
+# ----------------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int, mongo_url: str, db_name: str, extra_env: Dict[str, str]) -> subprocess.Popen:
+    env = dict(os.environ, MONGO_URL=mongo_url, DB_NAME=db_name, WEB_CONCURRENCY=str(workers))
+    env.update(extra_env)
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # mongomock:// is served by the app variant wired to mongomock-motor
+    app = "loadtest.mock_app:app" if mongo_url.startswith("mongomock://") else "server:app"
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", app,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log"
+        ],
+        cwd=backend,
+        env=env
+    )
+
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=1.0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if (await client.get("/api/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready in time")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: start one locally)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent users when --stages is not given")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds at --concurrency when --stages is not given")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds to ramp linearly up to --concurrency first (reported as separate stages)")
+    parser.add_argument("--stages", help="Concurrency schedule as users:seconds pairs, e.g. 10:20,50:20,100:20")
+    parser.add_argument("--mix", help="Operation weights, e.g. questions=15,categories=15,submit=15,result=25,history=10,estimate=20")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the traffic mix")
+    parser.add_argument("--seed-assessments", type=int, default=50, help="Assessments stored before the run for reads and estimates")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the locally started server")
+    parser.add_argument(
+        "--mongo-url",
+        default=os.environ.get("LOADTEST_MONGO_URL", "mongomock://"),
+        help="MONGO_URL for the locally started server (default: $LOADTEST_MONGO_URL, else mongomock:// in-process)"
+    )
+    parser.add_argument("--db-name", default="loadtest", help="DB_NAME for the locally started server")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="Extra environment for the locally started server, e.g. WRITE_BEHIND=1")
+    parser.add_argument("--output", help="Also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    if args.stages:
+        stages = parse_stages(args.stages)
+    else:
+        steps = max(1, min(args.concurrency, int(args.ramp_up))) if args.ramp_up > 0 else 0
+        stages = [
+            Stage(max(1, args.concurrency * (step + 1) // (steps + 1)), args.ramp_up / steps)
+            for step in range(steps)
+        ]
+        stages.append(Stage(args.concurrency, args.duration))
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        extra_env = dict(item.split("=", 1) for item in args.env)
+        process = start_server(port, args.workers, args.mongo_url, args.db_name, extra_env)
+
+    try:
+        if process is not None:
+            asyncio.run(wait_until_ready(base_url, process))
+        state, durations = asyncio.run(drive(base_url, stages, mix, args.seed, args.seed_assessments, args.timeout))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report = summarize(state, stages, durations)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"base_url": base_url, "mix": mix, "stages": report}, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
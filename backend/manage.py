@@ -0,0 +1,75 @@
+"""
+Maintenance commands for the Flight Deck backend.
+
+Run from the backend directory with the same MONGO_URL / DB_NAME as the API:
+
+    python manage.py rebuild-benchmarks
+    python manage.py rescore --workers 4 --max-rate 2000
+"""
+import asyncio
+
+import typer
+
+import server
+from rescoring import rescore_assessments
+
+cli = typer.Typer(help="Flight Deck backend maintenance commands")
+
+
+def run(command):
+    """Connect to the API's database, await command(), and close the client afterwards"""
+    async def main():
+        await server.connect_db()
+        try:
+            return await command()
+        finally:
+            server.client.close()
+    return asyncio.run(main())
+
+
+@cli.command("rebuild-benchmarks")
+def rebuild_benchmarks(batch_size: int = typer.Option(1000, help="Documents read per cursor batch")):
+    """Recompute the cohort benchmark rollup from every stored assessment"""
+    result = run(lambda: server.cohort_benchmarks.rebuild(server.db, batch_size=batch_size))
+    typer.echo(f"Rebuilt benchmarks from {result['count']} assessments")
+
+
+@cli.command("rescore")
+def rescore(
+    batch_size: int = typer.Option(500, help="Documents scored and written per batch"),
+    workers: int = typer.Option(0, help="Scoring processes (0 = half the CPUs)"),
+    max_rate: float = typer.Option(0, help="Most documents re-scored per second (0 = no limit)"),
+    pause: float = typer.Option(0, help="Seconds to wait between batches"),
+    restart: bool = typer.Option(False, help="Ignore the checkpoint and start from the first stale document")
+):
+    """Re-score assessments computed with an older scoring model or question bank (resumes after a crash)"""
+    async def command():
+        try:
+            state = await rescore_assessments(
+                server.db,
+                server.scoring_models.path,
+                server.ASSESSMENT_QUESTIONS,
+                server.TECH_CATEGORIES,
+                server.QUESTION_BANK_PATH,
+                batch_size=batch_size,
+                workers=workers or None,
+                max_rate=max_rate,
+                pause=pause,
+                restart=restart,
+                invalidate=lambda ids: server.assessment_cache.invalidate(*ids)
+            )
+            if state["rescored"] and server.COHORT_BENCHMARKS:
+                await server.cohort_benchmarks.rebuild(server.db, batch_size=batch_size)
+            return state
+        finally:
+            await server.assessment_cache.close()
+
+    state = run(command)
+    typer.echo(
+        f"Re-scored {state['rescored']} assessments with model {state['model_version']} "
+        f"({state['skipped']} changed meanwhile, {state['failed']} failed)"
+    )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination helpers for the assessment history.
+
+History is ordered newest first on (created_at, id). A page ends with an
+opaque cursor holding the last row's sort key; the next page asks MongoDB for
+rows strictly after that key, so deep pages cost the same as the first one
+(no skip) and concurrent inserts never shift rows between pages.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+HISTORY_FIELDS = [
+    "id",
+    "created_at",
+    "assessment_score",
+    "tech_score",
+    "combined_score",
+    "plane_level",
+    "reao_scores",
+    "responses",
+    "tech_tools",
+    "insights",
+    "recommendations"
+]
+
+# Named field sets accepted in the `fields` parameter
+FIELD_PRESETS = {
+    "summary": ["assessment_score", "tech_score", "combined_score", "plane_level", "reao_scores"],
+    "full": HISTORY_FIELDS
+}
+
+# Sort keys are always returned so the client can page from any row
+KEY_FIELDS = ["id", "created_at"]
+
+HISTORY_SORT = [("created_at", -1), ("id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    created_at = doc["created_at"]
+    # Tag the key type: legacy rows still hold ISO strings until they are migrated
+    if isinstance(created_at, datetime):
+        key = ["d", created_at.isoformat()]
+    else:
+        key = ["s", created_at]
+    payload = json.dumps(key + [doc["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, created_at, assessment_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if kind == "d":
+            created_at = datetime.fromisoformat(created_at)
+        elif kind != "s":
+            raise ValueError(kind)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(assessment_id, str):
+        raise InvalidCursor("Invalid cursor")
+    return [created_at, assessment_id]
+
+
+def keyset_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Query selecting the rows that sort after the cursor (newest first)"""
+    if not cursor:
+        return {}
+    created_at, assessment_id = decode_cursor(cursor)
+    conditions = [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": assessment_id}}
+    ]
+    # In a descending sort BSON dates come before strings, and range operators
+    # only compare within one type, so past a date cursor every unmigrated
+    # string row is still ahead
+    if isinstance(created_at, datetime):
+        conditions.append({"created_at": {"$type": "string"}})
+    return {"$or": conditions}
+
+
+def history_projection(fields: Optional[str]) -> Dict[str, int]:
+    """
+    MongoDB projection for a comma-separated list of fields and/or presets.
+    Raises ValueError on unknown names.
+    """
+    if not fields:
+        return {"_id": 0}
+
+    selected = []
+    for name in (part.strip() for part in fields.split(",")):
+        if not name:
+            continue
+        if name in FIELD_PRESETS:
+            selected.extend(FIELD_PRESETS[name])
+        elif name in HISTORY_FIELDS:
+            selected.append(name)
+        else:
+            raise ValueError(f"Unknown field: {name}")
+
+    projection = {"_id": 0}
+    for name in KEY_FIELDS + selected:
+        projection[name] = 1
+    return projection
@@ -0,0 +1,236 @@
+"""
+Sparse question bank for Deep Dive assessments.
+
+The bank (question_bank.json) lists topics, each with the REAO dimensions its
+questions feed, and the questions of each topic; a question can override its
+topic's dimension weights. It scales to thousands of questions, of which a
+deep dive answers only a few, so everything is sparse:
+
+- question -> dimension weights are a CSR matrix (indptr / indices / weights
+  arrays, one row per question),
+- a batch of responses is a sparse response matrix, kept as flat arrays of
+  (submission, question row, value) for the answers actually given,
+- REAO sums are the product of the two: the CSR rows of the answered
+  questions are gathered and reduced per (submission, dimension) with one
+  bincount, and topic sums the same way per (submission, topic).
+
+Scoring costs O(answers + submissions x (dimensions + topics)), independent
+of the bank size. The ScoringModel then turns the sums into REAO scores with
+the same tech bonus as a regular assessment (score_results).
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from scoring_engine import REAO_DIMENSIONS
+from scoring_model import ScoringModel
+
+DEFAULT_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_bank.json")
+
+
+class InvalidQuestionBank(ValueError):
+    pass
+
+
+@dataclass
+class BankScores:
+    """Sparse-product scores for a batch of deep-dive submissions, one row each"""
+    assessment_score: np.ndarray  # (n,) mean of every response, known or not
+    answered: np.ndarray  # (n,) responses to questions in the bank
+    dimension_sums: np.ndarray  # (n, 4) weighted response sums, REAO_DIMENSIONS order
+    dimension_weights: np.ndarray  # (n, 4) weight totals of the answered questions
+    topic_sums: np.ndarray  # (n, topics)
+    topic_counts: np.ndarray  # (n, topics)
+
+    def __len__(self) -> int:
+        return len(self.assessment_score)
+
+    def sums(self, row: int) -> Dict[str, float]:
+        return {dimension: self.dimension_sums[row, d].item() for d, dimension in enumerate(REAO_DIMENSIONS)}
+
+    def weights(self, row: int) -> Dict[str, float]:
+        return {dimension: self.dimension_weights[row, d].item() for d, dimension in enumerate(REAO_DIMENSIONS)}
+
+
+class QuestionBank:
+    """Immutable, compiled question bank"""
+
+    def __init__(self, data: Dict[str, Any]):
+        if "version" not in data or "topics" not in data:
+            raise InvalidQuestionBank("Question bank needs 'version' and 'topics'")
+        content = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        self.version = f"{data['version']}+{hashlib.sha256(content.encode('utf-8')).hexdigest()[:8]}"
+
+        self.topic_ids: List[str] = []
+        self.topics: List[Dict[str, Any]] = []
+        self.question_ids: List[str] = []
+        question_topics: List[int] = []
+        indptr = [0]
+        indices: List[int] = []
+        weights: List[float] = []
+
+        for topic in data["topics"]:
+            if topic["id"] in self.topic_ids:
+                raise InvalidQuestionBank(f"Duplicate topic '{topic['id']}'")
+            topic_index = len(self.topic_ids)
+            self.topic_ids.append(topic["id"])
+            for question in topic["questions"]:
+                dimensions = question.get("dimensions", topic.get("dimensions", {}))
+                for dimension, weight in dimensions.items():
+                    if dimension not in REAO_DIMENSIONS:
+                        raise InvalidQuestionBank(f"Unknown dimension '{dimension}' for question '{question['id']}'")
+                    if weight <= 0:
+                        raise InvalidQuestionBank(f"Dimension weights must be positive ('{question['id']}' -> '{dimension}')")
+                    indices.append(REAO_DIMENSIONS.index(dimension))
+                    weights.append(weight)
+                indptr.append(len(indices))
+                self.question_ids.append(question["id"])
+                question_topics.append(topic_index)
+            self.topics.append({
+                "id": topic["id"],
+                "name": topic.get("name", topic["id"]),
+                "question_ids": [question["id"] for question in topic["questions"]]
+            })
+
+        self.question_index = {q_id: row for row, q_id in enumerate(self.question_ids)}
+        if len(self.question_index) != len(self.question_ids):
+            raise InvalidQuestionBank("Question ids must be unique across topics")
+
+        # CSR question x dimension matrix; integral weights keep the sums exact
+        integral = all(float(weight).is_integer() for weight in weights)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.int64 if integral else np.float64)
+        self.question_topic = np.array(question_topics, dtype=np.int64)
+        self.topic_sizes = np.bincount(self.question_topic, minlength=len(self.topic_ids))
+
+    @classmethod
+    def load(cls, path: str) -> "QuestionBank":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def response_vectors(self, responses_list: List[Dict[str, int]]):
+        """
+        Sparse response matrix as flat arrays over the answers given: owning
+        submission, question row and value; plus, per submission, the sum and
+        count of responses to questions outside the bank
+        """
+        owners: List[int] = []
+        rows: List[int] = []
+        values: List[int] = []
+        n = len(responses_list)
+        extra_sum = np.zeros(n, dtype=np.int64)
+        extra_count = np.zeros(n, dtype=np.int64)
+        for owner, responses in enumerate(responses_list):
+            for q_id, value in responses.items():
+                row = self.question_index.get(q_id)
+                if row is None:
+                    extra_sum[owner] += value
+                    extra_count[owner] += 1
+                else:
+                    owners.append(owner)
+                    rows.append(row)
+                    values.append(value)
+        return (
+            np.array(owners, dtype=np.int64),
+            np.array(rows, dtype=np.int64),
+            np.array(values, dtype=np.int64),
+            extra_sum,
+            extra_count
+        )
+
+    def score(self, responses_list: List[Dict[str, int]]) -> BankScores:
+        """Score a batch of (possibly partial) deep dives with sparse products"""
+        n = len(responses_list)
+        dimensions = len(REAO_DIMENSIONS)
+        topics = len(self.topic_ids)
+        owners, rows, values, extra_sum, extra_count = self.response_vectors(responses_list)
+
+        # Gather the CSR rows of the answered questions into flat (answer, dimension) entries
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        entry_starts = np.cumsum(lengths) - lengths
+        entries = np.repeat(starts - entry_starts, lengths) + np.arange(lengths.sum())
+        entry_owner = np.repeat(owners, lengths)
+        entry_dimension = self.indices[entries]
+        entry_weight = self.weights[entries]
+        cells = entry_owner * dimensions + entry_dimension
+        dimension_sums = np.bincount(cells, weights=np.repeat(values, lengths) * entry_weight, minlength=n * dimensions)
+        dimension_weights = np.bincount(cells, weights=entry_weight, minlength=n * dimensions)
+
+        topic_cells = owners * topics + self.question_topic[rows]
+        topic_sums = np.bincount(topic_cells, weights=values, minlength=n * topics)
+        topic_counts = np.bincount(topic_cells, minlength=n * topics)
+
+        answered = np.bincount(owners, minlength=n)
+        total = np.bincount(owners, weights=values, minlength=n) + extra_sum
+        count = answered + extra_count
+
+        return BankScores(
+            assessment_score=np.divide(total, count, out=np.zeros(n), where=count > 0),
+            answered=answered,
+            dimension_sums=dimension_sums.reshape(n, dimensions),
+            dimension_weights=dimension_weights.reshape(n, dimensions),
+            topic_sums=topic_sums.reshape(n, topics),
+            topic_counts=topic_counts.reshape(n, topics)
+        )
+
+    def topic_scores(self, scores: BankScores, row: int) -> Dict[str, Dict[str, Any]]:
+        """Mean response and coverage of each topic the submission answered"""
+        result = {}
+        for topic_index in np.flatnonzero(scores.topic_counts[row]):
+            answered = int(scores.topic_counts[row, topic_index])
+            size = int(self.topic_sizes[topic_index])
+            result[self.topic_ids[topic_index]] = {
+                "score": float(scores.topic_sums[row, topic_index] / answered),
+                "answered": answered,
+                "questions": size,
+                "coverage": answered / size
+            }
+        return result
+
+    def score_results(self, model: ScoringModel, responses_list: List[Dict[str, int]], tech_tools_list: List[List[str]]) -> List[Dict[str, Any]]:
+        """Scored fields of deep-dive result documents (as ScoringModel.score_batch), plus topic_scores"""
+        scores = self.score(responses_list)
+        results = []
+        for row, (responses, tech_tools) in enumerate(zip(responses_list, tech_tools_list)):
+            tech_score = model.tech_score(tech_tools)
+            if responses:
+                reao_scores = model.reao_from_sums(scores.sums(row), scores.weights(row), len(tech_tools))
+            else:
+                reao_scores = {dimension: 0 for dimension in REAO_DIMENSIONS}
+            reao_scores = {dimension: float(value) for dimension, value in reao_scores.items()}
+            assessment_score = scores.assessment_score[row]
+            combined_score = model.combined_score(assessment_score, tech_score)
+            topic_scores = self.topic_scores(scores, row)
+
+            # Topic ids double as the quick assessment's areas, so their journeys apply
+            topic_averages = {topic_id: topic["score"] for topic_id, topic in topic_scores.items()}
+            results.append({
+                "assessment_score": float(assessment_score),
+                "tech_score": float(tech_score),
+                "combined_score": float(combined_score),
+                "plane_level": dict(model.plane_levels[model.plane_index(combined_score)]),
+                "reao_scores": reao_scores,
+                "insights": model.insights(reao_scores),
+                "recommendations": model.recommendations(topic_averages, answered_only=True),
+                "topic_scores": topic_scores
+            })
+        return results
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "question_count": len(self.question_ids),
+            "topics": [
+                {"id": topic["id"], "name": topic["name"], "question_ids": topic["question_ids"]}
+                for topic in self.topics
+            ]
+        }
@@ -0,0 +1,257 @@
+"""
+Parallel, resumable re-scoring of stored assessments.
+
+Results record the scoring model version they were computed with (and deep
+dives the question bank version), so after the scoring model, the catalogs or
+the bank change, rescore_assessments() finds the stale results and brings
+them up to date:
+
+- stale documents are read in _id order, batch_size at a time, with a keyset
+  on _id, fetching only the fields scoring needs;
+- batches are scored in a process pool, `workers` batches in flight at once;
+  each pool process compiles the model and question bank once;
+- each scored batch is written back with one unordered bulk_write of $set
+  updates, guarded on the document's previous model_version and content_hash
+  so a resubmission that lands in the meantime wins;
+- after each write the last _id is checkpointed in the `migrations`
+  collection, so an interrupted run resumes where it stopped (a run for
+  another model version starts over); API workers watch the checkpoint and
+  drop their cached copies of documents it may have rewritten (is_stale);
+- `max_rate` (documents per second) and `pause` (seconds between batches)
+  throttle the job, and pool processes run at a lower CPU priority, so a
+  re-score next to the API doesn't starve live traffic. Pool processes are
+  started by a fork server (spawned where that isn't available), never forked
+  from the caller, which may hold a Motor client and event loop threads.
+
+Run it with `python manage.py rescore`.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from question_bank import QuestionBank
+from result_memo import content_hash
+from scoring_model import ScoringModel, load_model_data
+
+logger = logging.getLogger(__name__)
+
+RESCORE_MIGRATION = "rescore"
+
+RESCORE_PROJECTION = {
+    "_id": 1, "id": 1, "responses": 1, "tech_tools": 1,
+    "model_version": 1, "content_hash": 1, "question_bank_version": 1
+}
+
+# Compiled once per pool process by _init_worker
+_model: Optional[ScoringModel] = None
+_bank: Optional[QuestionBank] = None
+
+
+def stale_query(model_version: str, bank_version: str) -> Dict[str, Any]:
+    """Results scored with another model, and deep dives scored with another bank"""
+    return {"$or": [
+        {"model_version": {"$ne": model_version}},
+        {"question_bank_version": {"$nin": [None, bank_version]}}
+    ]}
+
+
+def is_stale(doc: Dict[str, Any], model_version: str, bank_version: str) -> bool:
+    """Whether stale_query(model_version, bank_version) matches doc"""
+    return doc.get("model_version") != model_version or doc.get("question_bank_version") not in (None, bank_version)
+
+
+def pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def rescored_fields(model: ScoringModel, bank: QuestionBank, docs: List[Dict[str, Any]]) -> List[Tuple[Any, Dict[str, Any]]]:
+    """(_id, fields to $set) for each document, scored as a submit would score it today"""
+    regular = [doc for doc in docs if not doc.get("question_bank_version")]
+    deep_dives = [doc for doc in docs if doc.get("question_bank_version")]
+    updates = []
+
+    if regular:
+        responses_list = [doc.get("responses") or {} for doc in regular]
+        tech_tools_list = [doc.get("tech_tools") or [] for doc in regular]
+        scores = model.score_batch(responses_list, tech_tools_list)
+        for doc, responses, tech_tools, fields in zip(regular, responses_list, tech_tools_list, scores):
+            fields["model_version"] = model.version
+            fields["content_hash"] = content_hash(responses, tech_tools, model.version)
+            updates.append((doc["_id"], fields))
+
+    if deep_dives:
+        responses_list = [doc.get("responses") or {} for doc in deep_dives]
+        tech_tools_list = [doc.get("tech_tools") or [] for doc in deep_dives]
+        scores = bank.score_results(model, responses_list, tech_tools_list)
+        for doc, responses, tech_tools, fields in zip(deep_dives, responses_list, tech_tools_list, scores):
+            fields["model_version"] = model.version
+            fields["question_bank_version"] = bank.version
+            fields["content_hash"] = content_hash(responses, tech_tools, f"{model.version}/{bank.version}")
+            updates.append((doc["_id"], fields))
+
+    return updates
+
+
+def _init_worker(model_path: str, questions: List[Dict[str, Any]], tech_categories: List[Dict[str, Any]], bank_path: str, nice: int):
+    global _model, _bank
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+    _model = ScoringModel(load_model_data(model_path), questions, tech_categories)
+    _bank = QuestionBank.load(bank_path)
+
+
+def rescore_batch(docs: List[Dict[str, Any]]) -> Tuple[List[Tuple[Any, Dict[str, Any]]], List[Tuple[Any, str]]]:
+    """Runs in a pool process: (updates, (_id, error) for documents that can't be scored)"""
+    try:
+        return rescored_fields(_model, _bank, docs), []
+    except Exception:
+        # Score one by one to isolate the malformed documents
+        updates = []
+        failures = []
+        for doc in docs:
+            try:
+                updates.extend(rescored_fields(_model, _bank, [doc]))
+            except Exception as e:
+                failures.append((doc["_id"], str(e)))
+        return updates, failures
+
+
+async def rescore_assessments(
+    db,
+    model_path: str,
+    questions: List[Dict[str, Any]],
+    tech_categories: List[Dict[str, Any]],
+    bank_path: str,
+    batch_size: int = 500,
+    workers: Optional[int] = None,
+    max_rate: float = 0.0,
+    pause: float = 0.0,
+    restart: bool = False,
+    nice: int = 10,
+    invalidate: Optional[Callable[[List[str]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """
+    Re-score every stale assessment, resuming from the last checkpoint unless
+    `restart`. `invalidate` is awaited with the ids of each written batch
+    (e.g. to drop them from a shared cache). Returns the final state.
+    """
+    model = ScoringModel(load_model_data(model_path), questions, tech_categories)
+    bank = QuestionBank.load(bank_path)
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+
+    state = {} if restart else await db.migrations.find_one({"_id": RESCORE_MIGRATION}) or {}
+    if state.get("status") != "running" or state.get("model_version") != model.version:
+        state = {}
+    last_id = state.get("last_id")
+    rescored = state.get("rescored", 0)
+    skipped = state.get("skipped", 0)
+    failed = state.get("failed", 0)
+    if last_id is not None:
+        logger.info(f"Resuming re-score to {model.version} after {rescored} documents")
+
+    query = stale_query(model.version, bank.version)
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    processed = 0
+
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=pool_context(),
+        initializer=_init_worker,
+        initargs=(model_path, questions, tech_categories, bank_path, nice)
+    ) as pool:
+        # Batches are read ahead while earlier ones are scored, but written (and checkpointed) in order
+        pending = deque()
+        read_id = last_id
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < workers:
+                batch_query = dict(query)
+                if read_id is not None:
+                    batch_query["_id"] = {"$gt": read_id}
+                batch = await db.assessments.find(
+                    batch_query,
+                    RESCORE_PROJECTION
+                ).sort("_id", ASCENDING).limit(batch_size).to_list(batch_size)
+                if not batch:
+                    exhausted = True
+                    break
+                read_id = batch[-1]["_id"]
+                pending.append((batch, loop.run_in_executor(pool, rescore_batch, batch)))
+
+            if not pending:
+                break
+
+            batch, future = pending.popleft()
+            updates, failures = await future
+            previous = {doc["_id"]: doc for doc in batch}
+            operations = [
+                UpdateOne(
+                    {
+                        "_id": doc_id,
+                        "model_version": previous[doc_id].get("model_version"),
+                        "content_hash": previous[doc_id].get("content_hash")
+                    },
+                    {"$set": fields}
+                )
+                for doc_id, fields in updates
+            ]
+            if operations:
+                result = await db.assessments.bulk_write(operations, ordered=False)
+                rescored += result.modified_count
+                skipped += len(operations) - result.matched_count
+                if invalidate is not None:
+                    await invalidate([doc["id"] for doc in batch if doc.get("id")])
+            for doc_id, error in failures:
+                logger.error(f"Error re-scoring assessment {doc_id}: {error}")
+            failed += len(failures)
+
+            last_id = batch[-1]["_id"]
+            processed += len(batch)
+            await db.migrations.update_one(
+                {"_id": RESCORE_MIGRATION},
+                {"$set": {
+                    "status": "running",
+                    "model_version": model.version,
+                    "question_bank_version": bank.version,
+                    "last_id": last_id,
+                    "rescored": rescored,
+                    "skipped": skipped,
+                    "failed": failed,
+                    "updated_at": datetime.now(timezone.utc)
+                }},
+                upsert=True
+            )
+
+            delay = pause
+            if max_rate > 0:
+                delay = max(delay, processed / max_rate - (time.monotonic() - started))
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    elapsed = time.monotonic() - started
+    state = {
+        "status": "complete",
+        "model_version": model.version,
+        "question_bank_version": bank.version,
+        "last_id": last_id,
+        "rescored": rescored,
+        "skipped": skipped,
+        "failed": failed,
+        "updated_at": datetime.now(timezone.utc)
+    }
+    await db.migrations.update_one({"_id": RESCORE_MIGRATION}, {"$set": state}, upsert=True)
+    logger.info(
+        f"Re-score to {model.version} complete: {rescored} re-scored, {skipped} changed meanwhile, "
+        f"{failed} failed ({processed / elapsed if elapsed > 0 else 0:.0f} documents/s this run)"
+    )
+    return state
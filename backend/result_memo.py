@@ -0,0 +1,89 @@
+"""
+Content hashing and memoized scoring results.
+
+content_hash() is a canonical hash of everything a result depends on: the
+responses, the tech tools and the scoring model version. It is stored with
+each result, so an identical resubmission of an assessment can be answered
+with the stored document, with no scoring and no write.
+
+ResultMemo is a bounded LRU of content hash -> computed scores, so different
+assessments with identical answers skip the scoring pipeline too. Memoized
+scores are shared between results and must be treated as read-only.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Fields of a result document that are a pure function of the content hash
+MEMO_FIELDS = (
+    "assessment_score", "tech_score", "combined_score", "plane_level",
+    "insights", "recommendations", "reao_scores"
+)
+
+
+def content_hash(responses: Dict[str, int], tech_tools: List[str], model_version: str) -> str:
+    """
+    Hash of the scoring inputs plus the model version. Response order and
+    tool order don't affect any score, so both are canonicalized; duplicate
+    tools do (the REAO bonus counts them) and are kept.
+    """
+    payload = json.dumps(
+        {"responses": responses, "tech_tools": sorted(tech_tools), "model_version": model_version},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultMemo:
+    """Bounded LRU of content hash -> scores (the MEMO_FIELDS of a result)"""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            scores = self._entries.get(key)
+            if scores is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return scores
+
+    def put(self, key: str, scores: Dict[str, Any]):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = {field: scores[field] for field in MEMO_FIELDS}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def cache_info(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
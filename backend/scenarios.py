@@ -0,0 +1,328 @@
+"""
+Vectorized What-If scenario math.
+
+Applies the same adjustment formulas as the /scenarios/estimate endpoint to
+NumPy arrays of lever values, so a whole grid of scenarios (or any other
+batch of them) is evaluated in one pass. Inputs broadcast against each other;
+every operation happens in the same order as in estimate_scenario so a single
+point matches its result exactly.
+
+The Monte Carlo mode (/scenarios/simulate) samples uncertain levers with
+sample_scenarios and summarizes the evaluated samples with simulate_scenarios.
+The inverse mode (/scenarios/solve) searches a lever grid with solve_scenarios
+for the cheapest combinations that reach a target.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+SCENARIO_LEVERS = ["budget_pct", "headcount", "tech_utilization_pct", "process_maturity_pct"]
+
+# Documented slider ranges of ScenarioEstimate
+SCENARIO_BOUNDS = {
+    "budget_pct": (-50, 50),
+    "headcount": (-10, 10),
+    "tech_utilization_pct": (-30, 30),
+    "process_maturity_pct": (-20, 20)
+}
+
+
+def _clamp(values):
+    return np.minimum(100, np.maximum(0, values))
+
+
+def adjust_reao(base_reao: Dict[str, float], budget_pct, headcount, tech_utilization_pct, process_maturity_pct) -> Dict[str, np.ndarray]:
+    """
+    Adjusted R/E/A/O scores for arrays of lever values.
+
+    Keys come back in the order estimate_scenario builds them (efficiency,
+    opportunity, readiness, alignment), which is also the summation order of
+    the adjusted assessment score.
+    """
+    adjusted = {}
+
+    # Budget impact (affects Efficiency and Opportunity)
+    budget_impact = np.asarray(budget_pct, dtype=np.float64) / 100
+    adjusted["efficiency"] = _clamp(base_reao.get("efficiency", 0) + budget_impact * 8)
+    adjusted["opportunity"] = _clamp(base_reao.get("opportunity", 0) + budget_impact * 6)
+
+    # Headcount impact (affects Readiness and Alignment)
+    headcount_impact = np.asarray(headcount) * 3
+    adjusted["readiness"] = _clamp(base_reao.get("readiness", 0) + headcount_impact * 0.5)
+    adjusted["alignment"] = _clamp(base_reao.get("alignment", 0) + headcount_impact * 0.3)
+
+    # Tech utilization impact (affects Efficiency)
+    tech_impact = np.asarray(tech_utilization_pct, dtype=np.float64) / 100
+    adjusted["efficiency"] = _clamp(adjusted["efficiency"] + tech_impact * 10)
+
+    # Process maturity impact (affects Alignment and Readiness)
+    process_impact = np.asarray(process_maturity_pct, dtype=np.float64) / 100
+    adjusted["alignment"] = _clamp(adjusted["alignment"] + process_impact * 9)
+    adjusted["readiness"] = _clamp(adjusted["readiness"] + process_impact * 5)
+
+    return adjusted
+
+
+def evaluate_scenarios(
+    base_reao: Dict[str, float],
+    tech_score: float,
+    plane_thresholds: Sequence[float],
+    budget_pct,
+    headcount,
+    tech_utilization_pct,
+    process_maturity_pct,
+) -> Dict[str, object]:
+    """Adjusted REAO, assessment score, combined score and plane index per scenario"""
+    adjusted = adjust_reao(base_reao, budget_pct, headcount, tech_utilization_pct, process_maturity_pct)
+    shape = np.broadcast_shapes(*(values.shape for values in adjusted.values()))
+    adjusted = {dimension: np.broadcast_to(values, shape) for dimension, values in adjusted.items()}
+
+    # Same left-to-right sum as sum(adjusted_reao.values())
+    total = np.zeros(shape)
+    for values in adjusted.values():
+        total = total + values
+    assessment_score = total / 4
+
+    combined_score = (assessment_score / 10 + tech_score) / 2
+    plane_index = np.searchsorted(np.asarray(plane_thresholds, dtype=np.float64), combined_score, side="right")
+
+    return {
+        "adjusted": adjusted,
+        "assessment_score": assessment_score,
+        "combined_score": combined_score,
+        "plane_index": plane_index
+    }
+
+
+# Points of a start/stop range without an explicit number of steps
+DEFAULT_AXIS_STEPS = 2
+
+
+def axis_size(
+    values: Optional[List[float]] = None,
+    start: Optional[float] = None,
+    stop: Optional[float] = None,
+    steps: Optional[int] = None,
+) -> int:
+    """
+    Points an axis expands to before de-duplication, an upper bound on its
+    size; check it against grid limits before calling expand_axis
+    """
+    if values is not None:
+        return len(values)
+    return DEFAULT_AXIS_STEPS if steps is None else steps
+
+
+def expand_axis(
+    lever: str,
+    values: Optional[List[float]] = None,
+    start: Optional[float] = None,
+    stop: Optional[float] = None,
+    steps: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Turn an explicit value list or an inclusive (start, stop, steps) range into
+    a sorted 1-D axis, validated against the lever's documented bounds.
+    """
+    low, high = SCENARIO_BOUNDS[lever]
+    if values is not None:
+        axis = np.asarray(values, dtype=np.float64)
+    else:
+        start = low if start is None else start
+        stop = high if stop is None else stop
+        if steps is None:
+            steps = DEFAULT_AXIS_STEPS
+        if steps < 1:
+            raise ValueError(f"{lever}: steps must be at least 1")
+        axis = np.linspace(start, stop, steps)
+
+    if lever == "headcount":
+        axis = np.round(axis)
+    axis = np.unique(axis)
+
+    if axis.size == 0:
+        raise ValueError(f"{lever}: axis is empty")
+    if axis[0] < low or axis[-1] > high:
+        raise ValueError(f"{lever}: values must lie within [{low}, {high}]")
+
+    return axis.astype(np.int64) if lever == "headcount" else axis
+
+
+# ----------------------------------------------------------------------------
+# Monte Carlo mode: levers as distributions instead of exact values
+# ----------------------------------------------------------------------------
+
+SCENARIO_DISTRIBUTIONS = ("fixed", "range", "normal", "triangular")
+
+
+def sample_lever(
+    lever: str,
+    rng: np.random.Generator,
+    size: int,
+    distribution: str = "fixed",
+    value: Optional[float] = None,
+    low: Optional[float] = None,
+    high: Optional[float] = None,
+    mean: Optional[float] = None,
+    std: Optional[float] = None,
+    mode: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Draw `size` values of one lever: a fixed value, a uniform range
+    (low, high), a normal (mean, std) or a triangular (low, mode, high)
+    distribution. Parameters must lie within the lever's documented bounds
+    and samples are clipped to them (normal tails); headcount is rounded to
+    whole people.
+    """
+    bound_low, bound_high = SCENARIO_BOUNDS[lever]
+
+    def check(name, parameter):
+        if parameter is None:
+            raise ValueError(f"{lever}: '{name}' is required for a {distribution} distribution")
+        if not bound_low <= parameter <= bound_high:
+            raise ValueError(f"{lever}: {name} must lie within [{bound_low}, {bound_high}]")
+        return parameter
+
+    if distribution == "fixed":
+        samples = np.full(size, check("value", 0 if value is None else value), dtype=np.float64)
+    elif distribution == "range":
+        low, high = check("low", low), check("high", high)
+        if low > high:
+            raise ValueError(f"{lever}: low must not exceed high")
+        samples = rng.uniform(low, high, size)
+    elif distribution == "normal":
+        mean = check("mean", mean)
+        if std is None or std < 0:
+            raise ValueError(f"{lever}: std must be zero or positive")
+        samples = np.clip(rng.normal(mean, std, size), bound_low, bound_high)
+    elif distribution == "triangular":
+        low, mode, high = check("low", low), check("mode", mode), check("high", high)
+        if not low <= mode <= high:
+            raise ValueError(f"{lever}: expected low <= mode <= high")
+        # numpy rejects a degenerate triangle
+        samples = rng.triangular(low, mode, high, size) if low < high else np.full(size, float(low))
+    else:
+        raise ValueError(f"{lever}: unknown distribution '{distribution}' (expected one of {', '.join(SCENARIO_DISTRIBUTIONS)})")
+
+    return np.rint(samples).astype(np.int64) if lever == "headcount" else samples
+
+
+def sample_scenarios(specs: Dict[str, Dict[str, object]], size: int, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Sample every lever from its distribution spec (sample_lever keyword arguments)"""
+    rng = np.random.default_rng(seed)
+    return {lever: sample_lever(lever, rng, size, **specs.get(lever, {})) for lever in SCENARIO_LEVERS}
+
+
+def simulate_scenarios(
+    base_reao: Dict[str, float],
+    tech_score: float,
+    plane_thresholds: Sequence[float],
+    samples: Dict[str, np.ndarray],
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+) -> Dict[str, object]:
+    """
+    Run sampled lever values (one 1-D array per lever, all the same length)
+    through evaluate_scenarios and summarize the outcome distribution:
+    probability of landing on each plane level, probability of reaching at
+    least that level, and mean and percentiles of each REAO dimension and of
+    the combined score.
+    """
+    surface = evaluate_scenarios(base_reao, tech_score, plane_thresholds, *(samples[lever] for lever in SCENARIO_LEVERS))
+    count = surface["plane_index"].size
+    levels = len(plane_thresholds) + 1
+
+    plane_probability = np.bincount(surface["plane_index"], minlength=levels) / count
+    # P(level >= i): reverse cumulative sum
+    plane_probability_at_least = np.cumsum(plane_probability[::-1])[::-1]
+
+    metrics = list(surface["adjusted"]) + ["combined_score"]
+    values = np.stack([*surface["adjusted"].values(), surface["combined_score"]])
+    # One partition pass over all metrics at once
+    bands = np.percentile(values, percentiles, axis=1)
+    means = values.mean(axis=1)
+
+    return {
+        "samples": count,
+        "plane_probability": plane_probability,
+        "plane_probability_at_least": np.minimum(plane_probability_at_least, 1.0),
+        "mean": {metric: float(means[position]) for position, metric in enumerate(metrics)},
+        "percentiles": {metric: bands[:, position] for position, metric in enumerate(metrics)}
+    }
+
+
+# ----------------------------------------------------------------------------
+# Inverse mode: cheapest lever combinations that reach a target
+# ----------------------------------------------------------------------------
+
+def solver_axis_size(lever: str) -> int:
+    """Points of the default search axis"""
+    return int(SCENARIO_BOUNDS[lever][1]) + 1
+
+
+def solver_axis(lever: str) -> np.ndarray:
+    """Default search axis: no change up to the lever's upper bound in unit steps"""
+    return expand_axis(lever, start=0, stop=SCENARIO_BOUNDS[lever][1], steps=solver_axis_size(lever))
+
+
+def solve_scenarios(
+    base_reao: Dict[str, float],
+    tech_score: float,
+    plane_thresholds: Sequence[float],
+    axes: Dict[str, np.ndarray],
+    costs: Dict[str, float],
+    target_plane_index: Optional[int] = None,
+    target_combined_score: Optional[float] = None,
+) -> Dict[str, object]:
+    """
+    Pareto-minimal lever combinations on the grid spanned by `axes` that reach
+    the target plane index (or combined score), ordered by weighted cost
+    sum(costs[lever] * value).
+
+    Every lever raises scores, so the feasible grid points form an up-set: a
+    feasible point is Pareto-minimal (no other feasible point is lower or
+    equal on every lever) exactly when stepping any single lever one notch
+    down makes it infeasible. That check is a shifted-array comparison over
+    the whole grid, evaluated in one pass.
+    """
+    for lever in SCENARIO_LEVERS:
+        if axes[lever][0] < 0:
+            raise ValueError(f"{lever}: the solver only searches non-negative changes")
+        if costs.get(lever, 0) < 0:
+            raise ValueError(f"{lever}: cost must be zero or positive")
+
+    grid = []
+    for position, lever in enumerate(SCENARIO_LEVERS):
+        shape = [1] * len(SCENARIO_LEVERS)
+        shape[position] = -1
+        grid.append(axes[lever].reshape(shape))
+    surface = evaluate_scenarios(base_reao, tech_score, plane_thresholds, *grid)
+
+    if target_plane_index is not None:
+        feasible = surface["plane_index"] >= target_plane_index
+    else:
+        feasible = surface["combined_score"] >= target_combined_score
+
+    minimal = feasible.copy()
+    for position in range(len(SCENARIO_LEVERS)):
+        lower = [slice(None)] * len(SCENARIO_LEVERS)
+        upper = [slice(None)] * len(SCENARIO_LEVERS)
+        lower[position] = slice(None, -1)
+        upper[position] = slice(1, None)
+        minimal[tuple(upper)] &= ~feasible[tuple(lower)]
+
+    indices = np.nonzero(minimal)
+    values = {lever: axes[lever][indices[position]] for position, lever in enumerate(SCENARIO_LEVERS)}
+    cost = np.zeros(indices[0].size)
+    for lever in SCENARIO_LEVERS:
+        cost = cost + costs.get(lever, 0) * values[lever]
+    order = np.argsort(cost, kind="stable")
+
+    return {
+        "feasible": bool(indices[0].size),
+        "max_combined_score": float(surface["combined_score"].max()),
+        "levers": {lever: lever_values[order] for lever, lever_values in values.items()},
+        "cost": cost[order],
+        "adjusted": {dimension: scores[indices][order] for dimension, scores in surface["adjusted"].items()},
+        "combined_score": surface["combined_score"][indices][order],
+        "plane_index": surface["plane_index"][indices][order]
+    }
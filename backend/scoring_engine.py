@@ -0,0 +1,247 @@
+"""
+Vectorized scoring engine for batches of assessment submissions.
+
+Mirrors the scalar scoring of ScoringModel (scoring_model.py), but scores a
+whole batch at once from a response matrix and a tool-selection matrix. Every
+arithmetic step is applied in the same order as the scalar code so the results
+match it exactly (for integral dimension weights, which keep the weighted sums
+in integer arithmetic).
+"""
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+REAO_DIMENSIONS = ["readiness", "efficiency", "alignment", "opportunity"]
+
+
+@dataclass
+class BatchScores:
+    """Scores for a batch of submissions, one row per submission"""
+    assessment_score: np.ndarray  # (n,)
+    tech_score: np.ndarray  # (n,)
+    combined_score: np.ndarray  # (n,)
+    reao: np.ndarray  # (n, 4) in REAO_DIMENSIONS order
+    plane_index: np.ndarray  # (n,) index into the plane level table
+
+    def __len__(self) -> int:
+        return len(self.assessment_score)
+
+    def reao_dict(self, row: int) -> Dict[str, float]:
+        return {dimension: float(self.reao[row, d]) for d, dimension in enumerate(REAO_DIMENSIONS)}
+
+
+@dataclass
+class ToolImpacts:
+    """A submission scored with every single-tool change of its stack"""
+    tool_ids: List[str]  # catalog tools, one per variant row
+    selected: np.ndarray  # (tools,) whether the submission already has the tool
+    tech_bonus: np.ndarray  # (tools + 1,) REAO tech bonus, row 0 is the submission
+    scores: BatchScores  # tools + 1 rows: the submission, then one toggled tool each
+
+
+class BatchScoringEngine:
+    """Compiles the question set and tech catalog into matrices for batch scoring"""
+
+    def __init__(
+        self,
+        questions: List[Dict[str, Any]],
+        tech_categories: List[Dict[str, Any]],
+        dimension_weights: Dict[str, Dict[str, float]],
+        tier_weights: Dict[str, float],
+        plane_thresholds: Sequence[float],
+        tech_bonus: Dict[str, float],
+    ):
+        # Response columns: every known question plus any mapped question id
+        question_ids = [q["id"] for q in questions]
+        for q_id in dimension_weights:
+            if q_id not in question_ids:
+                question_ids.append(q_id)
+        self.question_ids = question_ids
+        self.question_index = {q_id: i for i, q_id in enumerate(question_ids)}
+
+        # (questions x dimensions) weight with which a question feeds a dimension
+        weights = [weight for dimensions in dimension_weights.values() for weight in dimensions.values()]
+        integral = all(float(weight).is_integer() for weight in weights)
+        self.dimension_matrix = np.zeros(
+            (len(question_ids), len(REAO_DIMENSIONS)),
+            dtype=np.int64 if integral else np.float64
+        )
+        for q_id, dimensions in dimension_weights.items():
+            for dimension, weight in dimensions.items():
+                self.dimension_matrix[self.question_index[q_id], REAO_DIMENSIONS.index(dimension)] += weight
+
+        # Tool columns: one per (category, tool) entry, in catalog order
+        self.tool_columns: Dict[str, List[int]] = {}
+        self.category_slices: List[slice] = []
+        self.category_weights: List[float] = []
+        tool_tier_weights = []
+        for category in tech_categories:
+            start = len(tool_tier_weights)
+            for tool in category["tools"]:
+                self.tool_columns.setdefault(tool["id"], []).append(len(tool_tier_weights))
+                tool_tier_weights.append(tier_weights.get(tool["tier"], 0))
+            self.category_slices.append(slice(start, len(tool_tier_weights)))
+            self.category_weights.append(category["weight"])
+        self.tool_tier_weights = np.array(tool_tier_weights, dtype=np.float64)
+        self.tool_count = len(tool_tier_weights)
+
+        # (catalog tools x tool columns): the columns each distinct tool id occupies
+        self.catalog_tools = list(self.tool_columns)
+        self.tool_masks = np.zeros((len(self.catalog_tools), self.tool_count), dtype=bool)
+        for row, tool_id in enumerate(self.catalog_tools):
+            self.tool_masks[row, self.tool_columns[tool_id]] = True
+
+        self.plane_thresholds = np.array(plane_thresholds, dtype=np.float64)
+        self.tech_bonus = dict(tech_bonus)
+
+    # ------------------------------------------------------------------
+    # Matrix construction
+    # ------------------------------------------------------------------
+
+    def response_matrix(self, responses_list: List[Dict[str, int]]):
+        """
+        Build the (n x questions) response matrix and its answered mask.
+
+        Responses to question ids the engine doesn't know still count towards
+        the assessment score, so their sum and count are returned separately.
+        """
+        n = len(responses_list)
+        values = np.zeros((n, len(self.question_ids)), dtype=np.int64)
+        answered = np.zeros((n, len(self.question_ids)), dtype=np.int64)
+        extra_sum = np.zeros(n, dtype=np.int64)
+        extra_count = np.zeros(n, dtype=np.int64)
+
+        for row, responses in enumerate(responses_list):
+            for q_id, value in responses.items():
+                col = self.question_index.get(q_id)
+                if col is None:
+                    extra_sum[row] += value
+                    extra_count[row] += 1
+                else:
+                    values[row, col] = value
+                    answered[row, col] = 1
+
+        return values, answered, extra_sum, extra_count
+
+    def tool_matrix(self, tech_tools_list: List[List[str]]):
+        """Build the (n x tools) selection matrix and the raw tool count per row"""
+        n = len(tech_tools_list)
+        selected = np.zeros((n, self.tool_count), dtype=bool)
+        raw_count = np.zeros(n, dtype=np.int64)
+
+        for row, tech_tools in enumerate(tech_tools_list):
+            raw_count[row] = len(tech_tools)
+            for tool_id in tech_tools:
+                for col in self.tool_columns.get(tool_id, ()):
+                    selected[row, col] = True
+
+        return selected, raw_count
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def assessment_scores(self, values, answered, extra_sum, extra_count) -> np.ndarray:
+        total = values.sum(axis=1) + extra_sum
+        count = answered.sum(axis=1) + extra_count
+        return np.divide(total, count, out=np.zeros(len(total)), where=count > 0)
+
+    def tech_scores(self, selected: np.ndarray) -> np.ndarray:
+        n = selected.shape[0]
+        score = np.zeros(n)
+        total_weight = np.zeros(n)
+
+        # Accumulate category by category, in catalog order, like the scalar loop
+        for cols, weight in zip(self.category_slices, self.category_weights):
+            in_category = selected[:, cols]
+            count = in_category.sum(axis=1)
+            has_tools = count > 0
+            tier_bonus = in_category @ self.tool_tier_weights[cols]
+            category_score = np.divide(count * 1.5 + tier_bonus, count, out=np.zeros(n), where=has_tools)
+            category_score = np.minimum(10, category_score)
+            score += np.where(has_tools, category_score * weight, 0.0)
+            total_weight += np.where(has_tools, weight, 0.0)
+
+        tech = np.divide(score, total_weight, out=np.zeros(n), where=total_weight > 0)
+        return np.minimum(10, tech)
+
+    def reao_scores(self, values, answered, raw_tool_count, has_responses) -> np.ndarray:
+        dimension_sum = values @ self.dimension_matrix
+        dimension_weight = answered @ self.dimension_matrix
+        reao = np.divide(
+            dimension_sum, dimension_weight,
+            out=np.zeros(dimension_sum.shape), where=dimension_weight > 0
+        )
+
+        # Tech stack bonus (adds to efficiency and readiness)
+        tech_bonus = self.tech_bonuses(raw_tool_count)
+        efficiency = REAO_DIMENSIONS.index("efficiency")
+        readiness = REAO_DIMENSIONS.index("readiness")
+        reao[:, efficiency] = np.minimum(100, reao[:, efficiency] + tech_bonus * self.tech_bonus["efficiency"])
+        reao[:, readiness] = np.minimum(100, reao[:, readiness] + tech_bonus * self.tech_bonus["readiness"])
+
+        # Submissions without responses score zero on every dimension
+        reao[~has_responses] = 0
+        return reao
+
+    def combined_scores(self, assessment_score: np.ndarray, tech_score: np.ndarray) -> np.ndarray:
+        return (assessment_score / 10 + tech_score) / 2
+
+    def plane_indices(self, combined_score: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.plane_thresholds, combined_score, side="right")
+
+    def tech_bonuses(self, raw_tool_count: np.ndarray) -> np.ndarray:
+        return np.minimum(self.tech_bonus["max"], raw_tool_count * self.tech_bonus["per_tool"])
+
+    def score(self, responses_list: List[Dict[str, int]], tech_tools_list: List[List[str]]) -> BatchScores:
+        """Score a batch of (responses, tech_tools) pairs in one pass"""
+        values, answered, extra_sum, extra_count = self.response_matrix(responses_list)
+        selected, raw_tool_count = self.tool_matrix(tech_tools_list)
+        return self.score_matrices(values, answered, extra_sum, extra_count, selected, raw_tool_count)
+
+    def score_matrices(self, values, answered, extra_sum, extra_count, selected, raw_tool_count) -> BatchScores:
+        has_responses = (answered.sum(axis=1) + extra_count) > 0
+
+        assessment_score = self.assessment_scores(values, answered, extra_sum, extra_count)
+        tech_score = self.tech_scores(selected)
+        combined_score = self.combined_scores(assessment_score, tech_score)
+
+        return BatchScores(
+            assessment_score=assessment_score,
+            tech_score=tech_score,
+            combined_score=combined_score,
+            reao=self.reao_scores(values, answered, raw_tool_count, has_responses),
+            plane_index=self.plane_indices(combined_score),
+        )
+
+    def tool_impacts(self, responses: Dict[str, int], tech_tools: List[str]) -> ToolImpacts:
+        """
+        Score one submission and, in the same pass, every variant that adds a
+        catalog tool it lacks or removes one it has (all of its occurrences).
+        """
+        values, answered, extra_sum, extra_count = self.response_matrix([responses])
+        selected, raw_tool_count = self.tool_matrix([tech_tools])
+
+        has_tool = (selected & self.tool_masks).any(axis=1)
+        variants = np.vstack([selected, selected ^ self.tool_masks])
+        occurrences = Counter(tech_tools)
+        removed = np.array([occurrences[tool_id] for tool_id in self.catalog_tools], dtype=np.int64)
+        variant_count = np.concatenate([raw_tool_count, raw_tool_count[0] + np.where(has_tool, -removed, 1)])
+
+        rows = len(variants)
+        scores = self.score_matrices(
+            np.repeat(values, rows, axis=0),
+            np.repeat(answered, rows, axis=0),
+            np.repeat(extra_sum, rows),
+            np.repeat(extra_count, rows),
+            variants,
+            variant_count
+        )
+        return ToolImpacts(
+            tool_ids=self.catalog_tools,
+            selected=has_tool,
+            tech_bonus=self.tech_bonuses(variant_count),
+            scores=scores
+        )
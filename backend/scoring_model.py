@@ -0,0 +1,308 @@
+"""
+Compiled, versioned scoring model.
+
+Everything that decides how an assessment is scored (question-to-dimension
+weights, tier weights, the tech-stack bonus, plane levels and thresholds,
+insight bands and journey templates) lives in a versioned data file,
+scoring_model.json. It is compiled once, together with the question set and
+tech catalog, into an immutable ScoringModel that also owns the batch engine
+and the memoized tech scorer derived from it.
+
+Requests read the current model once and use it throughout, so a hot reload
+(ScoringModelStore.reload) is a single reference swap: a request never mixes
+two versions. Results record model.version, so stale ones can be found and
+re-scored later.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from scoring_engine import REAO_DIMENSIONS, BatchScoringEngine
+from tech_catalog import TechScorer, catalog_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_model.json")
+
+REAO_AVERAGE = "reao_average"
+
+
+class InvalidScoringModel(ValueError):
+    pass
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def validate_model_data(data: Dict[str, Any]):
+    """Raise InvalidScoringModel when the data file is inconsistent"""
+    for key in ("version", "dimension_weights", "tier_weights", "tech_bonus", "plane_thresholds",
+                "plane_levels", "insight_bands", "recommendations"):
+        if key not in data:
+            raise InvalidScoringModel(f"Scoring model is missing '{key}'")
+    for q_id, dimensions in data["dimension_weights"].items():
+        for dimension, weight in dimensions.items():
+            if dimension not in REAO_DIMENSIONS:
+                raise InvalidScoringModel(f"Unknown dimension '{dimension}' for question '{q_id}'")
+            if weight <= 0:
+                raise InvalidScoringModel(f"Dimension weights must be positive ('{q_id}' -> '{dimension}')")
+    thresholds = data["plane_thresholds"]
+    if list(thresholds) != sorted(thresholds):
+        raise InvalidScoringModel("plane_thresholds must be ascending")
+    if len(data["plane_levels"]) != len(thresholds) + 1:
+        raise InvalidScoringModel("There must be one more plane level than plane thresholds")
+    for band in data["insight_bands"]:
+        if band["metric"] not in REAO_DIMENSIONS and band["metric"] != REAO_AVERAGE:
+            raise InvalidScoringModel(f"Unknown insight metric '{band['metric']}'")
+        if len(band["messages"]) != len(band["thresholds"]) + 1:
+            raise InvalidScoringModel(f"Insight band '{band['metric']}' needs one more message than thresholds")
+    for key in ("per_tool", "max", "efficiency", "readiness"):
+        if key not in data["tech_bonus"]:
+            raise InvalidScoringModel(f"tech_bonus is missing '{key}'")
+
+
+class ScoringModel:
+    """Immutable scoring model compiled from the data file and the catalogs"""
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        questions: List[Dict[str, Any]],
+        tech_categories: List[Dict[str, Any]],
+        tech_cache_size: int = 4096
+    ):
+        validate_model_data(data)
+        self.declared_version = str(data["version"])
+        # The version also hashes the content and catalogs, so edits without a bump still count as a new model
+        content = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.sha256(
+            (content + catalog_fingerprint(tech_categories, data["tier_weights"]) + json.dumps([q["id"] for q in questions])).encode("utf-8")
+        ).hexdigest()[:8]
+        self.version = f"{self.declared_version}+{digest}"
+
+        self.dimension_weights = _freeze(data["dimension_weights"])
+        self.tier_weights = _freeze(data["tier_weights"])
+        self.tech_bonus = _freeze(data["tech_bonus"])
+        self.plane_thresholds: Tuple[float, ...] = tuple(data["plane_thresholds"])
+        self.plane_levels = _freeze(data["plane_levels"])
+        self.plane_names: Tuple[str, ...] = tuple(level["name"] for level in data["plane_levels"])
+
+        # question id -> ((dimension, weight), ...)
+        self._question_dimensions = {
+            q_id: tuple(dimensions.items()) for q_id, dimensions in data["dimension_weights"].items()
+        }
+        self._insight_bands = tuple(
+            (band["metric"], tuple(band["thresholds"]), tuple(band["messages"]))
+            for band in data["insight_bands"]
+        )
+
+        recommendations = data["recommendations"]
+        self._question_ids = tuple(q["id"] for q in questions)
+        self._weak_below = recommendations["weak_below"]
+        self._high_priority_below = recommendations["high_priority_below"]
+        self._max_weak_areas = recommendations["max_weak_areas"]
+        self.journeys = _freeze(recommendations["journeys"])
+
+        # tool id -> (tool, category name), for labelling per-tool results
+        self.tool_catalog = MappingProxyType({
+            tool["id"]: (_freeze(tool), category["name"])
+            for category in tech_categories for tool in category["tools"]
+        })
+
+        self.tech_scorer = TechScorer(tech_categories, dict(self.tier_weights), maxsize=tech_cache_size)
+        self.batch_engine = BatchScoringEngine(
+            questions,
+            tech_categories,
+            data["dimension_weights"],
+            data["tier_weights"],
+            self.plane_thresholds,
+            data["tech_bonus"]
+        )
+
+    # ------------------------------------------------------------------
+    # Scalar scoring
+    # ------------------------------------------------------------------
+
+    def reao_scores(self, responses: Dict[str, int], tech_tools: List[str]) -> Dict[str, float]:
+        """Readiness, Efficiency, Alignment, Opportunity: weighted response averages plus the tech bonus"""
+        if not responses:
+            return {"readiness": 0, "efficiency": 0, "alignment": 0, "opportunity": 0}
+
+        sums = {"readiness": 0, "efficiency": 0, "alignment": 0, "opportunity": 0}
+        weights = {"readiness": 0, "efficiency": 0, "alignment": 0, "opportunity": 0}
+        for q_id, score in responses.items():
+            for dimension, weight in self._question_dimensions.get(q_id, ()):
+                sums[dimension] += score * weight
+                weights[dimension] += weight
+        return self.reao_from_sums(sums, weights, len(tech_tools))
+
+    def question_weights(self, q_id: str) -> Tuple[Tuple[str, float], ...]:
+        """(dimension, weight) pairs a question's response feeds"""
+        return self._question_dimensions.get(q_id, ())
+
+    def reao_from_sums(self, sums: Dict[str, float], weights: Dict[str, float], tool_count: int) -> Dict[str, float]:
+        """REAO from per-dimension weighted response sums and weights, plus the tech bonus"""
+        reao = {
+            dimension: sums[dimension] / weights[dimension] if weights[dimension] else 0
+            for dimension in sums
+        }
+
+        # Tech stack bonus (adds to efficiency and readiness)
+        bonus = self.tech_bonus
+        tech_bonus = min(bonus["max"], tool_count * bonus["per_tool"])
+        reao["efficiency"] = min(100, reao["efficiency"] + tech_bonus * bonus["efficiency"])
+        reao["readiness"] = min(100, reao["readiness"] + tech_bonus * bonus["readiness"])
+        return reao
+
+    def assessment_score(self, responses: Dict[str, int]) -> float:
+        if not responses:
+            return 0.0
+        scores = list(responses.values())
+        return sum(scores) / len(scores)
+
+    def tech_score(self, selected_tools: List[str]) -> float:
+        if not selected_tools:
+            return 0.0
+        return self.tech_scorer.score(selected_tools)
+
+    def combined_score(self, assessment_score: float, tech_score: float) -> float:
+        return (assessment_score / 10 + tech_score) / 2
+
+    def plane_index(self, combined_score: float) -> int:
+        return bisect_right(self.plane_thresholds, combined_score)
+
+    def plane_level(self, assessment_score: float, tech_score: float) -> Dict[str, str]:
+        return dict(self.plane_levels[self.plane_index(self.combined_score(assessment_score, tech_score))])
+
+    def insights(self, reao_scores: Dict[str, float]) -> List[str]:
+        values = {dimension: reao_scores.get(dimension, 0) for dimension in REAO_DIMENSIONS}
+        values[REAO_AVERAGE] = (values["readiness"] + values["efficiency"] + values["alignment"] + values["opportunity"]) / 4
+        return [
+            messages[bisect_right(thresholds, values[metric])]
+            for metric, thresholds, messages in self._insight_bands
+        ]
+
+    def recommendations(self, responses: Dict[str, int], answered_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Journeys for the weakest areas; each call returns fresh dicts.
+        Unanswered questions count as 0 unless answered_only is set.
+        """
+        weak_areas = []
+        for q_id in self._question_ids:
+            if answered_only and q_id not in responses:
+                continue
+            score = responses.get(q_id, 0)
+            if score < self._weak_below:
+                weak_areas.append((score, q_id))
+
+        # Weakest first (stable, so ties keep question order)
+        weak_areas.sort(key=lambda area: area[0])
+
+        recommendations = []
+        for score, q_id in weak_areas[:self._max_weak_areas]:
+            journey = self.journeys.get(q_id)
+            if journey is not None:
+                recommendation = _thaw(journey)
+                recommendation["current_score"] = score
+                recommendation["priority"] = "High" if score < self._high_priority_below else "Medium"
+                recommendations.append(recommendation)
+        return recommendations
+
+    # ------------------------------------------------------------------
+    # Batch scoring
+    # ------------------------------------------------------------------
+
+    def score_batch(self, responses_list: List[Dict[str, int]], tech_tools_list: List[List[str]]) -> List[Dict[str, Any]]:
+        """
+        Scores, plane level, REAO, insights and recommendations of many
+        assessments, computed in one vectorized pass (the scored fields of a
+        result document)
+        """
+        scores = self.batch_engine.score(responses_list, tech_tools_list)
+        results = []
+        for row, responses in enumerate(responses_list):
+            reao_scores = scores.reao_dict(row)
+            results.append({
+                "assessment_score": float(scores.assessment_score[row]),
+                "tech_score": float(scores.tech_score[row]),
+                "combined_score": float(scores.combined_score[row]),
+                "plane_level": dict(self.plane_levels[scores.plane_index[row]]),
+                "reao_scores": reao_scores,
+                "insights": self.insights(reao_scores),
+                "recommendations": self.recommendations(responses)
+            })
+        return results
+
+
+def load_model_data(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ScoringModelStore:
+    """Holds the current ScoringModel and swaps in a recompiled one on reload"""
+
+    def __init__(self, path: str, questions: List[Dict[str, Any]], tech_categories: List[Dict[str, Any]], tech_cache_size: int = 4096):
+        self.path = path
+        self.questions = questions
+        self.tech_categories = tech_categories
+        self.tech_cache_size = tech_cache_size
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self.model = self._compile()
+
+    def _compile(self) -> ScoringModel:
+        mtime = os.path.getmtime(self.path)
+        model = ScoringModel(load_model_data(self.path), self.questions, self.tech_categories, self.tech_cache_size)
+        self._mtime = mtime
+        return model
+
+    def reload(self) -> bool:
+        """
+        Recompile from the data file. The new model replaces the current one
+        only if it compiled and its version differs; returns whether it was
+        swapped.
+        """
+        with self._lock:
+            model = self._compile()
+            if model.version == self.model.version:
+                return False
+            previous = self.model.version
+            self.model = model
+        logger.info(f"Scoring model reloaded: {previous} -> {model.version}")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the data file's mtime changed; a broken file keeps the current model"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.error(f"Error reading scoring model {self.path}: {str(e)}")
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            return self.reload()
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error reloading scoring model from {self.path}: {str(e)}")
+            # Don't retry the same broken file on every poll
+            self._mtime = mtime
+            return False
@@ -0,0 +1,57 @@
+"""
+Fast JSON encoding for API responses.
+
+FastAPI's default path runs every returned value through jsonable_encoder
+(a recursive walk that rebuilds the whole structure) and, for Pydantic
+models, validates and dumps them again before json.dumps sees them. Hot
+endpoints instead build their plain document once, persist that same dict,
+and return it as a JSONBytesResponse, which encodes it in a single orjson
+call. Declared response_models keep the OpenAPI schema; FastAPI skips
+validating and re-encoding when an endpoint returns a Response itself.
+
+orjson is optional: without it the encoder falls back to the stdlib json
+module with the same output conventions (UTF-8, compact separators,
+ISO-8601 datetimes).
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # numpy arrays and scalars (orjson encodes contiguous arrays natively)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        """Encode content as compact UTF-8 JSON bytes"""
+        return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+else:
+    def dumps(content: Any) -> bytes:
+        """Encode content as compact UTF-8 JSON bytes"""
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class JSONBytesResponse(JSONResponse):
+    """JSON response encoded with dumps() in one step (a JSONResponse, so OpenAPI shows the model schema)"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            # Already encoded, e.g. shared with another consumer of the same document
+            return content
+        return dumps(content)
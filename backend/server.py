@@ -1,25 +1,101 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
 import os
+import asyncio
+import hashlib
+import json
 import logging
+import tempfile
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
+from contextlib import asynccontextmanager
 import uuid
 from datetime import datetime, timezone
 
-# MongoDB connection - read directly from environment variables (Replit Secrets)
-mongo_url = os.environ.get('MONGO_URL')
-db_name = os.environ.get('DB_NAME')
+from scoring_model import DEFAULT_MODEL_PATH, ScoringModel, ScoringModelStore
+from scoring_engine import REAO_DIMENSIONS
+from static_payloads import StaticPayload
+from scenarios import (
+    SCENARIO_LEVERS, axis_size, evaluate_scenarios, expand_axis, sample_scenarios, simulate_scenarios,
+    solve_scenarios, solver_axis, solver_axis_size
+)
+from assessment_cache import AssessmentCache, create_shared_backend
+from db_maintenance import ensure_indexes, migrate_created_at
+from write_behind import WriteBehindQueue
+import export
+import metrics
+from cohorts import COHORT_METRICS, COHORT_QUANTILES, REAO_METRICS, ROLLUP_PROJECTION, CohortBenchmarks
+from pagination import HISTORY_SORT, InvalidCursor, encode_cursor, history_projection, keyset_filter
+from serialization import JSONBytesResponse, dumps
+from result_memo import ResultMemo, content_hash
+from rescoring import RESCORE_MIGRATION, is_stale
+from live_scoring import LiveScoringError, LiveScoringSession
+from question_bank import DEFAULT_BANK_PATH, QuestionBank
+from ingest import IngestError, IngestJob, RowValidator, detect_format, run_ingest_job
+from database import MongoSettings, PoolMonitor, create_client, ping, warm_up
+
+# MongoDB client: created and warmed in the lifespan hook (connect_db), not at
+# import, so settings errors surface at startup and the pool is warm before traffic
+client = None
+db = None
+mongo_settings: Optional[MongoSettings] = None
+mongo_pool = PoolMonitor()
+mongo_warm = False
+
+# Read-through cache of stored assessments (set ASSESSMENT_CACHE_SIZE=0 to disable)
+ASSESSMENT_CACHE_TTL = float(os.environ.get('ASSESSMENT_CACHE_TTL', '300'))
+# Writes in one worker can't invalidate another worker's in-process entries, so
+# with several workers (WEB_CONCURRENCY, set by main.py) those only live briefly
+WORKER_PROCESSES = int(os.environ.get('WEB_CONCURRENCY', '1'))
+ASSESSMENT_CACHE_LOCAL_TTL = float(os.environ.get(
+    'ASSESSMENT_CACHE_LOCAL_TTL',
+    str(ASSESSMENT_CACHE_TTL if WORKER_PROCESSES <= 1 else 2)
+))
+assessment_cache = AssessmentCache(
+    maxsize=int(os.environ.get('ASSESSMENT_CACHE_SIZE', '1024')),
+    ttl=ASSESSMENT_CACHE_TTL,
+    local_ttl=ASSESSMENT_CACHE_LOCAL_TTL,
+    shared=create_shared_backend(os.environ.get('ASSESSMENT_CACHE_URL'))
+)
+
+async def load_assessment(assessment_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a stored assessment through the read-through cache"""
+    if write_queue is not None:
+        # Queued results are served from the queue until their write lands
+        queued = write_queue.pending(assessment_id)
+        if queued is not None:
+            return queued
+    return await assessment_cache.get_or_load(
+        assessment_id,
+        lambda: db.assessments.find_one({"id": assessment_id}, {"_id": 0})
+    )
 
-if not mongo_url or not db_name:
-    raise ValueError("MONGO_URL and DB_NAME must be set in environment variables (Replit Secrets)")
+# Opt-in write-behind persistence: results are queued and flushed as bulk writes.
+# WRITE_DURABILITY=acknowledged waits for the flush before responding, queued doesn't
+WRITE_BEHIND = os.environ.get('WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
 
-client = AsyncIOMotorClient(mongo_url)
-db = client[db_name]
+write_queue = WriteBehindQueue(
+    lambda docs: write_results(docs),
+    durability=os.environ.get('WRITE_DURABILITY', 'acknowledged'),
+    batch_size=int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', '500')),
+    flush_interval=float(os.environ.get('WRITE_BEHIND_FLUSH_MS', '50')) / 1000,
+    max_pending=int(os.environ.get('WRITE_BEHIND_MAX_PENDING', '10000')),
+    retry_interval=float(os.environ.get('WRITE_BEHIND_RETRY_SECONDS', '5'))
+) if WRITE_BEHIND else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
 
 # Create the main app without a prefix
-app = FastAPI()
+# Endpoints that still return plain values skip the stdlib encoder; hot ones return JSONBytesResponse directly
+app = FastAPI(lifespan=lifespan, default_response_class=JSONBytesResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -68,6 +144,20 @@ class AssessmentResult(BaseModel):
     insights: List[str]
     recommendations: List[Dict[str, Any]]
     reao_scores: Dict[str, float] = Field(default_factory=dict)
+    # Version of the scoring model the result was computed with
+    model_version: Optional[str] = None
+    # Hash of responses, tech_tools and model_version (see result_memo.content_hash)
+    content_hash: Optional[str] = None
+    # Deep dives only: per-topic scores and the question bank they were scored with
+    topic_scores: Optional[Dict[str, Any]] = None
+    question_bank_version: Optional[str] = None
+
+class BatchAssessmentResult(BaseModel):
+    results: List[AssessmentResult]
+    count: int
+
+class BatchAssessmentSubmission(BaseModel):
+    submissions: List[AssessmentSubmission]
 
 class ScenarioEstimate(BaseModel):
     budget_pct: float = 0  # -50 to +50
@@ -75,6 +165,61 @@ class ScenarioEstimate(BaseModel):
     tech_utilization_pct: float = 0  # -30 to +30
     process_maturity_pct: float = 0  # -20 to +20
 
+class ScenarioAxis(BaseModel):
+    """Either explicit values or an inclusive start/stop range with a number of steps"""
+    values: Optional[List[float]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: Optional[int] = None
+
+def _fixed_axis() -> ScenarioAxis:
+    return ScenarioAxis(values=[0])
+
+class ScenarioSweep(BaseModel):
+    budget_pct: ScenarioAxis = Field(default_factory=_fixed_axis)
+    headcount: ScenarioAxis = Field(default_factory=_fixed_axis)
+    tech_utilization_pct: ScenarioAxis = Field(default_factory=_fixed_axis)
+    process_maturity_pct: ScenarioAxis = Field(default_factory=_fixed_axis)
+
+class ScenarioGoal(BaseModel):
+    """
+    Target for the inverse solver: a plane level name or a combined score
+    (default: the plane level above the stored one), with a cost per unit
+    of each lever (default 1) and optional search axes (default: 0 up to the
+    lever's upper bound in unit steps)
+    """
+    target_plane: Optional[str] = None
+    target_combined_score: Optional[float] = None
+    costs: Dict[str, float] = Field(default_factory=dict)
+    budget_pct: Optional[ScenarioAxis] = None
+    headcount: Optional[ScenarioAxis] = None
+    tech_utilization_pct: Optional[ScenarioAxis] = None
+    process_maturity_pct: Optional[ScenarioAxis] = None
+    limit: int = 20
+
+class LeverDistribution(BaseModel):
+    """
+    Uncertain lever value: "fixed" (value), "range" (uniform low..high),
+    "normal" (mean, std) or "triangular" (low, mode, high)
+    """
+    distribution: str = "fixed"
+    value: Optional[float] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    mode: Optional[float] = None
+
+class ScenarioSimulation(BaseModel):
+    """ScenarioEstimate where each lever is an exact number or a distribution"""
+    budget_pct: Union[float, LeverDistribution] = 0
+    headcount: Union[float, LeverDistribution] = 0
+    tech_utilization_pct: Union[float, LeverDistribution] = 0
+    process_maturity_pct: Union[float, LeverDistribution] = 0
+    samples: int = 20000
+    seed: Optional[int] = None
+    percentiles: List[float] = Field(default_factory=lambda: [5, 25, 50, 75, 95])
+
 # ============================================================================
 # ASSESSMENT QUESTIONS DATA
 # ============================================================================
@@ -289,245 +434,211 @@ TECH_CATEGORIES = [
 # SCORING LOGIC - 4 DIMENSIONS (R/E/A/O)
 # ============================================================================
 
+# Scoring model (dimension weights, tier weights, plane levels and thresholds, insight
+# bands, journey templates) compiled from a versioned data file together with the
+# question set and tech catalog. It owns the batch engine and the memoized tech scorer
+scoring_models = ScoringModelStore(
+    os.environ.get('SCORING_MODEL_PATH', DEFAULT_MODEL_PATH),
+    ASSESSMENT_QUESTIONS,
+    TECH_CATEGORIES,
+    tech_cache_size=int(os.environ.get('TECH_SCORE_CACHE_SIZE', '4096'))
+)
+
+# Seconds between checks of the model file for edits (0 disables hot reload)
+SCORING_MODEL_RELOAD_SECONDS = float(os.environ.get('SCORING_MODEL_RELOAD_SECONDS', '10'))
+
+def current_model() -> ScoringModel:
+    """The scoring model to use for a whole request (read it once, then pass it along)"""
+    return scoring_models.model
+
 def calculate_reao_scores(responses: Dict[str, int], tech_tools: List[str]) -> Dict[str, float]:
     """
     Calculate 4-dimension scores: Readiness, Efficiency, Alignment, Opportunity
     """
-    if not responses:
-        return {"readiness": 0, "efficiency": 0, "alignment": 0, "opportunity": 0}
-    
-    # Map questions to dimensions
-    dimension_mapping = {
-        "strategy": ["readiness", "alignment"],
-        "content": ["efficiency", "readiness"],
-        "demand_gen": ["readiness", "opportunity"],
-        "sales_alignment": ["alignment", "efficiency"],
-        "operations": ["efficiency", "alignment"],
-        "tech_stack": ["efficiency", "readiness"],
-        "abm": ["opportunity", "readiness"],
-        "analytics": ["efficiency", "opportunity"],
-        "team": ["readiness", "alignment"],
-        "budget": ["alignment", "opportunity"]
-    }
-    
-    # Calculate dimension scores
-    dimension_scores = {"readiness": [], "efficiency": [], "alignment": [], "opportunity": []}
-    
-    for q_id, score in responses.items():
-        if q_id in dimension_mapping:
-            for dimension in dimension_mapping[q_id]:
-                dimension_scores[dimension].append(score)
-    
-    # Average scores per dimension
-    reao = {}
-    for dimension, scores in dimension_scores.items():
-        reao[dimension] = sum(scores) / len(scores) if scores else 0
-    
-    # Tech stack bonus (adds to efficiency and readiness)
-    tech_count = len(tech_tools)
-    tech_bonus = min(10, tech_count * 0.8)  # Up to 10 points bonus
-    reao["efficiency"] = min(100, reao["efficiency"] + tech_bonus * 0.6)
-    reao["readiness"] = min(100, reao["readiness"] + tech_bonus * 0.4)
-    
-    return reao
+    return current_model().reao_scores(responses, tech_tools)
 
 def calculate_assessment_score(responses: Dict[str, int]) -> float:
     """Calculate assessment score from question responses"""
-    if not responses:
-        return 0.0
-    
-    scores = list(responses.values())
-    return sum(scores) / len(scores)
+    return current_model().assessment_score(responses)
 
 def calculate_tech_score(selected_tools: List[str]) -> float:
     """Calculate tech stack score based on selected tools"""
-    if not selected_tools:
-        return 0.0
-    
-    score = 0.0
-    total_weight = 0.0
-    
-    for category in TECH_CATEGORIES:
-        selected_in_category = [
-            tool for tool in category["tools"] 
-            if tool["id"] in selected_tools
-        ]
-        
-        if selected_in_category:
-            category_score = len(selected_in_category) * 1.5
-            
-            for tool in selected_in_category:
-                if tool["tier"] == "enterprise":
-                    category_score += 2
-                elif tool["tier"] == "mid":
-                    category_score += 1.5
-                elif tool["tier"] == "foundational":
-                    category_score += 0.5
-            
-            category_score = min(10, category_score / len(selected_in_category))
-            score += category_score * category["weight"]
-            total_weight += category["weight"]
-    
-    return min(10, score / total_weight) if total_weight > 0 else 0.0
+    return current_model().tech_score(selected_tools)
 
 def get_plane_level(assessment_score: float, tech_score: float) -> Dict[str, str]:
     """Determine plane level based on combined scores"""
-    combined = (assessment_score / 10 + tech_score) / 2
-    
-    if combined < 2:
-        return {
-            "name": "Grounded",
-            "emoji": "✈️",
-            "description": "Foundation building phase"
-        }
-    elif combined < 3:
-        return {
-            "name": "Single Engine",
-            "emoji": "🛩️",
-            "description": "Basic capabilities emerging"
-        }
-    elif combined < 4.5:
-        return {
-            "name": "Regional Jet",
-            "emoji": "✈️",
-            "description": "Growing sophistication"
-        }
-    elif combined < 6:
-        return {
-            "name": "Commercial Jet",
-            "emoji": "🛫",
-            "description": "Advanced readiness"
-        }
-    elif combined < 7.5:
-        return {
-            "name": "Wide-body Jet",
-            "emoji": "✈️",
-            "description": "Enterprise capability"
-        }
-    else:
-        return {
-            "name": "Airbus 380",
-            "emoji": "🛫",
-            "description": "Maximum operational capability"
-        }
+    return current_model().plane_level(assessment_score, tech_score)
 
 def generate_insights(responses: Dict[str, int], tech_tools: List[str], reao_scores: Dict[str, float]) -> List[str]:
     """Generate insights based on assessment, tech stack, and R/E/A/O scores"""
-    insights = []
-    
-    # R/E/A/O specific insights
-    r = reao_scores.get("readiness", 0)
-    e = reao_scores.get("efficiency", 0)
-    a = reao_scores.get("alignment", 0)
-    o = reao_scores.get("opportunity", 0)
-    
-    # Readiness insights
-    if r < 50:
-        insights.append("🎯 Readiness: Build foundational capabilities and team skills before scaling")
-    elif r < 75:
-        insights.append("🎯 Readiness: Strong foundation - ready to scale operations")
-    else:
-        insights.append("🎯 Readiness: Excellent preparedness for advanced initiatives")
-    
-    # Efficiency insights
-    if e < 50:
-        insights.append("⚡ Efficiency: Automate repetitive tasks and improve process workflows")
-    elif e < 75:
-        insights.append("⚡ Efficiency: Good operational rhythm - optimize key bottlenecks")
-    else:
-        insights.append("⚡ Efficiency: Highly optimized operations - focus on innovation")
-    
-    # Alignment insights
-    if a < 50:
-        insights.append("🎯 Alignment: Strengthen cross-functional collaboration and shared goals")
-    elif a < 75:
-        insights.append("🎯 Alignment: Good coordination - deepen strategic integration")
-    else:
-        insights.append("🎯 Alignment: Exceptional team sync and strategic cohesion")
-    
-    # Opportunity insights
-    if o < 50:
-        insights.append("🚀 Opportunity: Focus on quick wins before pursuing aggressive growth")
-    elif o < 75:
-        insights.append("🚀 Opportunity: Strong position - expand into adjacent channels")
-    else:
-        insights.append("🚀 Opportunity: Prime position for market leadership initiatives")
-    
-    # Overall strategic guidance
-    avg_reao = (r + e + a + o) / 4
-    if avg_reao < 50:
-        insights.append("📊 Strategic Priority: Build foundations before scaling")
-    elif avg_reao < 75:
-        insights.append("📊 Strategic Priority: Scale proven channels and systematize")
-    else:
-        insights.append("📊 Strategic Priority: Lead with innovation and market expansion")
-    
-    return insights
+    return current_model().insights(reao_scores)
 
 def generate_recommendations(responses: Dict[str, int], tech_tools: List[str]) -> List[Dict[str, Any]]:
     """Generate journey recommendations based on assessment"""
-    recommendations = []
-    
-    # Analyze weak areas
-    weak_areas = []
-    for q in ASSESSMENT_QUESTIONS:
-        score = responses.get(q["id"], 0)
-        if score < 50:
-            weak_areas.append({
-                "category": q["category"],
-                "score": score,
-                "id": q["id"]
-            })
-    
-    # Sort by score (weakest first)
-    weak_areas.sort(key=lambda x: x["score"])
-    
-    # Generate journey recommendations
-    journey_map = {
-        "abm": {
-            "title": "ABM → Operations Excellence",
-            "description": "Strategic targeting of high-value accounts with personalized campaigns",
-            "stages": [
-                "Account identification and tiering",
-                "Personalized content and engagement",
-                "Sales-marketing orchestration"
-            ],
-            "timeline": "12-16 weeks",
-            "required_tools": ["salesforce", "6sense", "linkedin-ads"]
-        },
-        "analytics": {
-            "title": "Analytics → Performance Optimization",
-            "description": "Build comprehensive measurement and attribution capabilities",
-            "stages": [
-                "Define metrics and KPIs",
-                "Implement tracking and dashboards",
-                "Advanced attribution modeling"
-            ],
-            "timeline": "10-14 weeks",
-            "required_tools": ["ga4", "mixpanel", "tableau"]
-        },
-        "content": {
-            "title": "Content → Distribution Mastery",
-            "description": "Scale content production and optimize distribution",
-            "stages": [
-                "Content audit and strategy",
-                "Editorial calendar and workflows",
-                "Multi-channel distribution"
-            ],
-            "timeline": "8-12 weeks",
-            "required_tools": ["hubspot-cms", "semrush", "wordpress"]
-        }
+    return current_model().recommendations(responses)
+
+# ============================================================================
+# RESULT DEDUPLICATION
+# ============================================================================
+
+# Scores of recently scored inputs, shared by assessments with identical answers
+result_memo = ResultMemo(maxsize=int(os.environ.get('RESULT_MEMO_SIZE', '4096')))
+
+submit_deduplicated = metrics.registry.counter(
+    "submit_deduplicated_total", "Resubmissions answered with the unchanged stored result"
+)
+
+# ============================================================================
+# BATCH SCORING
+# ============================================================================
+
+# Largest batch accepted by /assessment/submit/batch
+BATCH_SUBMIT_LIMIT = int(os.environ.get('BATCH_SUBMIT_LIMIT', '5000'))
+
+def result_document(
+    model: ScoringModel,
+    submission: AssessmentSubmission,
+    assessment_score: float,
+    tech_score: float,
+    combined_score: float,
+    plane_level: Dict[str, str],
+    reao_scores: Dict[str, float],
+    insights: List[str],
+    recommendations: List[Dict[str, Any]],
+    digest: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Plain result document with AssessmentResult's fields, in order
+    Built once, then stored and returned as-is (no model validation or dump);
+    pass the content hash as `digest` when it is already known
+    """
+    # BSON dates keep milliseconds: truncate so the response matches later reads
+    created_at = datetime.now(timezone.utc)
+    created_at = created_at.replace(microsecond=created_at.microsecond // 1000 * 1000)
+    return {
+        "id": submission.assessment_id or str(uuid.uuid4()),
+        "assessment_score": float(assessment_score),
+        "tech_score": float(tech_score),
+        "combined_score": float(combined_score),
+        "plane_level": plane_level,
+        "responses": submission.responses,
+        "tech_tools": submission.tech_tools,
+        "created_at": created_at,
+        "insights": insights,
+        "recommendations": recommendations,
+        "reao_scores": {dimension: float(value) for dimension, value in reao_scores.items()},
+        "model_version": model.version,
+        "content_hash": digest or content_hash(submission.responses, submission.tech_tools, model.version)
     }
+
+def score_submissions(submissions: List[AssessmentSubmission]) -> List[Dict[str, Any]]:
+    """Score many submissions in one vectorized pass"""
+    model = current_model()
+    scores = model.score_batch(
+        [submission.responses for submission in submissions],
+        [submission.tech_tools for submission in submissions]
+    )
+    return [result_document(model, submission, **fields) for submission, fields in zip(submissions, scores)]
+
+# ============================================================================
+# COHORT BENCHMARKS
+# ============================================================================
+
+# Rollup of REAO/score histograms, plane levels and tool adoption across all assessments
+COHORT_BENCHMARKS = os.environ.get('COHORT_BENCHMARKS', '1').lower() not in ('0', 'false', 'no')
+
+# Deltas are accumulated per worker and written with one $inc every COHORT_FLUSH_SECONDS
+COHORT_FLUSH_SECONDS = float(os.environ.get('COHORT_FLUSH_SECONDS', '1'))
+
+cohort_benchmarks = CohortBenchmarks(
+    lambda: current_model().plane_names,
+    [tool["id"] for category in TECH_CATEGORIES for tool in category["tools"]],
+    refresh_seconds=float(os.environ.get('COHORT_REFRESH_SECONDS', '5'))
+)
+
+def record_cohort_changes(added: List[Dict[str, Any]], removed: List[Dict[str, Any]]):
+    """Add submitted/deleted assessments to the benchmark rollup delta (never fails the request)"""
+    if not COHORT_BENCHMARKS:
+        return
+    try:
+        cohort_benchmarks.add(added=added, removed=removed)
+    except Exception as e:
+        logger.error(f"Error updating cohort benchmarks: {str(e)}")
+
+async def flush_cohort_changes():
+    try:
+        await cohort_benchmarks.flush(db)
+    except Exception as e:
+        logger.error(f"Error saving cohort benchmarks: {str(e)}")
+
+async def flush_cohort_changes_periodically():
+    while True:
+        await asyncio.sleep(COHORT_FLUSH_SECONDS)
+        await flush_cohort_changes()
+
+# ============================================================================
+# PERSISTENCE
+# ============================================================================
+
+async def save_results(results: List[Dict[str, Any]]):
+    """Persist result documents, directly or through the write-behind queue"""
+    docs = [(result["id"], result) for result in results]
+    
+    if write_queue is not None:
+        with metrics.stage("persist", "enqueue"):
+            await write_queue.submit_many(docs)
+        return
     
-    for area in weak_areas[:3]:
-        area_id = area["id"]
-        if area_id in journey_map:
-            journey = journey_map[area_id]
-            journey["current_score"] = area["score"]
-            journey["priority"] = "High" if area["score"] < 30 else "Medium"
-            recommendations.append(journey)
+    await write_results(docs)
+
+async def write_results(docs: List[Any]):
+    """Upsert (assessment_id, document) pairs and update the benchmark rollup"""
+    # Previous versions of resubmitted assessments leave the benchmark rollup
+    previous = []
+    if len(docs) == 1:
+        assessment_id, doc = docs[0]
+        with metrics.stage("persist", "write"):
+            if COHORT_BENCHMARKS:
+                # The upsert returns the version it replaces: no extra read, no race with a concurrent resubmit
+                replaced = await db.assessments.find_one_and_update(
+                    {"id": assessment_id},
+                    {"$set": doc},
+                    projection=ROLLUP_PROJECTION,
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE
+                )
+                previous = [replaced] if replaced is not None else []
+            else:
+                await db.assessments.update_one({"id": assessment_id}, {"$set": doc}, upsert=True)
+    elif docs:
+        if COHORT_BENCHMARKS:
+            # A bulk write can't return what it replaced
+            with metrics.stage("persist", "rollup_read"):
+                previous = await db.assessments.find(
+                    {"id": {"$in": list({assessment_id for assessment_id, _ in docs})}},
+                    ROLLUP_PROJECTION
+                ).to_list(None)
+        with metrics.stage("persist", "write"):
+            # Ordered, so repeated writes to one id keep their submission order
+            await db.assessments.bulk_write([
+                UpdateOne({"id": assessment_id}, {"$set": doc}, upsert=True)
+                for assessment_id, doc in docs
+            ])
+    await assessment_cache.invalidate(*{assessment_id for assessment_id, _ in docs})
     
-    return recommendations
+    # Only the last write per id persists
+    latest = list({assessment_id: doc for assessment_id, doc in docs}.values())
+    record_cohort_changes(added=latest, removed=previous)
+
+# ============================================================================
+# STATIC PAYLOADS
+# ============================================================================
+
+# Questions and tech catalog only change on deploy: serialize and compress once
+STATIC_CACHE_MAX_AGE = int(os.environ.get('STATIC_CACHE_MAX_AGE', '86400'))
+
+questions_payload = StaticPayload({"questions": ASSESSMENT_QUESTIONS}, STATIC_CACHE_MAX_AGE)
+tech_categories_payload = StaticPayload({"categories": TECH_CATEGORIES}, STATIC_CACHE_MAX_AGE)
 
 # ============================================================================
 # API ENDPOINTS
@@ -538,92 +649,219 @@ async def root():
     return {"message": "Flight Deck API - Marketing Assessment Platform"}
 
 @api_router.get("/assessment/questions")
-async def get_assessment_questions():
+async def get_assessment_questions(request: Request):
     """Get all assessment questions"""
-    return {"questions": ASSESSMENT_QUESTIONS}
+    return questions_payload.response(request)
 
 @api_router.get("/tech/categories")
-async def get_tech_categories():
+async def get_tech_categories(request: Request):
     """Get all tech categories and tools"""
-    return {"categories": TECH_CATEGORIES}
+    return tech_categories_payload.response(request)
 
-@api_router.post("/assessment/submit")
+@api_router.post("/assessment/submit", response_model=AssessmentResult)
 async def submit_assessment(submission: AssessmentSubmission):
     """Submit assessment and get results"""
     try:
-        # Calculate scores
-        assessment_score = calculate_assessment_score(submission.responses)
-        tech_score = calculate_tech_score(submission.tech_tools)
-        combined_score = (assessment_score / 10 + tech_score) / 2
+        result = await submit_result(submission)
+        with metrics.stage("submit", "encode"):
+            return JSONBytesResponse(result)
         
-        # Calculate R/E/A/O scores
-        reao_scores = calculate_reao_scores(submission.responses, submission.tech_tools)
-        
-        # Get plane level
-        plane_level = get_plane_level(assessment_score, tech_score)
+    except Exception as e:
+        logging.error(f"Error submitting assessment: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def find_unchanged(assessment_id: str, digest: str) -> Optional[Dict[str, Any]]:
+    """
+    The stored result of assessment_id if its content hash is digest
+    Checked against MongoDB (or a newer queued write), never a worker's cache,
+    which can hold a version another worker has since replaced
+    """
+    if write_queue is not None:
+        queued = write_queue.pending(assessment_id)
+        if queued is not None:
+            return queued if queued.get("content_hash") == digest else None
+    return await db.assessments.find_one({"id": assessment_id, "content_hash": digest}, {"_id": 0})
+
+async def submit_result(submission: AssessmentSubmission) -> Dict[str, Any]:
+    """Score and store a submission (shared by the REST and live endpoints); returns the result document"""
+    model = current_model()
+    digest = content_hash(submission.responses, submission.tech_tools, model.version)
+    
+    # Identical resubmission (retry, reopened results page): the stored result is still current
+    if submission.assessment_id:
+        with metrics.stage("submit", "dedup"):
+            stored = await find_unchanged(submission.assessment_id, digest)
+        if stored is not None:
+            submit_deduplicated.inc()
+            return stored
+    
+    scores = result_memo.get(digest)
+    if scores is None:
+        with metrics.stage("submit", "score"):
+            # Calculate scores
+            assessment_score = model.assessment_score(submission.responses)
+            tech_score = model.tech_score(submission.tech_tools)
+            combined_score = model.combined_score(assessment_score, tech_score)
+            
+            # Calculate R/E/A/O scores
+            reao_scores = model.reao_scores(submission.responses, submission.tech_tools)
+            
+            # Get plane level
+            plane_level = model.plane_level(assessment_score, tech_score)
         
         # Generate insights and recommendations
-        insights = generate_insights(submission.responses, submission.tech_tools, reao_scores)
-        recommendations = generate_recommendations(submission.responses, submission.tech_tools)
+        with metrics.stage("submit", "insights"):
+            insights = model.insights(reao_scores)
+        with metrics.stage("submit", "recommendations"):
+            recommendations = model.recommendations(submission.responses)
         
-        # Create result object
-        result = AssessmentResult(
-            id=submission.assessment_id or str(uuid.uuid4()),
-            assessment_score=assessment_score,
-            tech_score=tech_score,
-            combined_score=combined_score,
-            plane_level=plane_level,
-            responses=submission.responses,
-            tech_tools=submission.tech_tools,
-            insights=insights,
-            recommendations=recommendations,
-            reao_scores=reao_scores
+        scores = {
+            "assessment_score": assessment_score,
+            "tech_score": tech_score,
+            "combined_score": combined_score,
+            "plane_level": plane_level,
+            "reao_scores": reao_scores,
+            "insights": insights,
+            "recommendations": recommendations
+        }
+        result_memo.put(digest, scores)
+    
+    # Create the result document: stored and returned as the same dict
+    with metrics.stage("submit", "build_result"):
+        result = result_document(
+            model,
+            submission,
+            scores["assessment_score"],
+            scores["tech_score"],
+            scores["combined_score"],
+            scores["plane_level"],
+            scores["reao_scores"],
+            scores["insights"],
+            scores["recommendations"],
+            digest
         )
-        
-        # Save to database
-        result_dict = result.model_dump()
-        result_dict['created_at'] = result_dict['created_at'].isoformat()
-        
-        await db.assessments.update_one(
-            {"id": result.id},
-            {"$set": result_dict},
-            upsert=True
+    
+    # Save to database (created_at is stored as a native BSON date)
+    with metrics.stage("submit", "persist"):
+        await save_results([result])
+    
+    return result
+
+@api_router.post("/assessment/submit/batch", response_model=BatchAssessmentResult)
+async def submit_assessment_batch(batch: BatchAssessmentSubmission):
+    """Submit many assessments at once and get their results"""
+    if len(batch.submissions) > BATCH_SUBMIT_LIMIT:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.submissions)} submissions (limit {BATCH_SUBMIT_LIMIT})"
         )
+    
+    try:
+        with metrics.stage("submit_batch", "score"):
+            results = score_submissions(batch.submissions)
+        
+        # Save to database in a single bulk write
+        with metrics.stage("submit_batch", "persist"):
+            await save_results(results)
         
-        return result
+        return JSONBytesResponse({"results": results, "count": len(results)})
         
     except Exception as e:
-        logging.error(f"Error submitting assessment: {str(e)}")
+        logging.error(f"Error submitting assessment batch: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/assessment/results/{assessment_id}")
+@api_router.get("/assessment/results/{assessment_id}", response_model=AssessmentResult)
 async def get_assessment_results(assessment_id: str):
     """Get assessment results by ID"""
-    result = await db.assessments.find_one({"id": assessment_id}, {"_id": 0})
+    result = await load_assessment(assessment_id)
     
     if not result:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    return result
+    return JSONBytesResponse(result)
+
+# Page size bounds for /assessment/history
+HISTORY_PAGE_SIZE = int(os.environ.get('HISTORY_PAGE_SIZE', '50'))
+HISTORY_MAX_PAGE_SIZE = int(os.environ.get('HISTORY_MAX_PAGE_SIZE', '200'))
 
 @api_router.get("/assessment/history")
-async def get_assessment_history():
-    """Get all assessments (last 50)"""
+async def get_assessment_history(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Get assessments, newest first, one page at a time
+    Pass the returned next_cursor to get the following page; `fields` is a
+    comma-separated list of fields and/or presets (summary, full)
+    """
+    try:
+        query = keyset_filter(cursor)
+        projection = history_projection(fields)
+    except (InvalidCursor, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Fetch one extra row to learn whether another page exists
     assessments = await db.assessments.find(
-        {}, 
-        {"_id": 0}
-    ).sort("created_at", -1).limit(50).to_list(50)
+        query,
+        projection
+    ).sort(HISTORY_SORT).limit(limit + 1).to_list(limit + 1)
+    
+    has_more = len(assessments) > limit
+    assessments = assessments[:limit]
+    
+    return JSONBytesResponse({
+        "assessments": assessments,
+        "next_cursor": encode_cursor(assessments[-1]) if has_more else None,
+        "has_more": has_more
+    })
+
+# Documents fetched per cursor batch (and encoded per chunk) by the export
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+
+@api_router.get("/assessment/export")
+async def export_assessments(fmt: str = Query("ndjson", alias="format")):
+    """
+    Stream every stored assessment as ndjson, csv, parquet or arrow
+    Memory stays flat: the cursor is consumed one batch at a time
+    """
+    if fmt not in export.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format: {fmt} (expected one of {', '.join(export.EXPORT_FORMATS)})"
+        )
+    if fmt in export.COLUMNAR_FORMATS and export.pa is None:
+        raise HTTPException(status_code=501, detail=f"{fmt} export requires pyarrow")
+    
+    question_ids = [q["id"] for q in ASSESSMENT_QUESTIONS]
+    if fmt == "ndjson":
+        stream = export.ndjson_stream(db.assessments, EXPORT_BATCH_SIZE)
+    elif fmt == "csv":
+        stream = export.csv_stream(db.assessments, EXPORT_BATCH_SIZE, question_ids)
+    else:
+        stream = export.columnar_stream(db.assessments, EXPORT_BATCH_SIZE, question_ids, fmt)
     
-    return {"assessments": assessments}
+    media_type, extension = export.EXPORT_FORMATS[fmt]
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="assessments.{extension}"'}
+    )
 
 @api_router.delete("/assessment/{assessment_id}")
 async def delete_assessment(assessment_id: str):
     """Delete an assessment"""
-    result = await db.assessments.delete_one({"id": assessment_id})
+    # Unwritten queued writes of it would recreate it once flushed
+    discarded = write_queue is not None and await write_queue.discard(assessment_id)
+    deleted = await db.assessments.find_one_and_delete({"id": assessment_id}, projection=ROLLUP_PROJECTION)
+    await assessment_cache.invalidate(assessment_id)
     
-    if result.deleted_count == 0:
+    if deleted is None and not discarded:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
+    if deleted is not None:
+        record_cohort_changes(added=[], removed=[deleted])
+    
     return {"message": "Assessment deleted successfully"}
 
 @api_router.post("/scenarios/estimate")
@@ -634,66 +872,777 @@ async def estimate_scenario(assessment_id: str, scenario: ScenarioEstimate):
     """
     try:
         # Get base assessment
-        base = await db.assessments.find_one({"id": assessment_id}, {"_id": 0})
+        with metrics.stage("scenario", "load"):
+            base = await load_assessment(assessment_id)
         if not base:
             raise HTTPException(status_code=404, detail="Assessment not found")
         
-        # Get base R/E/A/O scores
-        base_reao = base.get("reao_scores", {})
+        with metrics.stage("scenario", "adjust"):
+            # Get base R/E/A/O scores
+            base_reao = base.get("reao_scores", {})
+            
+            # Calculate adjusted scores based on scenario
+            adjusted_reao = {}
+            
+            # Budget impact (affects Efficiency and Opportunity)
+            budget_impact = scenario.budget_pct / 100
+            adjusted_reao["efficiency"] = min(100, max(0, base_reao.get("efficiency", 0) + budget_impact * 8))
+            adjusted_reao["opportunity"] = min(100, max(0, base_reao.get("opportunity", 0) + budget_impact * 6))
+            
+            # Headcount impact (affects Readiness and Alignment)
+            headcount_impact = scenario.headcount * 3
+            adjusted_reao["readiness"] = min(100, max(0, base_reao.get("readiness", 0) + headcount_impact * 0.5))
+            adjusted_reao["alignment"] = min(100, max(0, base_reao.get("alignment", 0) + headcount_impact * 0.3))
+            
+            # Tech utilization impact (affects Efficiency)
+            tech_impact = scenario.tech_utilization_pct / 100
+            adjusted_reao["efficiency"] = min(100, max(0, adjusted_reao["efficiency"] + tech_impact * 10))
+            
+            # Process maturity impact (affects Alignment and Readiness)
+            process_impact = scenario.process_maturity_pct / 100
+            adjusted_reao["alignment"] = min(100, max(0, adjusted_reao["alignment"] + process_impact * 9))
+            adjusted_reao["readiness"] = min(100, max(0, adjusted_reao["readiness"] + process_impact * 5))
+            
+            # Calculate new combined score
+            avg_adjusted = sum(adjusted_reao.values()) / 4
+            new_assessment_score = avg_adjusted
+            new_tech_score = base.get("tech_score", 0)
+            new_combined = (new_assessment_score / 10 + new_tech_score) / 2
+            
+            # Get new plane level
+            new_plane = get_plane_level(new_assessment_score, new_tech_score)
         
-        # Calculate adjusted scores based on scenario
-        adjusted_reao = {}
+        with metrics.stage("scenario", "insights"):
+            # Generate scenario insights
+            scenario_insights = []
+            for dimension, new_val in adjusted_reao.items():
+                old_val = base_reao.get(dimension, 0)
+                delta = new_val - old_val
+                if abs(delta) > 2:
+                    direction = "↑" if delta > 0 else "↓"
+                    scenario_insights.append(f"{dimension.title()}: {direction} {abs(delta):.1f} points")
         
-        # Budget impact (affects Efficiency and Opportunity)
-        budget_impact = scenario.budget_pct / 100
-        adjusted_reao["efficiency"] = min(100, max(0, base_reao.get("efficiency", 0) + budget_impact * 8))
-        adjusted_reao["opportunity"] = min(100, max(0, base_reao.get("opportunity", 0) + budget_impact * 6))
+        return JSONBytesResponse({
+            "base_scores": base_reao,
+            "adjusted_scores": adjusted_reao,
+            "new_combined_score": new_combined,
+            "new_plane_level": new_plane,
+            "delta_insights": scenario_insights,
+            "scenario_applied": scenario.model_dump()
+        })
         
-        # Headcount impact (affects Readiness and Alignment)
-        headcount_impact = scenario.headcount * 3
-        adjusted_reao["readiness"] = min(100, max(0, base_reao.get("readiness", 0) + headcount_impact * 0.5))
-        adjusted_reao["alignment"] = min(100, max(0, base_reao.get("alignment", 0) + headcount_impact * 0.3))
+    except Exception as e:
+        logging.error(f"Error estimating scenario: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Largest grid (product of axis lengths) accepted by /scenarios/sweep
+SCENARIO_SWEEP_MAX_POINTS = int(os.environ.get('SCENARIO_SWEEP_MAX_POINTS', '50000'))
+
+@api_router.post("/scenarios/sweep")
+async def sweep_scenarios(assessment_id: str, sweep: ScenarioSweep):
+    """
+    Evaluate a whole grid of what-if scenarios in one call
+    Surface arrays are flattened in C order over the axes, in the order
+    budget_pct, headcount, tech_utilization_pct, process_maturity_pct
+    """
+    # Bound each axis before expanding it: steps come from the client
+    for lever in SCENARIO_LEVERS:
+        size = axis_size(**getattr(sweep, lever).model_dump())
+        if size > SCENARIO_SWEEP_MAX_POINTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Sweep too large: {size} {lever} values (limit {SCENARIO_SWEEP_MAX_POINTS} scenarios)"
+            )
+    
+    try:
+        axes = {
+            lever: expand_axis(lever, **getattr(sweep, lever).model_dump())
+            for lever in SCENARIO_LEVERS
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    shape = [len(axes[lever]) for lever in SCENARIO_LEVERS]
+    points = 1
+    for size in shape:
+        points *= size
+    if points > SCENARIO_SWEEP_MAX_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Sweep too large: {points} scenarios (limit {SCENARIO_SWEEP_MAX_POINTS})"
+        )
+    
+    base = await load_assessment(assessment_id)
+    if not base:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    try:
+        base_reao = base.get("reao_scores", {})
         
-        # Tech utilization impact (affects Efficiency)
-        tech_impact = scenario.tech_utilization_pct / 100
-        adjusted_reao["efficiency"] = min(100, max(0, adjusted_reao["efficiency"] + tech_impact * 10))
+        # Broadcast each axis along its own dimension of the grid
+        grid = []
+        for position, lever in enumerate(SCENARIO_LEVERS):
+            axis_shape = [1] * len(SCENARIO_LEVERS)
+            axis_shape[position] = -1
+            grid.append(axes[lever].reshape(axis_shape))
         
-        # Process maturity impact (affects Alignment and Readiness)
-        process_impact = scenario.process_maturity_pct / 100
-        adjusted_reao["alignment"] = min(100, max(0, adjusted_reao["alignment"] + process_impact * 9))
-        adjusted_reao["readiness"] = min(100, max(0, adjusted_reao["readiness"] + process_impact * 5))
+        model = current_model()
+        surface = evaluate_scenarios(base_reao, base.get("tech_score", 0), model.plane_thresholds, *grid)
         
-        # Calculate new combined score
-        avg_adjusted = sum(adjusted_reao.values()) / 4
-        new_assessment_score = avg_adjusted
-        new_tech_score = base.get("tech_score", 0)
-        new_combined = (new_assessment_score / 10 + new_tech_score) / 2
+        # numpy arrays are encoded directly, without building Python lists first
+        return JSONBytesResponse({
+            "base_scores": base_reao,
+            "base_combined_score": base.get("combined_score"),
+            "axes": axes,
+            "shape": shape,
+            "surface": {
+                **{dimension: values.ravel() for dimension, values in surface["adjusted"].items()},
+                "combined_score": surface["combined_score"].ravel(),
+                "plane_index": surface["plane_index"].ravel()
+            },
+            "plane_levels": [dict(level) for level in model.plane_levels],
+            "plane_thresholds": list(model.plane_thresholds)
+        })
         
-        # Get new plane level
-        new_plane = get_plane_level(new_assessment_score, new_tech_score)
+    except Exception as e:
+        logging.error(f"Error sweeping scenarios: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Largest search grid accepted by /scenarios/solve (the default grid has 365,211 points)
+SCENARIO_SOLVER_MAX_POINTS = int(os.environ.get('SCENARIO_SOLVER_MAX_POINTS', '500000'))
+
+@api_router.post("/scenarios/solve")
+async def solve_scenario(assessment_id: str, goal: ScenarioGoal):
+    """
+    Goal-seek the What-If simulator: the cheapest lever combinations that reach
+    a target plane level or combined score
+    Returns the Pareto set (no other combination needs less of every lever),
+    cheapest first by the weighted cost
+    The default target is the plane level above the assessment's stored one.
+    The simulator re-derives the combined score from the REAO scores alone,
+    so its zero-change estimate (current_plane_level) can sit below the
+    stored level; both are returned
+    """
+    unknown = set(goal.costs) - set(SCENARIO_LEVERS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown levers in costs: {', '.join(sorted(unknown))}")
+    if goal.target_plane is not None and goal.target_combined_score is not None:
+        raise HTTPException(status_code=400, detail="Give either target_plane or target_combined_score, not both")
+    
+    # Bound the grid by the requested axis sizes before expanding any of them
+    points = 1
+    for lever in SCENARIO_LEVERS:
+        spec = getattr(goal, lever)
+        points *= solver_axis_size(lever) if spec is None else axis_size(**spec.model_dump())
+    if points > SCENARIO_SOLVER_MAX_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Search grid too large: {points} scenarios (limit {SCENARIO_SOLVER_MAX_POINTS})"
+        )
+    
+    try:
+        axes = {
+            lever: solver_axis(lever) if getattr(goal, lever) is None
+            else expand_axis(lever, **getattr(goal, lever).model_dump())
+            for lever in SCENARIO_LEVERS
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    model = current_model()
+    target_plane_index = None
+    if goal.target_plane is not None:
+        names = [name.lower() for name in model.plane_names]
+        if goal.target_plane.lower() not in names:
+            raise HTTPException(status_code=400, detail=f"Unknown plane level '{goal.target_plane}'")
+        target_plane_index = names.index(goal.target_plane.lower())
+    
+    base = await load_assessment(assessment_id)
+    if not base:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    try:
+        base_reao = base.get("reao_scores", {})
+        tech_score = base.get("tech_score", 0)
+        # Where the simulator puts the assessment with every lever unchanged
+        current = evaluate_scenarios(base_reao, tech_score, model.plane_thresholds, 0, 0, 0, 0)
+        current_plane_index = int(current["plane_index"])
+        stored_combined_score = base.get("combined_score")
+        stored_plane_index = (
+            model.plane_index(stored_combined_score) if stored_combined_score is not None else current_plane_index
+        )
+        if target_plane_index is None and goal.target_combined_score is None:
+            if stored_plane_index + 1 >= len(model.plane_names):
+                raise HTTPException(status_code=400, detail="Assessment is already at the highest plane level")
+            target_plane_index = stored_plane_index + 1
         
-        # Generate scenario insights
-        scenario_insights = []
-        for dimension, new_val in adjusted_reao.items():
-            old_val = base_reao.get(dimension, 0)
-            delta = new_val - old_val
-            if abs(delta) > 2:
-                direction = "↑" if delta > 0 else "↓"
-                scenario_insights.append(f"{dimension.title()}: {direction} {abs(delta):.1f} points")
+        costs = {lever: goal.costs.get(lever, 1.0) for lever in SCENARIO_LEVERS}
+        with metrics.stage("scenario_solver", "search"):
+            solution = solve_scenarios(
+                base_reao, tech_score, model.plane_thresholds, axes, costs,
+                target_plane_index=target_plane_index,
+                target_combined_score=goal.target_combined_score
+            )
         
-        return {
+        count = len(solution["cost"])
+        shown = range(min(count, max(goal.limit, 0)))
+        return JSONBytesResponse({
             "base_scores": base_reao,
-            "adjusted_scores": adjusted_reao,
-            "new_combined_score": new_combined,
-            "new_plane_level": new_plane,
-            "delta_insights": scenario_insights,
-            "scenario_applied": scenario.model_dump()
-        }
+            "stored_combined_score": stored_combined_score,
+            "stored_plane_level": dict(model.plane_levels[stored_plane_index]),
+            "current_combined_score": float(current["combined_score"]),
+            "current_plane_level": dict(model.plane_levels[current_plane_index]),
+            "target_plane_level": dict(model.plane_levels[target_plane_index]) if target_plane_index is not None else None,
+            "target_combined_score": goal.target_combined_score,
+            "costs": costs,
+            "reachable": solution["feasible"],
+            "max_combined_score": solution["max_combined_score"],
+            "pareto_size": count,
+            "solutions": [
+                {
+                    "levers": {
+                        lever: solution["levers"][lever][i].item() for lever in SCENARIO_LEVERS
+                    },
+                    "cost": float(solution["cost"][i]),
+                    "adjusted_scores": {
+                        dimension: float(scores[i]) for dimension, scores in solution["adjusted"].items()
+                    },
+                    "combined_score": float(solution["combined_score"][i]),
+                    "plane_level": dict(model.plane_levels[solution["plane_index"][i]])
+                }
+                for i in shown
+            ]
+        })
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logging.error(f"Error estimating scenario: {str(e)}")
+        logging.error(f"Error solving scenario: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Most Monte Carlo samples accepted by /scenarios/simulate
+SCENARIO_SIMULATION_MAX_SAMPLES = int(os.environ.get('SCENARIO_SIMULATION_MAX_SAMPLES', '200000'))
+
+@api_router.post("/scenarios/simulate")
+async def simulate_scenario(assessment_id: str, simulation: ScenarioSimulation):
+    """
+    Monte Carlo version of /scenarios/estimate for uncertain plans
+    Draws `samples` lever combinations from the given distributions, runs them
+    through the same adjustment formulas and returns the probability of each
+    plane level plus percentile bands per REAO dimension and combined score
+    """
+    if not 1 <= simulation.samples <= SCENARIO_SIMULATION_MAX_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"samples must be between 1 and {SCENARIO_SIMULATION_MAX_SAMPLES}"
+        )
+    if not simulation.percentiles or not all(0 <= q <= 100 for q in simulation.percentiles):
+        raise HTTPException(status_code=400, detail="percentiles must lie within [0, 100]")
+    
+    specs = {}
+    for lever in SCENARIO_LEVERS:
+        spec = getattr(simulation, lever)
+        if not isinstance(spec, LeverDistribution):
+            spec = LeverDistribution(value=spec)
+        specs[lever] = spec.model_dump()
+    try:
+        with metrics.stage("scenario_simulation", "sample"):
+            samples = sample_scenarios(specs, simulation.samples, simulation.seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    base = await load_assessment(assessment_id)
+    if not base:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    try:
+        base_reao = base.get("reao_scores", {})
+        model = current_model()
+        with metrics.stage("scenario_simulation", "simulate"):
+            outcome = simulate_scenarios(
+                base_reao, base.get("tech_score", 0), model.plane_thresholds, samples, simulation.percentiles
+            )
+        
+        return JSONBytesResponse({
+            "base_scores": base_reao,
+            "base_combined_score": base.get("combined_score"),
+            "samples": outcome["samples"],
+            "plane_levels": [
+                {
+                    **level,
+                    "probability": float(outcome["plane_probability"][index]),
+                    "probability_at_least": float(outcome["plane_probability_at_least"][index])
+                }
+                for index, level in enumerate(model.plane_levels)
+            ],
+            "percentiles": simulation.percentiles,
+            "bands": outcome["percentiles"],
+            "mean": outcome["mean"],
+            "simulation_applied": simulation.model_dump()
+        })
+        
+    except Exception as e:
+        logging.error(f"Error simulating scenario: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================================================
+# DEEP DIVE QUESTION BANK
+# ============================================================================
+
+QUESTION_BANK_PATH = os.environ.get('QUESTION_BANK_PATH', DEFAULT_BANK_PATH)
+
+question_bank = QuestionBank.load(QUESTION_BANK_PATH)
+
+def score_deep_dives(submissions: List[AssessmentSubmission]) -> List[Dict[str, Any]]:
+    """Score (possibly partial) deep dives against the question bank in one sparse pass"""
+    model = current_model()
+    bank = question_bank
+    with metrics.stage("deep_dive", "score"):
+        scores = bank.score_results(
+            model,
+            [submission.responses for submission in submissions],
+            [submission.tech_tools for submission in submissions]
+        )
+    
+    results = []
+    for submission, fields in zip(submissions, scores):
+        topic_scores = fields.pop("topic_scores")
+        result = result_document(
+            model,
+            submission,
+            **fields,
+            digest=content_hash(submission.responses, submission.tech_tools, f"{model.version}/{bank.version}")
+        )
+        result["topic_scores"] = topic_scores
+        result["question_bank_version"] = bank.version
+        results.append(result)
+    
+    return results
+
+@api_router.get("/deep-dive/topics")
+async def get_deep_dive_topics():
+    """Topics of the question bank and their question ids"""
+    return question_bank.describe()
+
+@api_router.post("/deep-dive/score", response_model=AssessmentResult)
+async def score_deep_dive(submission: AssessmentSubmission):
+    """Score a (possibly partial) deep dive without storing it"""
+    try:
+        return JSONBytesResponse(score_deep_dives([submission])[0])
+    except Exception as e:
+        logging.error(f"Error scoring deep dive: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/deep-dive/submit", response_model=AssessmentResult)
+async def submit_deep_dive(submission: AssessmentSubmission):
+    """Score and store a deep dive; the result is read back like any assessment"""
+    try:
+        result = score_deep_dives([submission])[0]
+        with metrics.stage("deep_dive", "persist"):
+            await save_results([result])
+        return JSONBytesResponse(result)
+    except Exception as e:
+        logging.error(f"Error submitting deep dive: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ============================================================================
+# LIVE SCORING
+# ============================================================================
+
+live_sessions = metrics.registry.gauge("live_scoring_sessions", "Open live-scoring WebSocket sessions")
+
+async def send_live(websocket: WebSocket, payload: Dict[str, Any]):
+    await websocket.send_text(dumps(payload).decode("utf-8"))
+
+@api_router.websocket("/assessment/live")
+async def live_scoring(websocket: WebSocket):
+    """
+    Live scores while an assessment is filled in (see live_scoring.py for the messages)
+    Every answer or tool change is applied incrementally and answered with the
+    current scores and plane level; only a "submit" message stores a result
+    """
+    await websocket.accept()
+    live_sessions.inc()
+    session = LiveScoringSession(current_model())
+    try:
+        await send_live(websocket, {"type": "scores", "seq": None, **session.snapshot()})
+        while True:
+            text = await websocket.receive_text()
+            seq = None
+            try:
+                message = json.loads(text)
+                if not isinstance(message, dict):
+                    raise LiveScoringError("Messages must be JSON objects")
+                seq = message.get("seq")
+                
+                # Pick up a hot-reloaded scoring model
+                model = current_model()
+                if model is not session.model:
+                    session.rebase(model)
+                
+                if message.get("type") == "submit":
+                    submission = AssessmentSubmission(
+                        responses=session.responses,
+                        tech_tools=session.tech_tools,
+                        assessment_id=message.get("assessment_id")
+                    )
+                    result = await submit_result(submission)
+                    await send_live(websocket, {"type": "result", "seq": seq, "result": result})
+                    continue
+                
+                with metrics.stage("live", "update"):
+                    session.apply(message)
+                    scores = session.snapshot()
+                await send_live(websocket, {"type": "scores", "seq": seq, **scores})
+            except (ValueError, LiveScoringError) as e:
+                # Bad message (invalid JSON included): report it and keep the session
+                await send_live(websocket, {"type": "error", "seq": seq, "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logging.error(f"Error in live scoring session: {str(e)}")
+        await websocket.close(code=1011)
+    finally:
+        live_sessions.dec()
+
+# ============================================================================
+# TOOL IMPACT
+# ============================================================================
+
+TOOL_IMPACT_ACTIONS = ("add", "remove", "all")
+
+def rank_tool_impacts(responses: Dict[str, int], tech_tools: List[str], action: str, limit: Optional[int]) -> Dict[str, Any]:
+    """
+    Effect of adding or removing each catalog tool on the tech score, the REAO
+    tech bonus, the combined score and the plane level, ranked by combined score gain
+    """
+    model = current_model()
+    with metrics.stage("tool_impact", "score"):
+        impacts = model.batch_engine.tool_impacts(responses, tech_tools)
+    scores = impacts.scores
+    
+    ranking = []
+    for i, tool_id in enumerate(impacts.tool_ids):
+        tool_action = "remove" if impacts.selected[i] else "add"
+        if action != "all" and tool_action != action:
+            continue
+        row = i + 1
+        tool, category = model.tool_catalog[tool_id]
+        ranking.append({
+            "tool_id": tool_id,
+            "name": tool.get("name"),
+            "category": category,
+            "tier": tool.get("tier"),
+            "action": tool_action,
+            "tech_score": float(scores.tech_score[row]),
+            "tech_score_delta": float(scores.tech_score[row] - scores.tech_score[0]),
+            "tech_bonus_delta": float(impacts.tech_bonus[row] - impacts.tech_bonus[0]),
+            "reao_delta": {
+                dimension: float(scores.reao[row, d] - scores.reao[0, d])
+                for d, dimension in enumerate(REAO_DIMENSIONS)
+            },
+            "combined_score": float(scores.combined_score[row]),
+            "combined_score_delta": float(scores.combined_score[row] - scores.combined_score[0]),
+            "plane_level": dict(model.plane_levels[scores.plane_index[row]]),
+            "plane_level_change": int(scores.plane_index[row] - scores.plane_index[0])
+        })
+    
+    # Biggest gain first; the tech score breaks ties between equal combined gains
+    ranking.sort(key=lambda impact: (-impact["combined_score_delta"], -impact["tech_score_delta"]))
+    
+    return {
+        "model_version": model.version,
+        "tech_tools": tech_tools,
+        "tech_score": float(scores.tech_score[0]),
+        "tech_bonus": float(impacts.tech_bonus[0]),
+        "combined_score": float(scores.combined_score[0]),
+        "plane_level": dict(model.plane_levels[scores.plane_index[0]]),
+        "impacts": ranking[:limit] if limit is not None else ranking
+    }
+
+@api_router.post("/tech/impact")
+async def tool_impact(
+    submission: AssessmentSubmission,
+    action: str = Query("all", description="add, remove or all"),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Rank every catalog tool by how much adding or removing it would move this submission's scores"""
+    if action not in TOOL_IMPACT_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"action must be one of {', '.join(TOOL_IMPACT_ACTIONS)}")
+    return JSONBytesResponse(rank_tool_impacts(submission.responses, submission.tech_tools, action, limit))
+
+@api_router.get("/tech/impact/{assessment_id}")
+async def assessment_tool_impact(
+    assessment_id: str,
+    action: str = Query("all", description="add, remove or all"),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Tool impact ranking for a stored assessment"""
+    if action not in TOOL_IMPACT_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"action must be one of {', '.join(TOOL_IMPACT_ACTIONS)}")
+    assessment = await load_assessment(assessment_id)
+    if not assessment:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return JSONBytesResponse(rank_tool_impacts(
+        assessment.get("responses") or {}, assessment.get("tech_tools") or [], action, limit
+    ))
+
+@api_router.get("/benchmarks")
+async def get_benchmarks():
+    """Cohort-wide score distributions, plane level counts and tool adoption"""
+    rollup = await cohort_benchmarks.current(db)
+    
+    return {
+        "count": rollup.count,
+        "quantiles": {metric: rollup.quantiles(metric) for metric in COHORT_METRICS},
+        "plane_levels": rollup.plane_levels,
+        "tool_adoption": {tool_id: rollup.adoption(tool_id) for tool_id in sorted(rollup.tools)}
+    }
+
+@api_router.get("/benchmarks/{assessment_id}")
+async def get_assessment_benchmark(assessment_id: str):
+    """Compare an assessment's REAO scores, combined score and plane level with everyone else"""
+    assessment = await load_assessment(assessment_id)
+    if not assessment:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    rollup = await cohort_benchmarks.current(db)
+    reao = assessment.get("reao_scores") or {}
+    
+    plane_metrics = {}
+    for metric in REAO_METRICS + ["combined_score"]:
+        value = reao.get(metric, 0) if metric in REAO_METRICS else assessment.get(metric, 0)
+        plane_metrics[metric] = {
+            "value": value,
+            "percentile": rollup.percentile(metric, value),
+            "cohort": rollup.quantiles(metric, COHORT_QUANTILES)
+        }
+    
+    # Share of the cohort flying a lower or the same aircraft
+    plane_name = (assessment.get("plane_level") or {}).get("name")
+    plane_names = list(current_model().plane_names)
+    at_or_below = None
+    if plane_name in plane_names and rollup.count > 0:
+        position = plane_names.index(plane_name)
+        at_or_below = sum(rollup.plane_levels.get(name, 0) for name in plane_names[:position + 1]) / rollup.count
+    
+    return {
+        "assessment_id": assessment_id,
+        "cohort_size": rollup.count,
+        "metrics": plane_metrics,
+        "plane_level": {
+            "name": plane_name,
+            "share_at_or_below": at_or_below,
+            "distribution": rollup.plane_levels
+        },
+        "tool_adoption": {
+            tool_id: rollup.adoption(tool_id)
+            for tool_id in sorted(set(assessment.get("tech_tools") or []))
+        }
+    }
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit ratio, size and eviction counters of the in-process caches"""
+    return {
+        "assessments": assessment_cache.stats(),
+        "tech_scores": current_model().tech_scorer.cache_info(),
+        "results": result_memo.cache_info()
+    }
+
+# ============================================================================
+# BULK UPLOADS
+# ============================================================================
+
+# Rows validated, scored and upserted together by an upload job
+INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', '1000'))
+# Largest upload accepted, and longest line within it
+INGEST_MAX_BYTES = int(os.environ.get('INGEST_MAX_BYTES', str(1 << 30)))
+INGEST_MAX_ROW_BYTES = int(os.environ.get('INGEST_MAX_ROW_BYTES', str(1 << 20)))
+# Row errors kept per job (the count of failed rows is always exact)
+INGEST_MAX_ERRORS = int(os.environ.get('INGEST_MAX_ERRORS', '1000'))
+# Upload jobs running at once per worker; later ones wait as "queued"
+INGEST_MAX_JOBS = int(os.environ.get('INGEST_MAX_JOBS', '2'))
+# Where uploads are spooled until ingested (default: the system temp dir)
+INGEST_SPOOL_DIR = os.environ.get('INGEST_SPOOL_DIR') or None
+
+row_validator = RowValidator(ASSESSMENT_QUESTIONS, TECH_CATEGORIES)
+ingest_slots = asyncio.Semaphore(INGEST_MAX_JOBS)
+# Unfinished jobs of this worker; every job's progress is also saved to db.ingest_jobs
+ingest_jobs: Dict[str, IngestJob] = {}
+ingested_rows = metrics.registry.counter("ingest_rows_total", "Uploaded rows scored and stored")
+
+async def ingest_chunk(records: List[Dict[str, Any]]):
+    """Score one chunk of validated upload rows in a single pass and bulk-upsert them"""
+    # Rows were validated against the questions and catalog already
+    submissions = [
+        AssessmentSubmission.model_construct(
+            responses=record["responses"],
+            tech_tools=record["tech_tools"],
+            assessment_id=record["assessment_id"]
+        )
+        for record in records
+    ]
+    with metrics.stage("ingest", "score"):
+        results = await asyncio.to_thread(score_submissions, submissions)
+    for result, record in zip(results, records):
+        if record["created_at"] is not None:
+            result["created_at"] = record["created_at"]
+    with metrics.stage("ingest", "persist"):
+        await save_results(results)
+    ingested_rows.inc(amount=len(results))
+
+async def report_ingest_job(job: IngestJob):
+    try:
+        await db.ingest_jobs.replace_one({"_id": job.id}, {"_id": job.id, **job.to_document()}, upsert=True)
+    except Exception as e:
+        logger.error(f"Error saving upload job {job.id}: {str(e)}")
+
+async def run_upload_job(job: IngestJob, path: str):
+    try:
+        await run_ingest_job(
+            job, path, row_validator, ingest_chunk, report_ingest_job,
+            chunk_size=INGEST_CHUNK_SIZE,
+            max_row_bytes=INGEST_MAX_ROW_BYTES,
+            slots=ingest_slots
+        )
+    finally:
+        ingest_jobs.pop(job.id, None)
+
+@api_router.post("/assessment/upload", status_code=202)
+async def upload_assessments(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format"),
+    filename: Optional[str] = None,
+    upload_key: Optional[str] = None
+):
+    """
+    Bulk-import assessments from a CSV (export columns) or NDJSON file sent
+    as the request body (format from `format`, the filename's extension or
+    the Content-Type)
+    The body is streamed to a spool file and ingested in chunks by a
+    background job; poll /assessment/upload/{job_id} for its progress and row errors
+    Rows without an id get one derived from upload_key (default: the file's
+    SHA-256) and their row number, so re-uploading doesn't duplicate them
+    """
+    content_type = request.headers.get("content-type")
+    if (content_type or "").lower().startswith("multipart/"):
+        raise HTTPException(status_code=415, detail="Send the file itself as the request body, not as a multipart form")
+    try:
+        upload_format = detect_format(filename, content_type, fmt)
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Refuse an oversized upload before receiving any of it
+    declared_size = request.headers.get("content-length")
+    if declared_size is not None and declared_size.isdigit() and int(declared_size) > INGEST_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload too large (limit {INGEST_MAX_BYTES} bytes)")
+    
+    # Streamed straight from the socket: the cap also holds for chunked bodies without a Content-Length
+    spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=f".{upload_format}", dir=INGEST_SPOOL_DIR, delete=False)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with spool:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > INGEST_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Upload too large (limit {INGEST_MAX_BYTES} bytes)"
+                    )
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        os.remove(spool.name)
+        raise
+    
+    job = IngestJob(
+        filename, upload_format, size,
+        upload_key=upload_key or f"sha256:{digest.hexdigest()}",
+        max_errors=INGEST_MAX_ERRORS
+    )
+    ingest_jobs[job.id] = job
+    await report_ingest_job(job)
+    start_background(run_upload_job(job, spool.name))
+    return {"job_id": job.id, "status": job.status, "size_bytes": size, "format": upload_format, "upload_key": job.upload_key}
+
+@api_router.get("/assessment/upload/{job_id}")
+async def get_upload_status(job_id: str):
+    """Progress, throughput (rows/s) and row errors of an upload job"""
+    job = ingest_jobs.get(job_id)
+    if job is not None:
+        return JSONBytesResponse(job.to_document())
+    
+    # Finished, or running in another worker
+    document = await db.ingest_jobs.find_one({"_id": job_id}, {"_id": 0})
+    if document is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return JSONBytesResponse(document)
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+def _cache_metrics():
+    assessment_stats = assessment_cache.stats()
+    tech_stats = current_model().tech_scorer.cache_info()
+    result_stats = result_memo.cache_info()
+    for cache, stats in (("assessments", assessment_stats), ("tech_scores", tech_stats), ("results", result_stats)):
+        for event in ("hits", "shared_hits", "misses", "evictions", "expirations", "invalidations"):
+            if event in stats:
+                yield (cache, event), stats[event]
+
+def _cache_sizes():
+    yield ("assessments",), assessment_cache.stats()["size"]
+    yield ("tech_scores",), current_model().tech_scorer.cache_info()["size"]
+    yield ("results",), result_memo.cache_info()["size"]
+
+def _write_behind_metrics():
+    if write_queue is not None:
+        stats = write_queue.stats()
+        for field in ("pending", "dead_letters", "enqueued", "written", "failed", "batches", "retries", "backpressure_waits"):
+            yield (field,), stats[field]
+
+metrics.registry.gauge("cache_events", "Cumulative cache events by cache", ("cache", "event"), callback=_cache_metrics)
+metrics.registry.gauge("cache_entries", "Entries currently held by each cache", ("cache",), callback=_cache_sizes)
+metrics.registry.gauge("write_behind_operations", "Write-behind queue state and cumulative counts", ("state",), callback=_write_behind_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of request, pipeline, MongoDB and cache metrics"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# ============================================================================
+# HEALTH PROBES
+# ============================================================================
+
+# Readiness fails when a ping takes longer than this
+MONGO_READY_TIMEOUT_MS = int(os.environ.get('MONGO_READY_TIMEOUT_MS', '1000'))
+
+def _pool_stats() -> Dict[str, Any]:
+    return mongo_pool.stats(mongo_settings.max_pool_size if mongo_settings else 0)
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is serving requests (no database round trip)"""
+    return {"status": "ok", "mongo_warm": mongo_warm, "pool": _pool_stats()}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: the pool is warm and MongoDB answers a ping in time"""
+    status = {"mongo_warm": mongo_warm, "pool": _pool_stats(), "ping_ms": None}
+    if client is None or not mongo_warm:
+        return JSONBytesResponse({"status": "warming", **status}, status_code=503)
+    try:
+        latency = await asyncio.wait_for(ping(client), MONGO_READY_TIMEOUT_MS / 1000)
+    except Exception as e:
+        return JSONBytesResponse({"status": "unavailable", "error": str(e) or type(e).__name__, **status}, status_code=503)
+    status["ping_ms"] = latency * 1000
+    return {"status": "ready", **status}
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -705,6 +1654,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost middleware, so recorded latency covers everything below it
+app.add_middleware(metrics.MetricsMiddleware, exclude=("/metrics", "/healthz", "/readyz"))
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -712,6 +1664,123 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+# Optional retention: assessments older than this are removed by a TTL index
+ASSESSMENT_RETENTION_DAYS = float(os.environ.get('ASSESSMENT_RETENTION_DAYS', '0'))
+MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', '500'))
+# Seconds between checks for re-score progress made by another process (0 disables)
+RESCORE_WATCH_SECONDS = float(os.environ.get('RESCORE_WATCH_SECONDS', '5'))
+
+background_tasks = set()
+
+async def run_created_at_migration():
+    try:
+        await migrate_created_at(db, batch_size=MIGRATION_BATCH_SIZE)
+    except Exception as e:
+        logger.error(f"created_at migration failed (will resume on next start): {str(e)}")
+
+# updated_at of the last re-score checkpoint this worker acted on
+rescore_seen_at = None
+
+async def check_rescore():
+    """Drop cached documents that a re-score (manage.py rescore, another process) may have rewritten"""
+    global rescore_seen_at
+    state = await db.migrations.find_one(
+        {"_id": RESCORE_MIGRATION},
+        {"updated_at": 1, "model_version": 1, "question_bank_version": 1}
+    )
+    if state is None or state.get("updated_at") == rescore_seen_at:
+        return
+    rescore_seen_at = state.get("updated_at")
+    model_version = state.get("model_version")
+    bank_version = state.get("question_bank_version")
+    dropped = assessment_cache.discard_local(lambda doc: is_stale(doc, model_version, bank_version))
+    if dropped:
+        logger.info(f"Dropped {dropped} cached assessments re-scored to {model_version}")
+
+async def watch_rescores():
+    while True:
+        await asyncio.sleep(RESCORE_WATCH_SECONDS)
+        try:
+            await check_rescore()
+        except Exception as e:
+            logger.warning(f"Error checking re-score progress: {str(e)}")
+
+async def watch_scoring_model():
+    """Hot-reload the scoring model when its data file is edited"""
+    while True:
+        await asyncio.sleep(SCORING_MODEL_RELOAD_SECONDS)
+        scoring_models.reload_if_changed()
+
+async def connect_db():
+    """Create the MongoDB client from the environment (also used by manage.py)"""
+    global client, db, mongo_settings
+    mongo_settings = MongoSettings.from_env()
+    client = create_client(mongo_settings, [metrics.MongoCommandMetrics(), mongo_pool])
+    db = client[mongo_settings.db_name]
+
+async def warm_mongo_pool():
+    """Warm the pool; if MongoDB is unreachable keep retrying (readyz reports 503 meanwhile)"""
+    global mongo_warm
+    delay = 1.0
+    while True:
+        try:
+            await warm_up(client, mongo_settings.min_pool_size)
+            mongo_warm = True
+            return
+        except Exception as e:
+            logger.error(f"Error warming MongoDB pool (retrying in {delay:.0f}s): {str(e)}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+def start_background(coroutine):
+    task = asyncio.create_task(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+async def startup():
+    global mongo_warm
+    await connect_db()
+    
+    # Warm inline so the server only starts accepting requests with open connections
+    try:
+        await warm_up(client, mongo_settings.min_pool_size)
+        mongo_warm = True
+    except Exception as e:
+        logger.error(f"Error warming MongoDB pool: {str(e)}")
+        start_background(warm_mongo_pool())
+    
+    try:
+        await ensure_indexes(db, int(ASSESSMENT_RETENTION_DAYS * 86400) or None)
+    except Exception as e:
+        logger.error(f"Error ensuring indexes: {str(e)}")
+    
+    start_background(run_created_at_migration())
+    
+    if SCORING_MODEL_RELOAD_SECONDS > 0:
+        start_background(watch_scoring_model())
+    
+    if COHORT_BENCHMARKS:
+        start_background(flush_cohort_changes_periodically())
+    
+    if RESCORE_WATCH_SECONDS > 0:
+        start_background(watch_rescores())
+    
+    if write_queue is not None:
+        write_queue.start()
+
+async def shutdown():
+    global mongo_warm
+    mongo_warm = False
+    for task in list(background_tasks):
+        task.cancel()
+    # Cancelled upload jobs still record their final status
+    if background_tasks:
+        await asyncio.wait(list(background_tasks), timeout=5)
+    # Flush queued writes before the client goes away
+    if write_queue is not None:
+        await write_queue.close()
+    if COHORT_BENCHMARKS:
+        await flush_cohort_changes()
+    await assessment_cache.close()
+    if client is not None:
+        client.close()
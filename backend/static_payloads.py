@@ -0,0 +1,101 @@
+"""
+Pre-serialized, ETag-tagged JSON payloads for static catalog endpoints.
+
+The question set and tech catalog only change on deploy, so they are rendered
+to JSON bytes once, compressed once (gzip, plus brotli when the optional
+`brotli` package is installed) and served with a content-hash ETag. Requests
+carrying a matching If-None-Match get a bodiless 304.
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding listed in Accept-Encoding to its q-value"""
+    codings: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def parse_if_none_match(header: str) -> List[str]:
+    """Entity tags listed in If-None-Match, with weak prefixes and quotes stripped"""
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tags.append(tag.strip('"'))
+    return tags
+
+
+class StaticPayload:
+    """A JSON document rendered to bytes once, with precompressed variants"""
+
+    def __init__(self, content: Any, max_age: int = 86400):
+        self.body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.cache_control = f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+
+        # Preferred coding first; identity is always available as a fallback
+        self.variants: List[Tuple[str, bytes]] = []
+        if brotli is not None:
+            self.variants.append(("br", brotli.compress(self.body, quality=11)))
+        self.variants.append(("gzip", gzip.compress(self.body, compresslevel=9, mtime=0)))
+
+    def etag(self, coding: Optional[str] = None) -> str:
+        # Each encoded representation gets its own tag, derived from the same content hash
+        return f'"{self.digest}-{coding}"' if coding else f'"{self.digest}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        for tag in parse_if_none_match(if_none_match):
+            if tag == "*" or tag.split("-", 1)[0] == self.digest:
+                return True
+        return False
+
+    def negotiate(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        accepted = parse_accept_encoding(accept_encoding)
+        for coding, body in self.variants:
+            if accepted.get(coding, accepted.get("*", 0)) > 0:
+                return coding, body
+        return None, self.body
+
+    def response(self, request: Request) -> Response:
+        """Serve the payload, or a 304 when the client's cached copy is current"""
+        coding, body = self.negotiate(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etag(coding),
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+
+        if coding:
+            headers["Content-Encoding"] = coding
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,115 @@
+"""
+Compiled tech-catalog index and memoized tech scoring.
+
+calculate_tech_score used to walk every category and tool in TECH_CATEGORIES
+on each call. TechScorer compiles the catalog once into a tool id -> (category
+index, tier weight) map, so a score costs O(selected tools), and keeps a
+bounded LRU cache of scores keyed by the canonical (frozen) set of known tool
+ids, since the same popular stacks are submitted over and over. A scorer is
+compiled with each ScoringModel, whose version includes catalog_fingerprint(),
+so a catalog or tier-weight change comes with a new, empty cache.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+
+def catalog_fingerprint(tech_categories: List[Dict[str, Any]], tier_weights: Dict[str, float]) -> str:
+    """Content hash of the catalog and tier weights, used as the catalog version"""
+    payload = json.dumps(
+        {"categories": tech_categories, "tier_weights": tier_weights},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class TechCatalogIndex:
+    """Immutable lookup structure compiled from TECH_CATEGORIES"""
+
+    def __init__(self, tech_categories: List[Dict[str, Any]], tier_weights: Dict[str, float]):
+        self.version = catalog_fingerprint(tech_categories, tier_weights)
+        self.category_weights = [category["weight"] for category in tech_categories]
+
+        # A tool id may (in principle) be listed under several categories
+        tools: Dict[str, List[Tuple[int, float]]] = {}
+        for category_index, category in enumerate(tech_categories):
+            for tool in category["tools"]:
+                tools.setdefault(tool["id"], []).append(
+                    (category_index, tier_weights.get(tool["tier"], 0))
+                )
+        self.tools = {tool_id: tuple(entries) for tool_id, entries in tools.items()}
+
+    def canonical(self, selected_tools: Iterable[str]) -> FrozenSet[str]:
+        """Canonical cache key: the set of selected tools the catalog knows about"""
+        return frozenset(tool_id for tool_id in selected_tools if tool_id in self.tools)
+
+    def score(self, tool_set: FrozenSet[str]) -> float:
+        """Tech score for a canonical tool set, identical to the catalog walk"""
+        counts: Dict[int, int] = {}
+        bonuses: Dict[int, float] = {}
+        for tool_id in tool_set:
+            for category_index, tier_weight in self.tools[tool_id]:
+                counts[category_index] = counts.get(category_index, 0) + 1
+                bonuses[category_index] = bonuses.get(category_index, 0) + tier_weight
+
+        score = 0.0
+        total_weight = 0.0
+
+        # Accumulate in catalog order so float rounding matches the original loop
+        for category_index in sorted(counts):
+            count = counts[category_index]
+            category_score = min(10, (count * 1.5 + bonuses[category_index]) / count)
+            weight = self.category_weights[category_index]
+            score += category_score * weight
+            total_weight += weight
+
+        return min(10, score / total_weight) if total_weight > 0 else 0.0
+
+
+class TechScorer:
+    """Tech scoring through a compiled catalog index and a bounded LRU cache"""
+
+    def __init__(self, tech_categories: List[Dict[str, Any]], tier_weights: Dict[str, float], maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[FrozenSet[str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.index = TechCatalogIndex(tech_categories, tier_weights)
+
+    def score(self, selected_tools: Iterable[str]) -> float:
+        key = self.index.canonical(selected_tools)
+        if not key:
+            return 0.0
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = self.index.score(key)
+
+        with self._lock:
+            if self.maxsize > 0:
+                self._cache[key] = result
+                if len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return result
+
+    def cache_info(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "catalog_version": self.index.version
+            }
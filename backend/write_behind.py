@@ -0,0 +1,273 @@
+"""
+Write-behind persistence queue for assessment results.
+
+Instead of awaiting one write per submission, writers put their document on
+an in-process queue that a background task hands to `write_batch` (one bulk
+write) whenever a batch fills up or the flush interval elapses. Two
+durability modes are supported:
+
+- "acknowledged": the writer waits until the batch containing its document
+  has been written (same guarantee as before, fewer round trips under load)
+- "queued": the writer returns as soon as the document is queued
+
+Until its write lands, the latest document queued for a key is served by
+pending(), so a queued result stays readable. A batch that still fails after
+max_retries is not dropped: acknowledged writers get the error, queued
+documents become dead letters that stay readable and are retried every
+retry_interval seconds until they are written or superseded by a newer write
+of the same key. Once max_pending dead letters pile up, queued writers fail
+instead of piling on more. discard() forgets every unwritten write of a key
+(queued, dead-lettered or in flight) so a delete isn't undone by a late flush.
+
+The queue is bounded: when it is full, writers wait for room (backpressure).
+close() drains everything still queued, and is called from the shutdown hook.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("acknowledged", "queued")
+
+# (key, document, sequence number, writer's future or None)
+QueuedWrite = Tuple[str, Any, int, Optional[asyncio.Future]]
+
+
+class WriteBehindQueue:
+    """Batches keyed document writes into bulk writes"""
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Tuple[str, Any]]], Awaitable[None]],
+        durability: str = "acknowledged",
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        max_pending: int = 10000,
+        max_retries: int = 3,
+        retry_interval: float = 5.0,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown write durability: {durability}")
+        self.write_batch = write_batch
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Latest unwritten document per key, and failed queued writes awaiting a retry
+        self._pending: Dict[str, Tuple[int, Any]] = {}
+        self._dead_letters: Dict[str, Tuple[int, Any]] = {}
+        # Sequence up to which a key's writes were discarded, while such writes may still be queued
+        self._discarded: Dict[str, int] = {}
+        self._in_flight: Set[str] = set()
+        self._flushed: Optional[asyncio.Event] = None
+        self._sequence = 0
+        self._retry_at = 0.0
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.backpressure_waits = 0
+        self.last_flush_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._worker = asyncio.create_task(self._run())
+
+    def pending(self, key: str) -> Optional[Any]:
+        """The latest document queued for key that is not written yet"""
+        entry = self._pending.get(key)
+        return entry[1] if entry is not None else None
+
+    async def discard(self, key: str) -> bool:
+        """
+        Drop every write of key not yet made (before deleting its document).
+        If a batch writing key is in flight, waits for it to land first.
+        Returns whether an unwritten document was dropped.
+        """
+        self._discarded[key] = self._sequence
+        dropped = self._pending.pop(key, None) is not None
+        self._dead_letters.pop(key, None)
+        if key in self._in_flight and self._flushed is not None:
+            await self._flushed.wait()
+        return dropped
+
+    async def submit(self, key: str, document: Any, wait: Optional[bool] = None):
+        """
+        Queue a write. With acknowledged durability (or wait=True) this returns
+        once the write is in MongoDB and re-raises its error if it failed.
+        """
+        if not self.running:
+            raise RuntimeError("Write-behind queue is not running")
+
+        wait = self.durability == "acknowledged" if wait is None else wait
+        if not wait and len(self._dead_letters) >= self.max_pending:
+            raise RuntimeError(f"Write-behind queue has {len(self._dead_letters)} unwritten documents")
+        future = asyncio.get_running_loop().create_future() if wait else None
+
+        if self._queue.full():
+            self.backpressure_waits += 1
+        self._sequence += 1
+        sequence = self._sequence
+        self._pending[key] = (sequence, document)
+        # A newer write of the key supersedes its failed one
+        self._dead_letters.pop(key, None)
+        await self._queue.put((key, document, sequence, future))
+        self.enqueued += 1
+
+        if future is not None:
+            await future
+
+    async def submit_many(self, items: List[Tuple[str, Any]], wait: Optional[bool] = None):
+        """Queue several writes; waits for all of them under acknowledged durability"""
+        await asyncio.gather(*(self.submit(key, document, wait) for key, document in items))
+
+    async def _next_batch(self, first: QueuedWrite) -> List[QueuedWrite]:
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            if self._dead_letters and time.monotonic() >= self._retry_at:
+                await self._flush([(key, document, sequence, None) for key, (sequence, document) in self._dead_letters.items()])
+                continue
+
+            try:
+                if self._dead_letters:
+                    first = await asyncio.wait_for(self._queue.get(), max(0.0, self._retry_at - time.monotonic()))
+                else:
+                    first = await self._queue.get()
+            except asyncio.TimeoutError:
+                continue
+
+            batch = await self._next_batch(first)
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if self._queue.empty():
+                # No write older than a discard is left to skip
+                self._discarded.clear()
+
+    def _settle(self, key: str, sequence: int, store: Dict[str, Tuple[int, Any]]):
+        entry = store.get(key)
+        if entry is not None and entry[0] == sequence:
+            del store[key]
+
+    async def _flush(self, batch: List[QueuedWrite]):
+        discarded = [write for write in batch if self._discarded.get(write[0], 0) >= write[2]]
+        for _, _, _, future in discarded:
+            if future is not None and not future.done():
+                future.set_result(None)
+        batch = [write for write in batch if self._discarded.get(write[0], 0) < write[2]]
+        if not batch:
+            return
+
+        items = [(key, document) for key, document, _, _ in batch]
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        self._in_flight = {key for key, _, _, _ in batch}
+        self._flushed = asyncio.Event()
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    # Repeated writes of one key must keep their submission order
+                    await self.write_batch(items)
+                    error = None
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = e
+                    if attempt < self.max_retries:
+                        self.retries += 1
+                        await asyncio.sleep(min(1.0, 0.05 * 2 ** attempt))
+        finally:
+            self._in_flight = set()
+            self._flushed.set()
+
+        self.last_flush_seconds = time.perf_counter() - started
+        self.batches += 1
+
+        if error is None:
+            self.written += len(batch)
+            for key, _, sequence, future in batch:
+                self._settle(key, sequence, self._pending)
+                self._settle(key, sequence, self._dead_letters)
+                if future is not None and not future.done():
+                    future.set_result(None)
+            return
+
+        self.failed += len(batch)
+        dead_letters = 0
+        for key, document, sequence, future in batch:
+            if future is not None:
+                # The writer is told; its document doesn't outlive the request
+                self._settle(key, sequence, self._pending)
+                if not future.done():
+                    future.set_exception(error)
+            elif self._pending.get(key, (None,))[0] == sequence:
+                self._dead_letters[key] = (sequence, document)
+                dead_letters += 1
+        self._retry_at = time.monotonic() + self.retry_interval
+        logger.error(
+            f"Write-behind flush of {len(batch)} documents failed, {dead_letters} kept for retry: {str(error)}"
+        )
+
+    async def close(self):
+        """Flush everything still queued and retry dead letters once, then stop the worker"""
+        if self._worker is None:
+            return
+        if self.running:
+            await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        if self._dead_letters:
+            await self._flush([(key, document, sequence, None) for key, (sequence, document) in self._dead_letters.items()])
+        if self._dead_letters:
+            logger.error(f"Write-behind queue closed with {len(self._dead_letters)} documents unwritten")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "durability": self.durability,
+            "running": self.running,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "dead_letters": len(self._dead_letters),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "backpressure_waits": self.backpressure_waits,
+            "last_flush_seconds": self.last_flush_seconds
+        }
@@ -696,7 +696,7 @@ const DeepDivePage = () => {
     setSubmitting(true);
 
     try {
-      const response = await axios.post(`${API}/assessment/submit`, {
+      const response = await axios.post(`${API}/deep-dive/submit`, {
         responses: responses,
         tech_tools: []
       });
@@ -35,7 +35,7 @@ const FlightDeckPage = () => {
 
   const fetchLatestAssessment = async () => {
     try {
-      const response = await axios.get(`${API}/assessment/history`);
+      const response = await axios.get(`${API}/assessment/history`, { params: { limit: 1, fields: 'id' } });
       if (response.data.assessments && response.data.assessments.length > 0) {
         const latest = response.data.assessments[0];
         fetchAssessmentResults(latest.id);
@@ -16,7 +16,7 @@ const HistoryPage = () => {
 
   const fetchHistory = async () => {
     try {
-      const response = await axios.get(`${API}/assessment/history`);
+      const response = await axios.get(`${API}/assessment/history`, { params: { fields: 'summary,tech_tools' } });
       setAssessments(response.data.assessments);
       setLoading(false);
     } catch (error) {
@@ -1,6 +1,236 @@
-def main():
-    print("Hello from repl-nix-workspace!")
+"""
+Production entrypoint for the Flight Deck API.
+
+A small pre-fork supervisor: the parent imports the app once, which compiles
+the scoring model and pre-serializes the static catalog payloads, binds the
+listening socket, and forks the worker processes, which share both through
+copy-on-write. Each worker runs its own uvicorn server (uvloop and httptools
+when installed) and its own lifespan, so every worker opens and warms its own
+MongoDB pool.
+
+- SIGTERM / SIGINT: workers stop accepting connections, finish in-flight
+  requests (up to --graceful-timeout), flush queued writes and exit; workers
+  still running after that are killed.
+- --max-requests: a worker gracefully exits after serving that many requests
+  (plus a random jitter so workers don't recycle together) and is replaced.
+- A worker that dies unexpectedly is replaced too.
+
+    python main.py --workers 4 --port 8000
+
+Settings can also come from the environment: HOST, PORT, WEB_CONCURRENCY,
+MAX_REQUESTS, MAX_REQUESTS_JITTER, GRACEFUL_TIMEOUT, KEEPALIVE_TIMEOUT,
+LOG_LEVEL. Metrics (/metrics) are per worker.
+"""
+import argparse
+import importlib
+import importlib.util
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+logger = logging.getLogger("main")
+
+# Exit code of a worker whose app failed to start (e.g. missing settings)
+WORKER_BOOT_ERROR = 3
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the Flight Deck API with multiple worker processes")
+    parser.add_argument("--host", default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument("--port", type=int, default=int(os.environ.get('PORT', '8000')))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get('WEB_CONCURRENCY', str(os.cpu_count() or 1))),
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--max-requests", type=int, default=int(os.environ.get('MAX_REQUESTS', '0')),
+                        help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.environ.get('MAX_REQUESTS_JITTER', '0')),
+                        help="Random extra requests per worker before recycling")
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.environ.get('GRACEFUL_TIMEOUT', '30')),
+                        help="Seconds workers get to finish in-flight requests on shutdown")
+    parser.add_argument("--keepalive-timeout", type=int, default=int(os.environ.get('KEEPALIVE_TIMEOUT', '5')))
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default=os.environ.get('LOG_LEVEL', 'info'))
+    return parser.parse_args(argv)
+
+
+def event_loop_choice() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_choice() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """Import the app in the parent so workers inherit the compiled model and payloads"""
+    sys.path.insert(0, BACKEND_DIR)
+    server = importlib.import_module("server")
+    logger.info(f"Preloaded app with scoring model {server.current_model().version}")
+    return server.app
+
+
+def serve_worker(app, sock: socket.socket, args: argparse.Namespace, max_requests: int) -> int:
+    """Run one uvicorn server on the shared socket; returns the worker's exit code"""
+    import uvicorn
+
+    # uvicorn installs its own handlers for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(
+        app,
+        loop=event_loop_choice(),
+        http=http_choice(),
+        lifespan="on",
+        limit_max_requests=max_requests or None,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keepalive_timeout,
+        log_level=args.log_level,
+        access_log=False,
+        proxy_headers=True
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else WORKER_BOOT_ERROR
+
+
+class Supervisor:
+    """Forks workers, replaces the ones that exit, and drains them on SIGTERM"""
+
+    def __init__(self, app, sock: socket.socket, args: argparse.Namespace):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+        self.exit_code = 0
+
+    def spawn(self):
+        max_requests = self.args.max_requests
+        if max_requests and self.args.max_requests_jitter:
+            max_requests += random.randint(0, self.args.max_requests_jitter)
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                random.seed()
+                code = serve_worker(self.app, self.sock, self.args, max_requests)
+            except SystemExit as e:
+                # uvicorn exits with 3 (WORKER_BOOT_ERROR) when the lifespan startup fails
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                logger.exception("Worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def stop(self, signum, frame):
+        if not self.stopping:
+            logger.info(f"Received {signal.Signals(signum).name}, draining {len(self.workers)} workers")
+        self.stopping = True
+
+    def reap(self):
+        """Collect exited workers; replace them unless shutting down"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == WORKER_BOOT_ERROR:
+                # Replacing it would fail the same way
+                logger.error(f"Worker {pid} failed to start, shutting down")
+                self.stopping = True
+                self.exit_code = 1
+                continue
+            if code == 0:
+                logger.info(f"Worker {pid} recycled")
+            else:
+                logger.warning(f"Worker {pid} exited with {code}, replacing it")
+                # Don't spin when workers crash right after starting
+                if time.monotonic() - started < 1:
+                    time.sleep(1)
+            self.spawn()
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(
+            f"Serving on {self.args.host}:{self.args.port} with {self.args.workers} workers "
+            f"(loop={event_loop_choice()}, http={http_choice()})"
+        )
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        while not self.stopping:
+            self.reap()
+            time.sleep(0.2)
+
+        # Graceful drain: workers finish in-flight requests and run their shutdown hooks
+        for pid in list(self.workers):
+            self.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not exit in time, killing it")
+            self.kill(pid, signal.SIGKILL)
+        while self.workers:
+            self.reap()
+            time.sleep(0.05)
+        self.sock.close()
+        return self.exit_code
+
+    def kill(self, pid: int, signum: int):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # The app sizes its per-process caches by the number of workers
+    os.environ['WEB_CONCURRENCY'] = str(args.workers)
+    app = preload()
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): a single uvicorn process
+        import uvicorn
+        uvicorn.run(app, host=args.host, port=args.port, loop=event_loop_choice(), http=http_choice(),
+                    timeout_graceful_shutdown=args.graceful_timeout, log_level=args.log_level)
+        return 0
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    return Supervisor(app, sock, args).run()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Shared fixtures. The backend modules are flat (run from backend/), so the
+directory goes on sys.path; the API runs against mongomock-motor.
+"""
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+# server.py reads these at import
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "flightdeck_test")
+
+from loadtest.mock_mongo import create_mock_client, patch_mongomock_bulk  # noqa: E402
+
+patch_mongomock_bulk()
+
+
+@pytest.fixture
+def server():
+    import server as server_module
+    return server_module
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    """TestClient over the app, with a fresh mongomock database and empty caches"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, "create_client", create_mock_client)
+    server.assessment_cache.clear()
+    server.result_memo.clear()
+    server.cohort_benchmarks._unflushed.clear()
+    server.cohort_benchmarks._loaded_at = None
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,98 @@
+"""Read-through assessment cache: L1 lifetime and invalidation across processes"""
+import asyncio
+
+import pytest
+
+from assessment_cache import AssessmentCache, MemorySharedBackend, SharedCacheBackend
+
+
+def test_local_entries_expire_before_shared_ones():
+    async def scenario():
+        shared = MemorySharedBackend()
+        # Two workers sharing L2; each has its own L1
+        worker_a = AssessmentCache(maxsize=10, ttl=60, shared=shared, local_ttl=0.05)
+        worker_b = AssessmentCache(maxsize=10, ttl=60, shared=shared, local_ttl=0.05)
+        store = {"a1": {"id": "a1", "version": 1}}
+
+        async def load():
+            return dict(store["a1"])
+
+        assert (await worker_b.get_or_load("a1", load))["version"] == 1
+
+        # Worker A rewrites the document and invalidates; B's L1 still has v1
+        store["a1"] = {"id": "a1", "version": 2}
+        await worker_a.invalidate("a1")
+        assert (await worker_b.get_or_load("a1", load))["version"] == 1
+
+        # Once B's short-lived L1 entry expires it reads through again
+        await asyncio.sleep(0.06)
+        assert (await worker_b.get_or_load("a1", load))["version"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_local_ttl_zero_disables_l1_only():
+    async def scenario():
+        shared = MemorySharedBackend()
+        cache = AssessmentCache(maxsize=10, ttl=60, shared=shared, local_ttl=0)
+        loads = []
+
+        async def load():
+            loads.append(1)
+            return {"id": "a1"}
+
+        await cache.get_or_load("a1", load)
+        await cache.get_or_load("a1", load)
+        assert len(loads) == 1
+        assert cache.stats()["size"] == 0
+        assert cache.shared_hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_local_ttl_never_exceeds_ttl():
+    assert AssessmentCache(ttl=5, local_ttl=60).local_ttl == 5
+    assert AssessmentCache(ttl=5).local_ttl == 5
+
+
+def test_load_in_flight_during_invalidation_does_not_refill_shared():
+    async def scenario():
+        shared = MemorySharedBackend()
+        worker_a = AssessmentCache(maxsize=10, ttl=60, shared=shared, local_ttl=0)
+        worker_b = AssessmentCache(maxsize=10, ttl=60, shared=shared, local_ttl=0)
+        store = {"a1": {"id": "a1", "version": 1}}
+        read = asyncio.Event()
+        resume = asyncio.Event()
+
+        async def slow_load():
+            doc = dict(store["a1"])
+            read.set()
+            await resume.wait()
+            return doc
+
+        async def load():
+            return dict(store["a1"])
+
+        # B reads v1 from MongoDB; A rewrites and invalidates before B caches it
+        pending = asyncio.create_task(worker_b.get_or_load("a1", slow_load))
+        await read.wait()
+        store["a1"] = {"id": "a1", "version": 2}
+        await worker_a.invalidate("a1")
+        resume.set()
+        assert (await pending)["version"] == 1
+
+        # Neither worker is served B's stale v1 from L2
+        assert (await worker_a.get_or_load("a1", load))["version"] == 2
+        assert (await worker_b.get_or_load("a1", load))["version"] == 2
+        assert worker_b.shared_hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_shared_backends_must_implement_get_and_set():
+    class Incomplete(SharedCacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
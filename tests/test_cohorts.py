@@ -0,0 +1,119 @@
+"""Benchmark rollup: resubmits replace their previous contribution, deltas are flushed in one $inc"""
+import asyncio
+
+import pytest
+
+from cohorts import ROLLUP_ID, CohortBenchmarks
+
+
+def stored_rollup(server, client):
+    async def flush_and_read():
+        await server.cohort_benchmarks.flush(server.db)
+        return await server.db.cohort_stats.find_one({"_id": ROLLUP_ID})
+    return client.portal.call(flush_and_read)
+
+
+def test_resubmits_and_deletes_keep_the_rollup_exact(server, client):
+    submission = {"responses": {"strategy": 100}, "tech_tools": ["salesforce"], "assessment_id": "cohort-1"}
+    for value in (100, 0, 50):
+        submission["responses"]["strategy"] = value
+        assert client.post("/api/assessment/submit", json=submission).status_code == 200
+    client.post("/api/assessment/submit", json={**submission, "assessment_id": "cohort-2"})
+
+    rollup = stored_rollup(server, client)
+    assert rollup["count"] == 2
+    assert rollup["tools"] == {"salesforce": 2}
+    assert sum(rollup["plane_levels"].values()) == 2
+    assert all(sum(bins.values()) == 2 for bins in rollup["histograms"].values())
+
+    assert client.delete("/api/assessment/cohort-1").status_code == 200
+    rollup = stored_rollup(server, client)
+    assert rollup["count"] == 1
+    assert rollup["tools"] == {"salesforce": 1}
+
+
+class FailingCollection:
+    async def update_one(self, *args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+
+class FakeDb:
+    cohort_stats = FailingCollection()
+
+
+def test_plane_names_are_resolved_when_recording():
+    plane_names = ["Glider"]
+    benchmarks = CohortBenchmarks(lambda: plane_names, ["salesforce"])
+    doc = {"reao_scores": {}, "plane_level": {"name": "Jet"}, "tech_tools": []}
+    benchmarks.add(added=[doc])
+    assert "Jet" not in benchmarks.rollup.plane_levels
+
+    # A reloaded scoring model with a new plane level
+    plane_names.append("Jet")
+    benchmarks.add(added=[doc])
+    assert benchmarks.rollup.plane_levels["Jet"] == 1
+
+
+def test_failed_flush_keeps_the_delta():
+    benchmarks = CohortBenchmarks(lambda: ["Glider"], [])
+    benchmarks.add(added=[{"plane_level": {"name": "Glider"}}])
+    with pytest.raises(ConnectionError):
+        asyncio.run(benchmarks.flush(FakeDb()))
+    assert benchmarks._unflushed["count"] == 1
+    assert benchmarks._unflushed["plane_levels.Glider"] == 1
+
+
+class GatedCollection:
+    """cohort_stats whose writes wait for `gate`"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.gate = asyncio.Event()
+        self.writing = asyncio.Event()
+
+    async def update_one(self, *args, **kwargs):
+        self.writing.set()
+        await self.gate.wait()
+        return await self.collection.update_one(*args, **kwargs)
+
+    async def find_one(self, *args, **kwargs):
+        return await self.collection.find_one(*args, **kwargs)
+
+
+def test_reload_during_a_flush_keeps_the_delta():
+    from mongomock_motor import AsyncMongoMockClient
+
+    async def scenario():
+        db = AsyncMongoMockClient()["cohorts"]
+        db.cohort_stats = GatedCollection(db["cohort_stats"])
+        benchmarks = CohortBenchmarks(lambda: ["Glider"], [], refresh_seconds=0)
+        benchmarks.add(added=[{"plane_level": {"name": "Glider"}}])
+
+        flush = asyncio.create_task(benchmarks.flush(db))
+        await db.cohort_stats.writing.wait()
+        # A reload while the $inc is in flight, and an assessment added meanwhile
+        reload = asyncio.create_task(benchmarks.current(db))
+        benchmarks.add(added=[{"plane_level": {"name": "Glider"}}])
+        await asyncio.sleep(0.01)
+        db.cohort_stats.gate.set()
+        await flush
+        assert (await reload).count == 2
+        assert benchmarks._unflushed["count"] == 1 and benchmarks._unflushed["plane_levels.Glider"] == 1
+
+        await benchmarks.flush(db)
+        assert benchmarks._unflushed == {}
+        assert (await benchmarks.current(db)).count == 2
+
+    asyncio.run(scenario())
+
+
+def test_assessment_benchmark(client):
+    submission = {"responses": {"strategy": 75}, "tech_tools": ["salesforce"], "assessment_id": "compare-1"}
+    assert client.post("/api/assessment/submit", json=submission).status_code == 200
+    response = client.get("/api/benchmarks/compare-1")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["cohort_size"] == 1
+    assert set(body["metrics"]) == {"readiness", "efficiency", "alignment", "opportunity", "combined_score"}
+    assert body["tool_adoption"] == {"salesforce": 1.0}
+    assert client.get("/api/benchmarks/missing").status_code == 404
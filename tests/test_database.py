@@ -0,0 +1,46 @@
+"""MongoDB client options: compressors without their package fall back instead of vanishing"""
+import pytest
+
+import database
+from database import MongoSettings, available_compressors
+
+
+@pytest.fixture
+def installed(monkeypatch):
+    """Pretend exactly the given compressor modules are importable"""
+    modules = set()
+    real_find_spec = database.importlib.util.find_spec
+
+    def find_spec(name, *args):
+        if name in ("zstandard", "snappy"):
+            return object() if name in modules else None
+        return real_find_spec(name, *args)
+
+    monkeypatch.setattr(database.importlib.util, "find_spec", find_spec)
+    return modules
+
+
+def test_available_compressors_keep_order(installed):
+    installed.update({"zstandard", "snappy"})
+    assert available_compressors("zstd, snappy,zlib") == ["zstd", "snappy", "zlib"]
+
+
+def test_missing_packages_are_dropped(installed):
+    installed.add("snappy")
+    assert available_compressors("zstd,snappy") == ["snappy"]
+
+
+def test_falls_back_to_zlib(installed):
+    assert available_compressors("zstd,snappy") == ["zlib"]
+    assert available_compressors("") == []
+
+
+def test_unknown_compressor_is_rejected():
+    with pytest.raises(ValueError):
+        available_compressors("zstd,lz4")
+
+
+def test_client_options(installed):
+    settings = MongoSettings(url="mongodb://localhost", db_name="test", compressors="zstd,zlib")
+    assert settings.client_options()["compressors"] == "zlib"
+    assert "compressors" not in MongoSettings(url="mongodb://localhost", db_name="test").client_options()
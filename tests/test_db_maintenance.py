@@ -0,0 +1,42 @@
+"""created_at migration: conversion, and no rescans for unparseable values"""
+import asyncio
+from datetime import datetime, timezone
+
+from mongomock_motor import AsyncMongoMockClient
+
+from db_maintenance import migrate_created_at
+
+
+def test_migration_converts_and_flags_unparseable_values():
+    async def scenario():
+        db = AsyncMongoMockClient(tz_aware=True)["migration_test"]
+        await db.assessments.insert_many([
+            {"id": "a", "created_at": "2024-05-01T10:00:00"},
+            {"id": "b", "created_at": "2024-05-02T10:00:00+00:00"},
+            {"id": "c", "created_at": "yesterday"},
+            {"id": "d", "created_at": datetime(2024, 5, 3, tzinfo=timezone.utc)}
+        ])
+
+        state = await migrate_created_at(db, batch_size=2)
+        assert state["status"] == "complete"
+        assert state["converted"] == 2
+        assert state["skipped"] == 1
+
+        converted = await db.assessments.find_one({"id": "a"})
+        assert converted["created_at"] == datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+        unparseable = await db.assessments.find_one({"id": "c"})
+        assert unparseable["created_at"] == "yesterday"
+        assert unparseable["created_at_unparseable"] is True
+
+        # A later startup finds nothing left to do and keeps the completed state
+        stored = await db.migrations.find_one({"_id": "created_at_to_date"})
+        await migrate_created_at(db, batch_size=2)
+        assert await db.migrations.find_one({"_id": "created_at_to_date"}) == stored
+
+        # New string timestamps (an older server version) are still picked up
+        await db.assessments.insert_one({"id": "e", "created_at": "2024-06-01T00:00:00Z"})
+        latest = await migrate_created_at(db, batch_size=2)
+        assert latest["converted"] == 1
+        assert (await db.assessments.find_one({"id": "e"}))["created_at"] == datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+    asyncio.run(scenario())
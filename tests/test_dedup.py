@@ -0,0 +1,51 @@
+"""Identical resubmits return the stored result, but only when MongoDB still holds it"""
+import pytest
+
+
+def deduplicated(server):
+    return server.submit_deduplicated._values.get((), 0)
+
+
+@pytest.fixture
+def submission():
+    return {"responses": {"strategy": 75, "content": 50}, "tech_tools": ["salesforce"], "assessment_id": "dedup-1"}
+
+
+def stored(server, client, assessment_id):
+    return client.portal.call(server.db.assessments.find_one, {"id": assessment_id}, {"_id": 0})
+
+
+def test_identical_resubmit_returns_stored_result(server, client, submission):
+    first = client.post("/api/assessment/submit", json=submission).json()
+    before = deduplicated(server)
+    again = client.post("/api/assessment/submit", json=submission)
+    assert again.status_code == 200
+    assert again.json() == first
+    assert deduplicated(server) == before + 1
+
+
+def test_changed_resubmit_is_rescored(server, client, submission):
+    first = client.post("/api/assessment/submit", json=submission).json()
+    before = deduplicated(server)
+    changed = client.post("/api/assessment/submit", json={**submission, "responses": {"strategy": 0}}).json()
+    assert changed["content_hash"] != first["content_hash"]
+    assert stored(server, client, "dedup-1")["content_hash"] == changed["content_hash"]
+    assert deduplicated(server) == before
+
+
+def test_stale_cache_does_not_dedup(server, client, submission):
+    first = client.post("/api/assessment/submit", json=submission).json()
+    # This worker caches the result, then another worker replaces it
+    assert client.get("/api/assessment/results/dedup-1").status_code == 200
+    client.portal.call(
+        server.db.assessments.update_one,
+        {"id": "dedup-1"},
+        {"$set": {"content_hash": "other-worker", "responses": {"strategy": 0}}}
+    )
+
+    before = deduplicated(server)
+    again = client.post("/api/assessment/submit", json=submission)
+    assert again.status_code == 200
+    assert deduplicated(server) == before
+    assert stored(server, client, "dedup-1")["content_hash"] == first["content_hash"]
+    assert stored(server, client, "dedup-1")["responses"] == submission["responses"]
@@ -0,0 +1,76 @@
+"""Streaming export: every format carries every assessment, deep-dive answers included"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+
+@pytest.fixture
+def stored(server, client):
+    docs = [
+        {
+            "id": "quick",
+            "created_at": datetime(2024, 5, 1, tzinfo=timezone.utc),
+            "responses": {"strategy": 75, "content": 50},
+            "tech_tools": ["salesforce"],
+            "assessment_score": 62.5,
+            "tech_score": 3.0,
+            "combined_score": 5.0,
+            "plane_level": {"name": "Cessna"},
+            "reao_scores": {"readiness": 60, "efficiency": 50, "alignment": 40, "opportunity": 30}
+        },
+        {
+            "id": "deep",
+            "created_at": datetime(2024, 5, 2, tzinfo=timezone.utc),
+            "responses": {"strategy": 25, "bank_q1": 100, "bank_q2": 0},
+            "tech_tools": [],
+            "question_bank_version": "1+abc",
+            "assessment_score": 41.7,
+            "tech_score": 0.0,
+            "combined_score": 2.0,
+            "plane_level": {"name": "Glider"},
+            "reao_scores": {"readiness": 10, "efficiency": 20, "alignment": 30, "opportunity": 40}
+        }
+    ]
+
+    async def seed():
+        await server.db.assessments.insert_many([dict(doc) for doc in docs])
+
+    client.portal.call(seed)
+    return docs
+
+
+def test_ndjson_export_matches_api_encoding(client, stored):
+    response = client.get("/api/assessment/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ["quick", "deep"]
+    assert rows[1]["responses"] == {"strategy": 25, "bank_q1": 100, "bank_q2": 0}
+    assert datetime.fromisoformat(rows[0]["created_at"]) == stored[0]["created_at"]
+
+
+def test_csv_export_keeps_deep_dive_responses(client, stored):
+    response = client.get("/api/assessment/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == ["quick", "deep"]
+    assert rows[0]["response_strategy"] == "75"
+    assert rows[0]["other_responses"] == ""
+    assert rows[1]["question_bank_version"] == "1+abc"
+    assert json.loads(rows[1]["other_responses"]) == {"bank_q1": 100, "bank_q2": 0}
+
+
+def test_parquet_export(client, stored):
+    pq = pytest.importorskip("pyarrow.parquet")
+    response = client.get("/api/assessment/export", params={"format": "parquet"})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("id").to_pylist() == ["quick", "deep"]
+    assert table.column("response_strategy").to_pylist() == [75, 25]
+    assert json.loads(table.column("other_responses").to_pylist()[1]) == {"bank_q1": 100, "bank_q2": 0}
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/api/assessment/export", params={"format": "xml"}).status_code == 400
@@ -0,0 +1,65 @@
+"""Keyset pagination of /assessment/history"""
+from datetime import datetime, timedelta, timezone
+
+
+def seed(client, server, count):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Several rows share each timestamp so the id tiebreak matters
+    docs = [
+        {"id": f"a{i:03d}", "created_at": base + timedelta(minutes=i // 3), "combined_score": float(i), "responses": {}, "tech_tools": []}
+        for i in range(count)
+    ]
+
+    async def insert():
+        await server.db.assessments.insert_many([dict(doc) for doc in docs])
+
+    client.portal.call(insert)
+    return sorted(docs, key=lambda doc: (doc["created_at"], doc["id"]), reverse=True)
+
+
+def all_pages(client, limit, **params):
+    ids = []
+    cursor = None
+    while True:
+        query = {"limit": limit, **params}
+        if cursor:
+            query["cursor"] = cursor
+        page = client.get("/api/assessment/history", params=query)
+        assert page.status_code == 200
+        body = page.json()
+        assert len(body["assessments"]) <= limit
+        ids.extend(doc["id"] for doc in body["assessments"])
+        if not body["has_more"]:
+            assert body["next_cursor"] is None
+            return ids
+        cursor = body["next_cursor"]
+
+
+def test_pages_cover_every_row_once_in_order(client, server):
+    expected = seed(client, server, 37)
+    assert all_pages(client, 5) == [doc["id"] for doc in expected]
+    assert all_pages(client, 37) == [doc["id"] for doc in expected]
+
+
+def test_newer_inserts_do_not_shift_later_pages(client, server):
+    expected = seed(client, server, 12)
+    first = client.get("/api/assessment/history", params={"limit": 4}).json()
+
+    async def insert_newer():
+        await server.db.assessments.insert_one({"id": "newest", "created_at": datetime(2030, 1, 1, tzinfo=timezone.utc)})
+
+    client.portal.call(insert_newer)
+    second = client.get("/api/assessment/history", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+    assert [doc["id"] for doc in second["assessments"]] == [doc["id"] for doc in expected[4:8]]
+
+
+def test_field_projection_keeps_sort_keys(client, server):
+    seed(client, server, 3)
+    page = client.get("/api/assessment/history", params={"fields": "combined_score"}).json()
+    for doc in page["assessments"]:
+        assert set(doc) == {"id", "created_at", "combined_score"}
+
+
+def test_invalid_cursor_and_fields_are_rejected(client):
+    assert client.get("/api/assessment/history", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/assessment/history", params={"fields": "no_such_field"}).status_code == 400
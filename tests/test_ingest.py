@@ -0,0 +1,101 @@
+"""Bulk uploads: re-uploading a file updates its assessments instead of duplicating them; size limits"""
+import os
+import time
+
+import pytest
+
+from ingest import row_assessment_id
+
+CSV_HEADER = "id,created_at,response_strategy,response_content,tech_tools\n"
+
+
+def upload(client, body, **params):
+    response = client.post(
+        "/api/assessment/upload",
+        params={"filename": "assessments.csv", **params},
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    deadline = time.monotonic() + 10
+    while True:
+        status = client.get(f"/api/assessment/upload/{job_id}").json()
+        if status["status"] not in ("queued", "running"):
+            return status
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def stored_ids(server, client):
+    async def ids():
+        return sorted(doc["id"] for doc in await server.db.assessments.find({}, {"id": 1}).to_list(None))
+    return client.portal.call(ids)
+
+
+def test_reupload_does_not_duplicate_idless_rows(server, client):
+    body = CSV_HEADER + "known-1,,75,50,salesforce\n,,25,25,\n,,25,25,\n,2024-01-02T00:00:00Z,100,0,hubspot\n"
+    first = upload(client, body)
+    assert first["status"] == "completed"
+    assert first["rows_ingested"] == 4
+    ids = stored_ids(server, client)
+    # Identical id-less rows are still separate assessments
+    assert len(ids) == 4
+
+    assert upload(client, body)["status"] == "completed"
+    assert stored_ids(server, client) == ids
+    assert row_assessment_id(first["upload_key"], 2) in ids
+
+
+def test_upload_key_maps_a_corrected_file_onto_the_same_rows(server, client):
+    upload(client, CSV_HEADER + ",,25,25,\n", upload_key="client-42")
+    upload(client, CSV_HEADER + ",,100,100,\n", upload_key="client-42")
+    assessment_id = row_assessment_id("client-42", 1)
+    assert stored_ids(server, client) == [assessment_id]
+    result = client.get(f"/api/assessment/results/{assessment_id}").json()
+    assert result["responses"] == {"strategy": 100, "content": 100}
+
+
+def test_row_errors_are_reported(client):
+    status = upload(client, CSV_HEADER + ",,25,25,\n,,30,25,\n,,25,25,not-a-tool\n")
+    assert status["rows_ingested"] == 1
+    assert [error["row"] for error in status["errors"]] == [2, 3]
+
+
+@pytest.fixture
+def spooled(server, monkeypatch):
+    """Names of the spool files the upload endpoint opens"""
+    names = []
+    named_temporary_file = server.tempfile.NamedTemporaryFile
+
+    def spool(*args, **kwargs):
+        file = named_temporary_file(*args, **kwargs)
+        names.append(file.name)
+        return file
+
+    monkeypatch.setattr(server.tempfile, "NamedTemporaryFile", spool)
+    return names
+
+
+def test_declared_oversized_upload_is_refused_before_reading(client, server, monkeypatch, spooled):
+    monkeypatch.setattr(server, "INGEST_MAX_BYTES", 64)
+    response = client.post(
+        "/api/assessment/upload", params={"format": "csv"}, content=b"x" * 65, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 413
+    assert spooled == []
+
+
+def test_streamed_upload_is_capped(client, server, monkeypatch, spooled):
+    monkeypatch.setattr(server, "INGEST_MAX_BYTES", 64)
+    # A generator body is sent chunked, without a Content-Length
+    response = client.post(
+        "/api/assessment/upload", params={"format": "csv"}, content=(b"x" * 16 for _ in range(10))
+    )
+    assert response.status_code == 413
+    assert len(spooled) == 1 and not os.path.exists(spooled[0])
+
+
+def test_multipart_uploads_are_refused(client):
+    response = client.post("/api/assessment/upload", files={"file": ("assessments.csv", CSV_HEADER.encode("utf-8"), "text/csv")})
+    assert response.status_code == 415
@@ -0,0 +1,77 @@
+"""Live-scoring snapshots match what /assessment/submit computes for the same answers"""
+import random
+
+from live_scoring import LiveScoringSession
+
+SCORE_FIELDS = ("assessment_score", "tech_score", "combined_score", "plane_level", "reao_scores")
+
+
+def submit_scores(model, responses, tech_tools):
+    assessment_score = model.assessment_score(responses)
+    tech_score = model.tech_score(tech_tools)
+    return {
+        "assessment_score": assessment_score,
+        "tech_score": tech_score,
+        "combined_score": model.combined_score(assessment_score, tech_score),
+        "plane_level": model.plane_level(assessment_score, tech_score),
+        "reao_scores": model.reao_scores(responses, tech_tools)
+    }
+
+
+def test_incremental_updates_match_submit(server):
+    model = server.current_model()
+    question_ids = [q["id"] for q in server.ASSESSMENT_QUESTIONS] + ["unknown_question"]
+    tool_ids = [tool["id"] for category in server.TECH_CATEGORIES for tool in category["tools"]] + ["unknown_tool"]
+    rng = random.Random(7)
+    session = LiveScoringSession(model)
+
+    for step in range(3000):
+        kind = rng.random()
+        if kind < 0.6:
+            session.apply({"type": "answer", "question_id": rng.choice(question_ids), "value": rng.choice([0, 25, 50, 75, 100])})
+        elif kind < 0.7:
+            session.apply({"type": "answer", "question_id": rng.choice(question_ids), "value": None})
+        elif kind < 0.98:
+            session.apply({"type": "tool", "tool_id": rng.choice(tool_ids)})
+        else:
+            session.apply({"type": "reset", "responses": {q_id: 50 for q_id in rng.sample(question_ids, 3)}, "tech_tools": rng.sample(tool_ids, 2)})
+
+        snapshot = session.snapshot()
+        expected = submit_scores(model, session.responses, session.tech_tools)
+        assert {field: snapshot[field] for field in SCORE_FIELDS} == expected, step
+
+
+def test_websocket_snapshots_match_submit(client, server):
+    answers = {"strategy": 75, "content": 25, "demand_gen": 100}
+    tools = ["salesforce", "hubspot"]
+
+    with client.websocket_connect("/api/assessment/live") as websocket:
+        assert websocket.receive_json()["answered"] == 0
+        for seq, (question_id, value) in enumerate(answers.items()):
+            websocket.send_json({"type": "answer", "question_id": question_id, "value": value, "seq": seq})
+            assert websocket.receive_json()["seq"] == seq
+        for tool_id in tools:
+            websocket.send_json({"type": "tool", "tool_id": tool_id, "selected": True})
+            snapshot = websocket.receive_json()
+
+        websocket.send_json({"type": "submit", "assessment_id": "live-1"})
+        reply = websocket.receive_json()
+
+    assert reply["type"] == "result"
+    submitted = client.post(
+        "/api/assessment/submit",
+        json={"responses": answers, "tech_tools": tools, "assessment_id": "live-2"}
+    ).json()
+    assert {field: snapshot[field] for field in SCORE_FIELDS} == {field: submitted[field] for field in SCORE_FIELDS}
+    assert {field: reply["result"][field] for field in SCORE_FIELDS} == {field: submitted[field] for field in SCORE_FIELDS}
+    assert client.get("/api/assessment/results/live-1").json() == reply["result"]
+
+
+def test_bad_message_keeps_the_session(client):
+    with client.websocket_connect("/api/assessment/live") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "answer", "question_id": "strategy", "value": "high", "seq": 1})
+        error = websocket.receive_json()
+        assert error["type"] == "error" and error["seq"] == 1
+        websocket.send_json({"type": "answer", "question_id": "strategy", "value": 50, "seq": 2})
+        assert websocket.receive_json()["answered"] == 1
@@ -0,0 +1,87 @@
+"""/metrics: requests labelled by route template, one count per request, Prometheus text format"""
+import metrics
+
+
+def scrape(client):
+    """Samples of /metrics as {'name{labels}': value}"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            samples[key] = float(value)
+    return samples
+
+
+RESULTS_ROUTE = 'route="/api/assessment/results/{assessment_id}"'
+
+
+def test_requests_are_labelled_by_route_template(client):
+    client.get("/api/assessment/results/not-a-real-id")
+    samples = scrape(client)
+    assert samples[f'http_requests_total{{method="GET",{RESULTS_ROUTE},status="404"}}'] >= 1
+    assert not any("not-a-real-id" in key for key in samples)
+
+    client.get("/api/no/such/route")
+    assert scrape(client)['http_requests_total{method="GET",route="unmatched",status="404"}'] >= 1
+
+
+def test_each_request_counts_once(client):
+    requests = f'http_requests_total{{method="GET",{RESULTS_ROUTE},status="404"}}'
+    observations = f'http_request_duration_seconds_count{{method="GET",{RESULTS_ROUTE}}}'
+    before = scrape(client)
+    for _ in range(3):
+        client.get("/api/assessment/results/missing")
+    after = scrape(client)
+    assert after[requests] - before.get(requests, 0) == 3
+    assert after[observations] - before.get(observations, 0) == 3
+    assert after['http_request_duration_seconds_bucket{method="GET",' + RESULTS_ROUTE + ',le="+Inf"}'] == after[observations]
+    # Scrapes themselves aren't recorded
+    assert not any('route="/metrics"' in key for key in after)
+    assert after["http_requests_in_flight"] == 0
+
+
+def test_submit_records_pipeline_stages(client):
+    client.post("/api/assessment/submit", json={"responses": {"strategy": 50}, "tech_tools": []})
+    samples = scrape(client)
+    assert samples['pipeline_stage_duration_seconds_count{pipeline="submit",stage="persist"}'] >= 1
+
+
+def test_exposition_format():
+    registry = metrics.Registry()
+    counter = registry.counter("jobs_total", "Jobs run", ("queue",))
+    gauge = registry.gauge("depth", "Queue depth")
+    histogram = registry.histogram("job_seconds", "Job duration", ("queue",), buckets=(0.1, 1.0))
+    counter.inc('say "hi"\n')
+    counter.inc('say "hi"\n', amount=2)
+    gauge.set(value=1.5)
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe("default", value=value)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{queue="say \\"hi\\"\\n"} 3',
+        "# HELP depth Queue depth",
+        "# TYPE depth gauge",
+        "depth 1.5",
+        "# HELP job_seconds Job duration",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{queue="default",le="0.1"} 1',
+        'job_seconds_bucket{queue="default",le="1"} 3',
+        'job_seconds_bucket{queue="default",le="+Inf"} 4',
+        'job_seconds_sum{queue="default"} 4.05',
+        'job_seconds_count{queue="default"} 4',
+    ]
+    assert registry.render().endswith("\n")
+
+
+def test_callback_gauges_are_sampled_at_scrape_time():
+    registry = metrics.Registry()
+    sizes = {"a": 1}
+    registry.gauge("sizes", "Sizes", ("name",), callback=lambda: [((name,), size) for name, size in sizes.items()])
+    assert 'sizes{name="a"} 1' in registry.render()
+    sizes["a"] = 7
+    assert 'sizes{name="a"} 7' in registry.render()
@@ -0,0 +1,127 @@
+"""Sparse CSR deep-dive scoring must match a dense per-question computation"""
+import json
+import random
+
+import numpy as np
+import pytest
+
+from question_bank import DEFAULT_BANK_PATH, InvalidQuestionBank, QuestionBank
+from scoring_engine import REAO_DIMENSIONS
+
+# Fractional weights and a per-question override
+SMALL_BANK = {
+    "version": "test",
+    "topics": [
+        {
+            "id": "strategy",
+            "dimensions": {"readiness": 1, "alignment": 0.5},
+            "questions": [{"id": "s1"}, {"id": "s2", "dimensions": {"opportunity": 2}}]
+        },
+        {"id": "content", "dimensions": {"efficiency": 1.5}, "questions": [{"id": "c1"}, {"id": "c2"}, {"id": "c3"}]}
+    ]
+}
+
+
+def dense_scores(data, responses):
+    """Per-dimension sums and weights, per-topic averages and the overall mean, question by question"""
+    sums = dict.fromkeys(REAO_DIMENSIONS, 0.0)
+    weights = dict.fromkeys(REAO_DIMENSIONS, 0.0)
+    topics = {}
+    for topic in data["topics"]:
+        answers = []
+        for question in topic["questions"]:
+            if question["id"] not in responses:
+                continue
+            value = responses[question["id"]]
+            answers.append(value)
+            for dimension, weight in question.get("dimensions", topic.get("dimensions", {})).items():
+                sums[dimension] += value * weight
+                weights[dimension] += weight
+        if answers:
+            topics[topic["id"]] = sum(answers) / len(answers)
+    mean = sum(responses.values()) / len(responses) if responses else 0.0
+    return sums, weights, topics, mean
+
+
+def assert_matches_dense(data, responses_list):
+    bank = QuestionBank(data)
+    scores = bank.score(responses_list)
+    assert len(scores) == len(responses_list)
+    for row, responses in enumerate(responses_list):
+        sums, weights, topics, mean = dense_scores(data, responses)
+        assert scores.sums(row) == pytest.approx(sums)
+        assert scores.weights(row) == pytest.approx(weights)
+        assert scores.assessment_score[row] == pytest.approx(mean)
+        topic_scores = bank.topic_scores(scores, row)
+        assert {topic_id: topic["score"] for topic_id, topic in topic_scores.items()} == pytest.approx(topics)
+
+
+def random_responses(rng, question_ids, count):
+    responses_list = []
+    for _ in range(count):
+        answered = rng.sample(question_ids, rng.randint(0, min(len(question_ids), 40)))
+        responses = {q_id: rng.choice([0, 25, 50, 75, 100]) for q_id in answered}
+        if rng.random() < 0.3:
+            responses[f"unknown_{rng.randint(0, 3)}"] = rng.randint(0, 100)
+        responses_list.append(responses)
+    return responses_list
+
+
+def test_small_bank_matches_dense():
+    question_ids = ["s1", "s2", "c1", "c2", "c3"]
+    assert_matches_dense(SMALL_BANK, random_responses(random.Random(5), question_ids, 500))
+
+
+def test_shipped_bank_matches_dense():
+    with open(DEFAULT_BANK_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    question_ids = [question["id"] for topic in data["topics"] for question in topic["questions"]]
+    assert_matches_dense(data, random_responses(random.Random(6), question_ids, 300))
+
+
+def test_partial_answers_report_coverage():
+    bank = QuestionBank(SMALL_BANK)
+    scores = bank.score([{"c1": 40, "c3": 80}])
+    assert bank.topic_scores(scores, 0) == {"content": {"score": 60.0, "answered": 2, "questions": 3, "coverage": 2 / 3}}
+    assert scores.weights(0) == {"readiness": 0, "efficiency": 3.0, "alignment": 0, "opportunity": 0}
+
+
+def test_unknown_questions_only_count_in_the_overall_mean():
+    bank = QuestionBank(SMALL_BANK)
+    scores = bank.score([{"s1": 100, "nope": 0}])
+    assert scores.answered[0] == 1
+    assert scores.assessment_score[0] == 50
+    assert scores.sums(0) == {"readiness": 100, "efficiency": 0, "alignment": 50, "opportunity": 0}
+    assert list(bank.topic_scores(scores, 0)) == ["strategy"]
+
+
+def test_empty_responses(server):
+    bank = QuestionBank(SMALL_BANK)
+    scores = bank.score([{}, {"s1": 50}, {}])
+    assert not np.any(scores.dimension_sums[[0, 2]])
+    assert list(scores.assessment_score) == [0, 50, 0]
+    assert bank.score([]).dimension_sums.shape == (0, len(REAO_DIMENSIONS))
+
+    result = bank.score_results(server.current_model(), [{}], [[]])[0]
+    assert result["reao_scores"] == dict.fromkeys(REAO_DIMENSIONS, 0.0)
+    assert result["assessment_score"] == 0.0
+    assert result["topic_scores"] == {}
+
+
+def test_score_results_use_the_dense_sums(server):
+    model = server.current_model()
+    bank = QuestionBank(SMALL_BANK)
+    responses = {"s1": 75, "s2": 25, "c2": 100}
+    tech_tools = ["salesforce"]
+    sums, weights, _, mean = dense_scores(SMALL_BANK, responses)
+    result = bank.score_results(model, [responses], [tech_tools])[0]
+    assert result["reao_scores"] == pytest.approx(model.reao_from_sums(sums, weights, len(tech_tools)))
+    assert result["combined_score"] == pytest.approx(model.combined_score(mean, model.tech_score(tech_tools)))
+
+
+def test_invalid_banks_are_rejected():
+    duplicate = {"version": "1", "topics": [{"id": "a", "questions": [{"id": "q"}]}, {"id": "b", "questions": [{"id": "q"}]}]}
+    unknown = {"version": "1", "topics": [{"id": "a", "dimensions": {"speed": 1}, "questions": [{"id": "q"}]}]}
+    for data in (duplicate, unknown, {"topics": []}):
+        with pytest.raises(InvalidQuestionBank):
+            QuestionBank(data)
@@ -0,0 +1,78 @@
+"""Re-scoring brings stale results up to date, and API workers drop their cached copies"""
+from rescoring import RESCORE_MIGRATION, is_stale, pool_context, rescore_assessments
+
+SCORE_FIELDS = ("assessment_score", "tech_score", "combined_score", "plane_level", "reao_scores", "insights", "recommendations")
+
+
+def submit(client, assessment_id, value):
+    submission = {"responses": {"strategy": value, "content": 100 - value}, "tech_tools": ["salesforce"], "assessment_id": assessment_id}
+    response = client.post("/api/assessment/submit", json=submission)
+    assert response.status_code == 200
+    return response.json()
+
+
+def make_stale(server, client, assessment_id):
+    client.portal.call(
+        server.db.assessments.update_one,
+        {"id": assessment_id},
+        {"$set": {"model_version": "old", "assessment_score": 0.0, "reao_scores": {}}}
+    )
+
+
+def rescore(server, client, **kwargs):
+    async def run():
+        return await rescore_assessments(
+            server.db,
+            server.scoring_models.path,
+            server.ASSESSMENT_QUESTIONS,
+            server.TECH_CATEGORIES,
+            server.QUESTION_BANK_PATH,
+            batch_size=2,
+            workers=1,
+            nice=0,
+            **kwargs
+        )
+    return client.portal.call(run)
+
+
+def stored(server, client, assessment_id):
+    return client.portal.call(server.db.assessments.find_one, {"id": assessment_id}, {"_id": 0})
+
+
+def test_pool_processes_are_not_forked():
+    assert pool_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_rescore_restores_current_scores(server, client):
+    originals = {f"rescore-{i}": submit(client, f"rescore-{i}", value) for i, value in enumerate((0, 25, 50, 75, 100))}
+    for assessment_id in ("rescore-1", "rescore-3", "rescore-4"):
+        make_stale(server, client, assessment_id)
+
+    state = rescore(server, client)
+    assert state["status"] == "complete"
+    assert state["rescored"] == 3
+    assert state["failed"] == 0
+    for assessment_id, original in originals.items():
+        doc = stored(server, client, assessment_id)
+        assert doc["model_version"] == original["model_version"]
+        assert doc["content_hash"] == original["content_hash"]
+        assert {field: doc[field] for field in SCORE_FIELDS} == {field: original[field] for field in SCORE_FIELDS}
+
+    # Nothing left to do
+    assert rescore(server, client)["rescored"] == 0
+
+
+def test_workers_drop_cached_documents_rescored_elsewhere(server, client):
+    original = submit(client, "cached-1", 50)
+    make_stale(server, client, "cached-1")
+    # This worker caches the stale version
+    assert client.get("/api/assessment/results/cached-1").json()["model_version"] == "old"
+
+    # Another process re-scores without reaching this worker's cache
+    rescore(server, client)
+    assert client.get("/api/assessment/results/cached-1").json()["model_version"] == "old"
+
+    client.portal.call(server.check_rescore)
+    assert client.get("/api/assessment/results/cached-1").json()["assessment_score"] == original["assessment_score"]
+    state = client.portal.call(server.db.migrations.find_one, {"_id": RESCORE_MIGRATION})
+    assert not is_stale(stored(server, client, "cached-1"), state["model_version"], state["question_bank_version"])
@@ -0,0 +1,166 @@
+"""What-if sweep and solver grids are bounded before they are allocated; Monte Carlo simulation"""
+import numpy as np
+import pytest
+
+from scenarios import SCENARIO_LEVERS, sample_lever, sample_scenarios, simulate_scenarios
+
+BASE_REAO = {"readiness": 40, "efficiency": 55, "alignment": 35, "opportunity": 60}
+PLANE_THRESHOLDS = (2, 3, 4.5, 6, 7.5)
+
+
+def submit(client, server):
+    responses = {q["id"]: 50 for q in server.ASSESSMENT_QUESTIONS}
+    return client.post("/api/assessment/submit", json={"responses": responses, "tech_tools": ["hubspot"]}).json()["id"]
+
+
+def test_sweep_rejects_huge_steps_before_expanding(client):
+    response = client.post(
+        "/api/scenarios/sweep",
+        params={"assessment_id": "missing"},
+        json={"budget_pct": {"start": 0, "stop": 50, "steps": 10 ** 10}}
+    )
+    assert response.status_code == 413
+
+
+def test_sweep_rejects_long_value_lists(client, server, monkeypatch):
+    monkeypatch.setattr(server, "SCENARIO_SWEEP_MAX_POINTS", 10)
+    response = client.post(
+        "/api/scenarios/sweep",
+        params={"assessment_id": "missing"},
+        json={"headcount": {"values": list(range(11))}}
+    )
+    assert response.status_code == 413
+
+
+def test_sweep_within_limits(client, server):
+    assessment_id = submit(client, server)
+    response = client.post(
+        "/api/scenarios/sweep",
+        params={"assessment_id": assessment_id},
+        json={"budget_pct": {"start": 0, "stop": 50, "steps": 6}, "headcount": {"values": [0, 1, 2]}}
+    )
+    assert response.status_code == 200
+    assert response.json()["shape"][:2] == [6, 3]
+
+
+def test_solver_rejects_huge_steps_before_expanding(client):
+    response = client.post(
+        "/api/scenarios/solve",
+        params={"assessment_id": "missing"},
+        json={"budget_pct": {"start": 0, "stop": 50, "steps": 10 ** 10}}
+    )
+    assert response.status_code == 413
+
+
+def test_solver_bounds_the_whole_grid(client, server, monkeypatch):
+    # Default axes: 51 x 11 x 31 x 21 points
+    monkeypatch.setattr(server, "SCENARIO_SOLVER_MAX_POINTS", 51 * 11 * 31 * 21 - 1)
+    response = client.post("/api/scenarios/solve", params={"assessment_id": "missing"}, json={})
+    assert response.status_code == 413
+
+
+def test_solver_within_limits(client, server):
+    assessment_id = submit(client, server)
+    response = client.post(
+        "/api/scenarios/solve",
+        params={"assessment_id": assessment_id},
+        json={"headcount": {"values": [0, 1, 2]}, "budget_pct": {"start": 0, "stop": 50, "steps": 11}}
+    )
+    assert response.status_code == 200
+
+
+def test_solver_default_target_is_above_the_stored_level(client, server):
+    # Stored at Regional Jet; the simulator re-derives Single Engine from the REAO scores alone
+    doc = {
+        "id": "regional",
+        "assessment_score": 62.5,
+        "tech_score": 0.0,
+        "combined_score": 3.125,
+        "plane_level": {"name": "Regional Jet"},
+        "reao_scores": {"readiness": 55, "efficiency": 55, "alignment": 55, "opportunity": 56}
+    }
+    client.portal.call(server.db.assessments.insert_one, doc)
+
+    response = client.post("/api/scenarios/solve", params={"assessment_id": "regional"}, json={})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["stored_plane_level"]["name"] == "Regional Jet"
+    assert body["current_plane_level"]["name"] == "Single Engine"
+    assert body["target_plane_level"]["name"] == "Commercial Jet"
+    assert all(solution["plane_level"]["name"] != "Regional Jet" for solution in body["solutions"])
+
+
+def test_simulated_percentiles_never_decrease():
+    specs = {
+        "budget_pct": {"distribution": "normal", "mean": 10, "std": 15},
+        "headcount": {"distribution": "range", "low": 0, "high": 5},
+        "tech_utilization_pct": {"distribution": "triangular", "low": 0, "mode": 10, "high": 30},
+        "process_maturity_pct": {"distribution": "range", "low": -10, "high": 20}
+    }
+    outcome = simulate_scenarios(BASE_REAO, 3.0, PLANE_THRESHOLDS, sample_scenarios(specs, 5000, seed=3), (1, 5, 25, 50, 75, 95, 99))
+    for bands in outcome["percentiles"].values():
+        assert np.all(np.diff(bands) >= 0)
+    assert outcome["plane_probability"].sum() == pytest.approx(1.0)
+    assert np.all(np.diff(outcome["plane_probability_at_least"]) <= 0)
+    assert outcome["plane_probability_at_least"][0] == pytest.approx(1.0)
+
+
+def test_fixed_levers_have_no_spread():
+    specs = {lever: {"distribution": "fixed", "value": 10} for lever in SCENARIO_LEVERS}
+    outcome = simulate_scenarios(BASE_REAO, 3.0, PLANE_THRESHOLDS, sample_scenarios(specs, 100, seed=1))
+    for metric, bands in outcome["percentiles"].items():
+        assert np.ptp(bands) == pytest.approx(0.0)
+        assert bands[0] == pytest.approx(outcome["mean"][metric])
+    assert sorted(outcome["plane_probability"])[-1] == 1.0
+
+
+def test_seeded_samples_repeat():
+    specs = {"budget_pct": {"distribution": "normal", "mean": 0, "std": 20}}
+    first, second = sample_scenarios(specs, 50, seed=9), sample_scenarios(specs, 50, seed=9)
+    assert all(np.array_equal(first[lever], second[lever]) for lever in SCENARIO_LEVERS)
+
+
+@pytest.mark.parametrize("spec", [
+    {"distribution": "fixed", "value": 1000},
+    {"distribution": "range", "low": 20, "high": 10},
+    {"distribution": "normal", "mean": 0, "std": -1},
+    {"distribution": "triangular", "low": 0, "mode": 40, "high": 30},
+    {"distribution": "range", "low": 0},
+    {"distribution": "lognormal"}
+])
+def test_invalid_lever_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        sample_lever("budget_pct", np.random.default_rng(0), 10, **spec)
+
+
+@pytest.mark.parametrize("simulation", [
+    {"samples": 0},
+    {"samples": 10 ** 9},
+    {"percentiles": []},
+    {"percentiles": [50, 101]},
+    {"percentiles": [-1]},
+    {"budget_pct": {"distribution": "range", "low": 20, "high": 10}}
+])
+def test_simulation_rejects_bad_requests(client, server, simulation):
+    assessment_id = submit(client, server)
+    response = client.post("/api/scenarios/simulate", params={"assessment_id": assessment_id}, json=simulation)
+    assert response.status_code == 400
+
+
+def test_simulation_probabilities_sum_to_one(client, server):
+    assessment_id = submit(client, server)
+    simulation = {
+        "budget_pct": {"distribution": "range", "low": 0, "high": 40},
+        "headcount": 2,
+        "samples": 2000,
+        "seed": 42
+    }
+    response = client.post("/api/scenarios/simulate", params={"assessment_id": assessment_id}, json=simulation)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["samples"] == 2000
+    assert sum(level["probability"] for level in body["plane_levels"]) == pytest.approx(1.0)
+    assert all(band == sorted(band) for band in body["bands"].values())
+    # Seeded: the same request gives the same answer
+    again = client.post("/api/scenarios/simulate", params={"assessment_id": assessment_id}, json=simulation)
+    assert again.json()["bands"] == body["bands"]
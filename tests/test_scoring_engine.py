@@ -0,0 +1,118 @@
+"""Vectorized batch scoring must match the scalar scoring path exactly"""
+import random
+
+import pytest
+
+RESPONSE_VALUES = [0, 25, 50, 75, 100]
+
+
+@pytest.fixture
+def model(server):
+    return server.current_model()
+
+
+@pytest.fixture
+def catalog(server):
+    question_ids = [q["id"] for q in server.ASSESSMENT_QUESTIONS]
+    tool_ids = [tool["id"] for category in server.TECH_CATEGORIES for tool in category["tools"]]
+    return question_ids, tool_ids
+
+
+def scalar_result(model, responses, tech_tools):
+    assessment_score = model.assessment_score(responses)
+    tech_score = model.tech_score(tech_tools)
+    reao_scores = model.reao_scores(responses, tech_tools)
+    return {
+        "assessment_score": assessment_score,
+        "tech_score": tech_score,
+        "combined_score": model.combined_score(assessment_score, tech_score),
+        "plane_level": model.plane_level(assessment_score, tech_score),
+        "reao_scores": reao_scores,
+        "insights": model.insights(reao_scores),
+        "recommendations": model.recommendations(responses)
+    }
+
+
+def assert_matches_scalar(model, responses_list, tech_tools_list):
+    batch = model.score_batch(responses_list, tech_tools_list)
+    assert len(batch) == len(responses_list)
+    for responses, tech_tools, result in zip(responses_list, tech_tools_list, batch):
+        assert result == scalar_result(model, responses, tech_tools), (responses, tech_tools)
+
+
+def test_random_submissions_match_scalar(model, catalog):
+    question_ids, tool_ids = catalog
+    rng = random.Random(1)
+    responses_list = []
+    tech_tools_list = []
+    for _ in range(2000):
+        answered = rng.sample(question_ids, rng.randint(0, len(question_ids)))
+        responses_list.append({q_id: rng.choice(RESPONSE_VALUES) for q_id in answered})
+        tech_tools_list.append(rng.sample(tool_ids, rng.randint(0, len(tool_ids))))
+    assert_matches_scalar(model, responses_list, tech_tools_list)
+
+
+def test_off_grid_values_match_scalar(model, catalog):
+    question_ids, tool_ids = catalog
+    rng = random.Random(2)
+    responses_list = [{q_id: rng.randint(-50, 150) for q_id in question_ids} for _ in range(500)]
+    tech_tools_list = [rng.sample(tool_ids, rng.randint(0, 5)) for _ in range(500)]
+    assert_matches_scalar(model, responses_list, tech_tools_list)
+
+
+def test_edge_cases_match_scalar(model, catalog, server):
+    question_ids, tool_ids = catalog
+    deep_dive_ids = server.question_bank.question_ids[:5]
+    cases = [
+        # Empty responses and tools
+        ({}, []),
+        # Unknown tech tools only, and mixed with known ones
+        ({question_ids[0]: 50}, ["not-a-tool", "also-missing"]),
+        ({q_id: 75 for q_id in question_ids}, [tool_ids[0], "not-a-tool", tool_ids[1]]),
+        # Duplicate tools count towards the REAO bonus
+        ({q_id: 25 for q_id in question_ids}, [tool_ids[0], tool_ids[0]]),
+        # Deep-dive and unknown question ids count in the mean but feed no dimension
+        ({q_id: 100 for q_id in deep_dive_ids}, []),
+        ({**{q_id: 0 for q_id in deep_dive_ids}, question_ids[0]: 100}, tool_ids[:3]),
+        ({"unknown_question": 50}, tool_ids),
+        # Every tool in the catalog
+        ({q_id: 100 for q_id in question_ids}, list(tool_ids))
+    ]
+    assert_matches_scalar(model, [responses for responses, _ in cases], [tools for _, tools in cases])
+
+
+def test_batch_engine_matches_scalar(model, catalog):
+    question_ids, tool_ids = catalog
+    rng = random.Random(3)
+    responses_list = [{q_id: rng.choice(RESPONSE_VALUES) for q_id in rng.sample(question_ids, 6)} for _ in range(300)]
+    tech_tools_list = [rng.sample(tool_ids, rng.randint(0, 8)) for _ in range(300)]
+    scores = model.batch_engine.score(responses_list, tech_tools_list)
+    for row, (responses, tech_tools) in enumerate(zip(responses_list, tech_tools_list)):
+        expected = scalar_result(model, responses, tech_tools)
+        assert scores.assessment_score[row] == expected["assessment_score"]
+        assert scores.tech_score[row] == expected["tech_score"]
+        assert scores.combined_score[row] == expected["combined_score"]
+        assert scores.reao_dict(row) == expected["reao_scores"]
+        assert model.plane_levels[scores.plane_index[row]] == expected["plane_level"]
+
+
+def test_batch_endpoint_matches_single_submits(client, catalog):
+    question_ids, tool_ids = catalog
+    rng = random.Random(4)
+    submissions = [
+        {
+            "responses": {q_id: rng.choice(RESPONSE_VALUES) for q_id in question_ids},
+            "tech_tools": rng.sample(tool_ids, rng.randint(0, 6)),
+            "assessment_id": f"batch-{i}"
+        }
+        for i in range(20)
+    ]
+    batch = client.post("/api/assessment/submit/batch", json={"submissions": submissions})
+    assert batch.status_code == 200
+    assert batch.json()["count"] == len(submissions)
+
+    fields = ("assessment_score", "tech_score", "combined_score", "plane_level", "reao_scores", "insights", "recommendations")
+    for submission, result in zip(submissions, batch.json()["results"]):
+        single = client.post("/api/assessment/submit", json={**submission, "assessment_id": "single-" + submission["assessment_id"]})
+        assert single.status_code == 200
+        assert {field: result[field] for field in fields} == {field: single.json()[field] for field in fields}
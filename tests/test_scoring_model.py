@@ -0,0 +1,76 @@
+"""Hot reload of the scoring model: new results carry the new version and never reuse old memoized scores"""
+import json
+import os
+
+import pytest
+
+from scoring_model import DEFAULT_MODEL_PATH, ScoringModelStore
+
+SUBMISSION = {"responses": {"strategy": 75, "content": 50}, "tech_tools": ["salesforce", "hubspot"]}
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    with open(DEFAULT_MODEL_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    path = tmp_path / "scoring_model.json"
+    path.write_text(json.dumps(data))
+    return path, data
+
+
+@pytest.fixture
+def store(server, model_file, monkeypatch):
+    path, _ = model_file
+    store = ScoringModelStore(str(path), server.ASSESSMENT_QUESTIONS, server.TECH_CATEGORIES)
+    monkeypatch.setattr(server, "scoring_models", store)
+    return store
+
+
+def rewrite(path, data):
+    mtime = os.path.getmtime(path)
+    path.write_text(json.dumps(data))
+    # Filesystems with coarse timestamps would hide the edit from the mtime check
+    os.utime(path, (mtime + 1, mtime + 1))
+
+
+def test_unchanged_file_keeps_the_model(store):
+    model = store.model
+    assert store.reload_if_changed() is False
+    assert store.reload() is False
+    assert store.model is model
+
+
+def test_reload_stamps_new_results_with_the_new_version(client, server, store, model_file):
+    path, data = model_file
+    first = client.post("/api/assessment/submit", json={**SUBMISSION, "assessment_id": "v-1"}).json()
+    assert first["model_version"] == store.model.version
+
+    data["tech_bonus"] = {**data["tech_bonus"], "per_tool": 4}
+    rewrite(path, data)
+    old_version = store.model.version
+    assert store.reload_if_changed() is True
+    assert store.model.version != old_version
+    assert store.model.version.startswith(f"{data['version']}+")
+
+    hits = server.result_memo.hits
+    second = client.post("/api/assessment/submit", json={**SUBMISSION, "assessment_id": "v-2"}).json()
+    assert second["model_version"] == store.model.version
+    # Same answers, but the memo entry is keyed by the old version
+    assert server.result_memo.hits == hits
+    assert second["content_hash"] != first["content_hash"]
+    assert second["reao_scores"]["efficiency"] > first["reao_scores"]["efficiency"]
+
+    # An identical resubmit of the old assessment is re-scored, not deduplicated
+    resubmit = client.post("/api/assessment/submit", json={**SUBMISSION, "assessment_id": "v-1"}).json()
+    assert resubmit["model_version"] == store.model.version
+    assert resubmit["reao_scores"] == second["reao_scores"]
+
+
+def test_broken_file_keeps_the_current_model(store, model_file):
+    path, data = model_file
+    model = store.model
+    rewrite(path, {**data, "plane_thresholds": None})
+    assert store.reload_if_changed() is False
+    assert store.model is model
+    # The same broken file isn't retried on every poll
+    assert store.reload_if_changed() is False
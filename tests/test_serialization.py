@@ -0,0 +1,92 @@
+"""One encode step for API responses, and ETag/304 for the static catalog payloads"""
+import importlib
+import json
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+import serialization
+
+SAMPLE = {
+    "id": "a1",
+    "created_at": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    "name": "Café",
+    "scores": [1.5, 2, None, True],
+    "nested": {"reao": {"readiness": 50.25}}
+}
+
+
+@pytest.fixture
+def stdlib_serialization(monkeypatch):
+    # Import a second copy of the module as it is built without orjson installed
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.delitem(sys.modules, "serialization")
+    module = importlib.import_module("serialization")
+    assert module.orjson is None
+    yield module
+    sys.modules["serialization"] = serialization
+
+
+def test_dumps_is_compact_utf8_with_iso_datetimes():
+    encoded = serialization.dumps(SAMPLE)
+    assert b" " not in encoded.replace("Café".encode("utf-8"), b"")
+    assert json.loads(encoded) == {**SAMPLE, "created_at": "2024-05-01T12:30:00+00:00"}
+    assert "Café".encode("utf-8") in encoded
+
+
+def test_dumps_encodes_numpy_values():
+    encoded = serialization.dumps({"surface": np.arange(4, dtype=np.float64).reshape(2, 2), "count": np.int64(3)})
+    assert json.loads(encoded) == {"surface": [[0.0, 1.0], [2.0, 3.0]], "count": 3}
+
+
+def test_stdlib_fallback_matches_orjson(stdlib_serialization):
+    if serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    assert stdlib_serialization.dumps(SAMPLE) == serialization.dumps(SAMPLE)
+
+
+def test_response_passes_encoded_bytes_through():
+    encoded = serialization.dumps(SAMPLE)
+    assert serialization.JSONBytesResponse(encoded).body == encoded
+    assert serialization.JSONBytesResponse(SAMPLE).body == encoded
+
+
+def test_submit_response_matches_stored_result(client):
+    submission = {"responses": {"strategy": 75, "content": 25}, "tech_tools": ["salesforce"], "assessment_id": "encode-1"}
+    submitted = client.post("/api/assessment/submit", json=submission)
+    assert submitted.status_code == 200
+    assert submitted.headers["content-type"] == "application/json"
+    stored = client.get("/api/assessment/results/encode-1")
+    assert stored.status_code == 200
+    assert stored.json() == submitted.json()
+
+
+@pytest.mark.parametrize("path", ["/api/assessment/questions", "/api/tech/categories"])
+def test_static_payload_etag_and_304(client, path):
+    first = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert "max-age" in first.headers["cache-control"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        cached = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": if_none_match})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_static_payload_variants_share_one_body(client):
+    identity = client.get("/api/assessment/questions", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/api/assessment/questions", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert identity.headers["etag"] != compressed.headers["etag"]
+    assert compressed.json() == identity.json()
+    # An identity ETag revalidates the compressed representation too
+    revalidated = client.get("/api/assessment/questions", headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["etag"]})
+    assert revalidated.status_code == 304
@@ -0,0 +1,73 @@
+"""Memoized tech scores: hits within a model, misses after a catalog or tier-weight change"""
+import copy
+
+import pytest
+
+from scoring_model import DEFAULT_MODEL_PATH, ScoringModel, load_model_data
+from tech_catalog import TechScorer, catalog_fingerprint
+
+STACK = ["salesforce", "hubspot", "unknown_tool"]
+
+
+def walk_score(tech_categories, tier_weights, selected_tools):
+    """The catalog walk TechScorer replaces"""
+    score = 0.0
+    total_weight = 0.0
+    for category in tech_categories:
+        tools = [tool for tool in category["tools"] if tool["id"] in selected_tools]
+        if tools:
+            bonus = sum(tier_weights.get(tool["tier"], 0) for tool in tools)
+            score += min(10, (len(tools) * 1.5 + bonus) / len(tools)) * category["weight"]
+            total_weight += category["weight"]
+    return min(10, score / total_weight) if total_weight > 0 else 0.0
+
+
+@pytest.fixture
+def model_data():
+    return load_model_data(DEFAULT_MODEL_PATH)
+
+
+def test_repeated_stacks_hit_the_cache(server, model_data):
+    scorer = TechScorer(server.TECH_CATEGORIES, model_data["tier_weights"])
+    first = scorer.score(STACK)
+    # Order, duplicates and unknown tools don't change the key
+    assert scorer.score(["hubspot", "salesforce", "salesforce"]) == first
+    assert scorer.cache_info()["hits"] == 1 and scorer.cache_info()["misses"] == 1
+    assert first == pytest.approx(walk_score(server.TECH_CATEGORIES, model_data["tier_weights"], STACK))
+    assert scorer.score(["unknown_tool"]) == 0.0
+
+
+def test_tier_weight_change_misses_the_cache(server, model_data):
+    model = ScoringModel(model_data, server.ASSESSMENT_QUESTIONS, server.TECH_CATEGORIES)
+    before = model.tech_score(STACK)
+    assert model.tech_score(STACK) == before
+
+    changed = copy.deepcopy(model_data)
+    changed["tier_weights"] = {tier: weight + 1 for tier, weight in changed["tier_weights"].items()}
+    reloaded = ScoringModel(changed, server.ASSESSMENT_QUESTIONS, server.TECH_CATEGORIES)
+    assert reloaded.version != model.version
+    assert reloaded.tech_scorer.index.version != model.tech_scorer.index.version
+
+    after = reloaded.tech_score(STACK)
+    assert reloaded.tech_scorer.cache_info()["misses"] == 1
+    assert reloaded.tech_scorer.cache_info()["hits"] == 0
+    assert after != before
+    assert after == pytest.approx(walk_score(server.TECH_CATEGORIES, changed["tier_weights"], STACK))
+
+
+def test_catalog_change_misses_the_cache(server, model_data):
+    model = ScoringModel(model_data, server.ASSESSMENT_QUESTIONS, server.TECH_CATEGORIES)
+    model.tech_score(STACK)
+
+    catalog = copy.deepcopy(server.TECH_CATEGORIES)
+    for category in catalog:
+        for tool in category["tools"]:
+            if tool["id"] == "salesforce":
+                category["weight"] *= 2
+    assert catalog_fingerprint(catalog, model_data["tier_weights"]) != model.tech_scorer.index.version
+
+    reloaded = ScoringModel(model_data, server.ASSESSMENT_QUESTIONS, catalog)
+    assert reloaded.version != model.version
+    score = reloaded.tech_score(STACK)
+    assert reloaded.tech_scorer.cache_info()["misses"] == 1
+    assert score == pytest.approx(walk_score(catalog, model_data["tier_weights"], STACK))
@@ -0,0 +1,63 @@
+"""Tool impact ranking: every add/remove delta equals a full re-score of the changed stack"""
+import pytest
+
+RESPONSES = {"strategy": 75, "content": 25, "demand_gen": 100, "analytics": 50}
+
+
+def rescored(model, responses, tech_tools):
+    return model.score_batch([responses], [tech_tools])[0]
+
+
+def variant(tech_tools, impact):
+    if impact["action"] == "add":
+        return tech_tools + [impact["tool_id"]]
+    return [tool_id for tool_id in tech_tools if tool_id != impact["tool_id"]]
+
+
+@pytest.mark.parametrize("tech_tools", [
+    [],
+    ["salesforce", "hubspot"],
+    # Duplicates are removed together; unknown tools still count towards the tool count
+    ["salesforce", "salesforce", "unknown_tool"]
+])
+def test_deltas_match_a_full_rescore(server, tech_tools):
+    model = server.current_model()
+    ranking = server.rank_tool_impacts(RESPONSES, tech_tools, "all", None)
+    base = rescored(model, RESPONSES, tech_tools)
+    assert ranking["combined_score"] == pytest.approx(base["combined_score"])
+    assert ranking["plane_level"] == base["plane_level"]
+    assert len(ranking["impacts"]) == len(model.tool_catalog)
+
+    for impact in ranking["impacts"]:
+        assert (impact["action"] == "remove") == (impact["tool_id"] in tech_tools)
+        expected = rescored(model, RESPONSES, variant(tech_tools, impact))
+        assert impact["tech_score"] == pytest.approx(expected["tech_score"]), impact["tool_id"]
+        assert impact["tech_score_delta"] == pytest.approx(expected["tech_score"] - base["tech_score"])
+        assert impact["combined_score"] == pytest.approx(expected["combined_score"])
+        assert impact["combined_score_delta"] == pytest.approx(expected["combined_score"] - base["combined_score"])
+        assert impact["plane_level"] == expected["plane_level"]
+        for dimension, delta in impact["reao_delta"].items():
+            assert delta == pytest.approx(expected["reao_scores"][dimension] - base["reao_scores"][dimension])
+
+
+def test_biggest_gain_first(server):
+    impacts = server.rank_tool_impacts(RESPONSES, ["hubspot"], "all", None)["impacts"]
+    keys = [(-impact["combined_score_delta"], -impact["tech_score_delta"]) for impact in impacts]
+    assert keys == sorted(keys)
+    assert impacts[0]["action"] == "add"
+
+
+def test_action_filter_and_limit(client):
+    submission = {"responses": RESPONSES, "tech_tools": ["salesforce", "hubspot"]}
+    removals = client.post("/api/tech/impact", params={"action": "remove"}, json=submission).json()["impacts"]
+    assert sorted(impact["tool_id"] for impact in removals) == ["hubspot", "salesforce"]
+    top = client.post("/api/tech/impact", params={"limit": 3}, json=submission).json()["impacts"]
+    assert len(top) == 3
+    assert client.post("/api/tech/impact", params={"action": "swap"}, json=submission).status_code == 400
+
+
+def test_catalog_lookup_is_built_with_the_model(server):
+    model = server.current_model()
+    tool, category = model.tool_catalog["salesforce"]
+    assert tool["name"] and category
+    assert server.current_model().tool_catalog is model.tool_catalog
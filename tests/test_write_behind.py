@@ -0,0 +1,194 @@
+"""Queued write-behind writes stay readable until they land, and failed batches are retried"""
+import asyncio
+
+import pytest
+
+from write_behind import WriteBehindQueue
+
+
+class FlakyStore:
+    """write_batch target failing while `down`"""
+
+    def __init__(self):
+        self.docs = {}
+        self.down = False
+
+    async def write_batch(self, items):
+        if self.down:
+            raise ConnectionError("database unavailable")
+        for key, document in items:
+            self.docs[key] = document
+
+
+def make_queue(store, **kwargs):
+    return WriteBehindQueue(
+        store.write_batch, durability="queued", flush_interval=0.001, max_retries=1, retry_interval=0.01, **kwargs
+    )
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.005)
+
+
+def test_queued_write_is_readable_until_written():
+    async def scenario():
+        store = FlakyStore()
+        queue = make_queue(store)
+        queue.start()
+        await queue.submit("a", {"v": 1})
+        assert queue.pending("a") == {"v": 1}
+        await wait_for(lambda: "a" in store.docs)
+        assert queue.pending("a") is None
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_is_dead_lettered_and_retried():
+    async def scenario():
+        store = FlakyStore()
+        store.down = True
+        queue = make_queue(store)
+        queue.start()
+        await queue.submit("a", {"v": 1})
+        await wait_for(lambda: queue.stats()["dead_letters"] == 1)
+        # Still readable while the database is down
+        assert queue.pending("a") == {"v": 1}
+
+        store.down = False
+        await wait_for(lambda: store.docs.get("a") == {"v": 1})
+        assert queue.stats()["dead_letters"] == 0
+        assert queue.pending("a") is None
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_newer_write_supersedes_dead_letter():
+    async def scenario():
+        store = FlakyStore()
+        store.down = True
+        queue = make_queue(store)
+        queue.start()
+        await queue.submit("a", {"v": 1})
+        await wait_for(lambda: queue.stats()["dead_letters"] == 1)
+        store.down = False
+        await queue.submit("a", {"v": 2})
+        await wait_for(lambda: "a" in store.docs and queue.pending("a") is None)
+        await queue.close()
+        assert store.docs["a"] == {"v": 2}
+        assert queue.stats()["dead_letters"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_close_retries_dead_letters():
+    async def scenario():
+        store = FlakyStore()
+        store.down = True
+        queue = make_queue(store)
+        queue.retry_interval = 60
+        queue.start()
+        await queue.submit("a", {"v": 1})
+        await wait_for(lambda: queue.stats()["dead_letters"] == 1)
+        store.down = False
+        await queue.close()
+        assert store.docs == {"a": {"v": 1}}
+
+    asyncio.run(scenario())
+
+
+def test_dead_letter_backlog_fails_queued_writers():
+    async def scenario():
+        store = FlakyStore()
+        store.down = True
+        queue = make_queue(store, max_pending=2)
+        queue.retry_interval = 60
+        queue.start()
+        await queue.submit_many([("a", 1), ("b", 2)])
+        await wait_for(lambda: queue.stats()["dead_letters"] == 2)
+        with pytest.raises(RuntimeError):
+            await queue.submit("c", 3)
+        store.down = False
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_acknowledged_writer_gets_the_error():
+    async def scenario():
+        store = FlakyStore()
+        store.down = True
+        queue = WriteBehindQueue(store.write_batch, flush_interval=0.001, max_retries=1)
+        queue.start()
+        with pytest.raises(ConnectionError):
+            await queue.submit("a", {"v": 1})
+        assert queue.pending("a") is None
+        assert queue.stats()["dead_letters"] == 0
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_queued_submit_is_readable_and_counts_once_in_benchmarks(server, client, monkeypatch):
+    queue = WriteBehindQueue(server.write_results, durability="queued", flush_interval=0.001)
+    monkeypatch.setattr(server, "write_queue", queue)
+    client.portal.call(queue.start)
+
+    submission = {"responses": {"strategy": 50}, "tech_tools": [], "assessment_id": "queued-1"}
+    for _ in range(3):
+        assert client.post("/api/assessment/submit", json=submission).status_code == 200
+        assert client.get("/api/assessment/results/queued-1").status_code == 200
+
+    client.portal.call(queue.close)
+    assert client.get("/api/assessment/results/queued-1").status_code == 200
+    assert client.get("/api/benchmarks").json()["count"] == 1
+
+
+def test_discard_drops_queued_and_dead_lettered_writes():
+    async def scenario():
+        store = FlakyStore()
+        store.down = True
+        queue = make_queue(store)
+        queue.start()
+        await queue.submit("a", {"v": 1})
+        await wait_for(lambda: queue.stats()["dead_letters"] == 1)
+        assert await queue.discard("a") is True
+        assert queue.pending("a") is None
+
+        store.down = False
+        queue.flush_interval = 0.05
+        await queue.submit("b", {"v": 1})
+        assert await queue.discard("b") is True
+        await queue.submit("c", {"v": 1})
+        await queue.close()
+        assert store.docs == {"c": {"v": 1}}
+        assert await queue.discard("c") is False
+
+    asyncio.run(scenario())
+
+
+def test_queued_submit_then_delete_stays_deleted(server, client, monkeypatch):
+    queue = WriteBehindQueue(server.write_results, durability="queued", flush_interval=0.2)
+    monkeypatch.setattr(server, "write_queue", queue)
+    client.portal.call(queue.start)
+
+    submission = {"responses": {"strategy": 50}, "tech_tools": [], "assessment_id": "x1"}
+    assert client.post("/api/assessment/submit", json=submission).status_code == 200
+    assert client.delete("/api/assessment/x1").status_code == 200
+    client.portal.call(queue.close)
+    assert client.get("/api/assessment/results/x1").status_code == 404
+
+    # A stored assessment with a resubmit still queued
+    client.portal.call(queue.start)
+    queue.durability = "acknowledged"
+    assert client.post("/api/assessment/submit", json=submission).status_code == 200
+    queue.durability = "queued"
+    assert client.post("/api/assessment/submit", json={**submission, "responses": {"strategy": 75}}).status_code == 200
+    assert client.delete("/api/assessment/x1").status_code == 200
+    client.portal.call(queue.close)
+    assert client.get("/api/assessment/results/x1").status_code == 404
+    assert client.get("/api/benchmarks").json()["count"] == 0